@@ -190,12 +190,11 @@ class SubscriberActivity extends React.Component<any, any> {
                 selectDate={this.onEndDateChange}
                 activeDate={get(reportParams, 'date_to') || moment()} />)
         ];
-        // Commented out currently until there is a workaround for pagination with export/print.
-        /* filterNodes.push(<span
+        filterNodes.push(<span
             key='subscriver_activity_export'
             className="nh-button nh-button--secondary ms-2"
             type="button"
-            onClick={() => {this.props.fetchReport(REPORTS['subscriber-activity'], false, true);}}>Export to CSV</span>); */
+            onClick={() => {this.props.fetchReport(REPORTS['subscriber-activity'], false, true);}}>{gettext('Export to CSV')}</span>);
 
         const filterSection = (<div key='report_filters' className="align-items-center d-flex flex-sm-nowrap flex-wrap m-0 px-3 wire-column__main-header-agenda">{filterNodes}</div>);
 
@@ -1,4 +1,4 @@
-from typing import Dict, Set, Any, Optional, List
+from typing import Dict, Any, Optional, List
 import logging
 from copy import deepcopy
 
@@ -49,6 +49,7 @@ from .utils import get_latest_available_delivery, TO_BE_CONFIRMED_FIELD, push_ag
 logger = logging.getLogger(__name__)
 PRIVATE_FIELDS = ["event.files", "*.internal_note"]
 PLANNING_ITEMS_FIELDS = ["planning_items", "coverages", "display_dates"]
+MATCHED_EVENT_QUERY_NAME = "_search_matched_event"
 
 
 agenda_notifications = {
@@ -489,6 +490,15 @@ def get_aggregation_field(key: str):
     return aggregations[key]["terms"]["field"]
 
 
+def _remove_inner_hits(query):
+    """Get a copy of the query without ``inner_hits`` of the nested queries"""
+    if isinstance(query, dict):
+        return {key: _remove_inner_hits(val) for key, val in query.items() if key != "inner_hits"}
+    if isinstance(query, list):
+        return [_remove_inner_hits(val) for val in query]
+    return query
+
+
 def nested_query(path, query, inner_hits=True, name=None):
     nested = {"path": path, "query": query}
     if inner_hits:
@@ -687,6 +697,9 @@ class AgendaService(BaseSearchService):
     limit_days_setting = None
     default_sort = [{"dates.start": "asc"}]
 
+    #: Fields of wire items used by :meth:`enhance_coverage_with_wire_details`
+    coverage_wire_fields = ["publish_schedule", "firstpublished"]
+
     @property
     def default_page_size(self) -> int:
         return app.config.get("AGENDA_PAGE_SIZE", 250)
@@ -718,8 +731,8 @@ class AgendaService(BaseSearchService):
         self.enhance_items([doc])
 
     def enhance_items(self, docs):
+        self.enhance_coverages([coverage for doc in docs for coverage in doc.get("coverages") or []])
         for doc in docs:
-            self.enhance_coverages(doc.get("coverages") or [])
             doc.setdefault("_hits", {})
             doc["_hits"]["matched_event"] = doc.pop("_search_matched_event", False)
 
@@ -774,34 +787,29 @@ class AgendaService(BaseSearchService):
                 ]
 
     def enhance_coverages(self, coverages):
+        """Enhance completed coverages, can be coverages of multiple agenda items"""
         completed_coverages = [
             c
             for c in coverages
             if c["workflow_status"] == ASSIGNMENT_WORKFLOW_STATE.COMPLETED and len(c.get("deliveries") or []) > 0
         ]
         # Enhance completed coverages in general - add story's abstract/headline/slugline
-        text_delivery_ids = [
-            c.get("delivery_id")
-            for c in completed_coverages
-            if c.get("delivery_id") and c.get("coverage_type") == "text"
-        ]
-        wire_search_service = get_resource_service("wire_search")
-        if text_delivery_ids:
-            wire_items = wire_search_service.get_items(text_delivery_ids)
-            if wire_items.count() > 0:
-                for item in wire_items:
-                    c = [c for c in completed_coverages if c.get("delivery_id") == item.get("_id")][0]
+        text_coverages: Dict[str, List[Dict[str, Any]]] = {}
+        for c in completed_coverages:
+            if c.get("delivery_id") and c.get("coverage_type") == "text":
+                text_coverages.setdefault(c["delivery_id"], []).append(c)
+
+        if text_coverages:
+            wire_items = get_resource_service("wire_search").get_items(
+                list(text_coverages.keys()), fields=self.coverage_wire_fields
+            )
+            for item in wire_items or []:
+                for c in text_coverages.get(item.get("_id")) or []:
                     self.enhance_coverage_with_wire_details(c, item)
 
         media_coverages = [c for c in completed_coverages if c.get("coverage_type") != "text"]
-        for c in media_coverages:
-            try:
-                c["deliveries"][0]["delivery_href"] = c["delivery_href"] = app.set_photo_coverage_href(
-                    c, None, c["deliveries"]
-                )
-            except Exception as e:
-                logger.exception(e)
-                logger.error("Failed to generate delivery_href for coverage={}".format(c.get("coverage_id")))
+        if media_coverages:
+            app.set_photo_coverages_href(media_coverages)
 
     def enhance_coverage_with_wire_details(self, coverage, wire_item):
         coverage["publish_time"] = wire_item.get("publish_schedule") or wire_item.get("firstpublished")
@@ -810,44 +818,79 @@ class AgendaService(BaseSearchService):
         if req.args.get("featured"):
             return self.get_featured_stories(req, lookup)
 
-        cursor = super().get(req, lookup)
-
         args = req.args
-        if args.get("itemType") is None or (args.get("date_from") and args.get("date_to")):
-            matching_event_ids: Set[str] = (
-                set() if args.get("itemType") is not None else self._get_event_ids_matching_query(req, lookup)
-            )
-            date_range = {} if not (args.get("date_from") and args.get("date_to")) else get_date_filters(args)
+        if args.get("itemType") is None:
+            cursor = self.get_with_matched_events(req, lookup)
+        else:
+            cursor = super().get(req, lookup)
 
+        if args.get("date_from") and args.get("date_to"):
+            date_range = get_date_filters(args)
             for doc in cursor.docs:
-                if doc["_id"] in matching_event_ids:
-                    doc["_search_matched_event"] = True
-                if date_range:
-                    # make the items display on the featured day,
-                    # it's used in ui instead of dates.start and dates.end
-                    doc.update(
-                        {
-                            "_display_from": date_range.get("gt"),
-                            "_display_to": date_range.get("lt"),
-                        }
-                    )
+                # make the items display on the featured day,
+                # it's used in ui instead of dates.start and dates.end
+                doc.update(
+                    {
+                        "_display_from": date_range.get("gt"),
+                        "_display_to": date_range.get("lt"),
+                    }
+                )
 
         return cursor
 
-    def _get_event_ids_matching_query(self, req, lookup) -> Set[str]:
-        """Re-run the query to retrieve the list of Event IDs matching the query
+    def get_with_matched_events(self, req, lookup):
+        """Run the search, marking the Events which match the query without the Planning filters
 
-        This is used to show ALL Planning Items for the Event if the search query matched the parent Event
+        This is used to show ALL Planning Items for the Event if the search query matched the parent Event.
+        The Event query is added as an optional named query, so it's done using a single search request.
         """
 
-        orig_args = req.args
-        req.args = {key: val for key, val in dict(req.args).items() if key not in planning_filters}
-        req.args["itemType"] = "events"
-        req.args["aggs"] = "false"
-        req.projection = json.dumps({"_id": 1})
-        item_ids = set([item["_id"] for item in super().get(req, lookup)])
-        req.args = orig_args
-        return item_ids
+        search = SearchQuery()
+        self.prefill_search_args(search, req)
+        self.prefill_search_query(search, req, lookup)
+        self.validate_request(search)
+        self.apply_filters(search)
+        self.gen_source_from_search(search)
+
+        search.source["query"] = {
+            "bool": {
+                "must": [search.source["query"]],
+                "should": [self.get_matched_event_query(search, req, lookup)],
+            },
+        }
+
+        internal_req = self.get_internal_request(search)
+        cursor = self.internal_get(internal_req, search.lookup)
+
+        matched_event_ids = {
+            hit["_id"]
+            for hit in (cursor.hits or {}).get("hits", {}).get("hits", [])
+            if MATCHED_EVENT_QUERY_NAME in (hit.get("matched_queries") or [])
+        }
+        for doc in cursor.docs:
+            if doc["_id"] in matched_event_ids:
+                doc["_search_matched_event"] = True
+
+        return cursor
+
+    def get_matched_event_query(self, search: SearchQuery, req, lookup) -> Dict[str, Any]:
+        """Get the named query matching Events using the search args without the Planning filters"""
+
+        event_search = SearchQuery()
+        event_search.args = {key: val for key, val in search.args.items() if key not in planning_filters}
+        event_search.args["itemType"] = "events"
+        event_search.req = req
+        self.prefill_search_query(event_search, req, lookup)
+        self.apply_filters(event_search)
+
+        filters = [event_search.query]
+        source: Dict[str, Any] = {}
+        self.set_post_filter(source, event_search, event_search.item_type)
+        if source.get("post_filter"):
+            filters.append(source["post_filter"])
+
+        # inner hits are collected by the main query only
+        return {"bool": {"filter": _remove_inner_hits(filters), "_name": MATCHED_EVENT_QUERY_NAME}}
 
     def prefill_search_query(self, search: SearchQuery, req=None, lookup=None):
         """Generate the search query instance
@@ -1316,32 +1359,16 @@ class AgendaService(BaseSearchService):
         bool_query.setdefault("must_not", [])
         bool_query["must_not"] += filter_terms["must_not_term_filters"]
 
-    def get_matching_topics(self, item_id, topics, users, companies):
-        """Returns a list of topic ids matching to the given item_id
-
-        :param item_id: item id to be tested against all topics
-        :param topics: list of topics
-        :param users: user_id, user dictionary
-        :param companies: company_id, company dictionary
-        :return:
-        """
-
-        return self.get_matching_topics_for_item(
-            topics,
-            users,
-            companies,
-            {
-                "bool": {
-                    "must_not": [
-                        {"term": {"state": "killed"}},
-                    ],
-                    "must": [
-                        {"term": {"_id": item_id}},
-                    ],
-                    "should": [],
-                }
-            },
-        )
+    def get_matching_topics_query(self):
+        return {
+            "bool": {
+                "must_not": [
+                    {"term": {"state": "killed"}},
+                ],
+                "must": [],
+                "should": [],
+            }
+        }
 
     def enhance_coverage_watches(self, item):
         for c in item.get("coverages") or []:
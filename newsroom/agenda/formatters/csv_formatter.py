@@ -5,7 +5,7 @@ import arrow
 from werkzeug.utils import secure_filename
 from newsroom.utils import parse_dates
 from datetime import datetime
-from typing import List, Dict, Any, Union, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Union, Tuple, Optional
 from newsroom.agenda.utils import get_filtered_subject
 from flask import current_app as app
 
@@ -22,24 +22,40 @@ class CSVFormatter(BaseFormatter):
         return self.serialize_to_csv([event_item])
 
     def format_events(self, items: List[Dict[str, Any]], item_type: Union[str, None] = None) -> Tuple[bytes, str]:
-        formatted_events = []
-        for item in items:
-            parse_dates(item)
-            formatted_events.append(self.format_event(item))
-        return self.serialize_to_csv(formatted_events), secure_filename(
-            f"{datetime.now().strftime('%Y-%m-%d-%H:%M:%S')}-{'multi'}.{self.FILE_EXTENSION}"
-        )
+        csv_data, filename = self.format_events_stream(items, item_type)
+        return b"".join(csv_data), filename
+
+    def format_events_stream(
+        self, items: Iterable[Dict[str, Any]], item_type: Union[str, None] = None
+    ) -> Tuple[Iterator[bytes], str]:
+        """Returns a generator of the csv rows, formatting the items as these are consumed"""
+
+        def format_items():
+            for item in items:
+                parse_dates(item)
+                yield self.format_event(item)
+
+        return self.iter_csv(format_items()), self.get_multi_filename()
+
+    def get_multi_filename(self) -> str:
+        return secure_filename(f"{datetime.now().strftime('%Y-%m-%d-%H:%M:%S')}-{'multi'}.{self.FILE_EXTENSION}")
 
     def serialize_to_csv(self, items: List[Dict[str, Any]]) -> bytes:
+        return b"".join(self.iter_csv(items))
+
+    def iter_csv(self, items: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
         csv_string = io.StringIO()
-        fieldnames: List[str] = list(items[0].keys())
-        csv_writer: csv.DictWriter = csv.DictWriter(csv_string, delimiter=",", fieldnames=fieldnames)
-        csv_writer.writeheader()
+        csv_writer: Optional[csv.DictWriter] = None
         for item in items:
+            if csv_writer is None:
+                fieldnames: List[str] = list(item.keys())
+                csv_writer = csv.DictWriter(csv_string, delimiter=",", fieldnames=fieldnames)
+                csv_writer.writeheader()
             csv_writer.writerow(item)
 
-        csv_string.seek(0)  # Reset the buffer position
-        return csv_string.getvalue().encode("utf-8")
+            yield csv_string.getvalue().encode("utf-8")
+            csv_string.seek(0)  # Reset the buffer
+            csv_string.truncate()
 
     def format_event(self, item: Dict[str, Any]) -> Dict[str, Any]:
         subj_schemas = app.config.get("AGENDA_CSV_SUBJECT_SCHEMES", [])
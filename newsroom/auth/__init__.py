@@ -3,7 +3,7 @@ import flask
 
 import superdesk
 
-from typing import Optional
+from typing import Any, Dict, Iterable, Optional
 from bson import ObjectId
 from eve.auth import BasicAuth
 from flask import session, abort
@@ -20,6 +20,58 @@ class SessionAuth(BasicAuth):
         return user_role in allowed_roles
 
 
+class IdentityContext:
+    """Users and companies loaded during the current request
+
+    Stored on :data:`flask.g` for the request it was created for, so every call
+    of :func:`get_user` and :func:`get_company` within a request reads the database only once.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.docs: Dict[str, Dict[str, Any]] = {"users": {}, "companies": {}}
+        #: Number of database reads, per resource
+        self.reads: Dict[str, int] = {"users": 0, "companies": 0}
+
+    def find_one(self, resource: str, _id):
+        docs = self.docs[resource]
+        key = str(_id)
+        if key not in docs:
+            self.reads[resource] += 1
+            docs[key] = superdesk.get_resource_service(resource).find_one(req=None, _id=_id)
+        return docs[key]
+
+    def invalidate(self, resource: str, ids: Iterable[Any]) -> None:
+        for _id in ids:
+            self.docs[resource].pop(str(_id), None)
+
+
+def get_identity_context() -> Optional[IdentityContext]:
+    """Get the identity context for the current request, ``None`` outside of requests"""
+    if not flask.has_request_context():
+        return None
+    request = flask.request._get_current_object()
+    identity = flask.g.get("identity_context")
+    if identity is None or identity.request is not request:
+        # app context (and ``flask.g``) might be shared by multiple requests in tests
+        identity = IdentityContext(request)
+        flask.g.identity_context = identity
+    return identity
+
+
+def invalidate_identity(resource: str, ids: Iterable[Any]) -> None:
+    """Drop the documents updated during the current request, so these are loaded again"""
+    if flask.has_app_context() and flask.g.get("identity_context") is not None:
+        flask.g.identity_context.invalidate(resource, ids)
+
+
+def find_identity(resource: str, _id):
+    identity = get_identity_context()
+    if identity is None:
+        return superdesk.get_resource_service(resource).find_one(req=None, _id=_id)
+    return identity.find_one(resource, _id)
+
+
 def get_user(required=False) -> Optional[User]:
     """Get current user.
 
@@ -30,7 +82,7 @@ def get_user(required=False) -> Optional[User]:
     user_id = get_user_id()
     user = None
     if user_id:
-        user = superdesk.get_resource_service("users").find_one(req=None, _id=user_id)
+        user = find_identity("users", user_id)
     if not user and required:
         abort(401)
     return user
@@ -49,13 +101,13 @@ def get_company(user=None, required=False) -> Optional[Company]:
     if user and user.get("company"):
         return get_company_from_user(user)
     if hasattr(flask.g, "company_id"):  # if there is no user this might be company session (in news api)
-        return superdesk.get_resource_service("companies").find_one(req=None, _id=flask.g.company_id)
+        return find_identity("companies", flask.g.company_id)
     return None
 
 
 def get_company_from_user(user: User) -> Optional[Company]:
     if user.get("company"):
-        return superdesk.get_resource_service("companies").find_one(req=None, _id=user["company"])
+        return find_identity("companies", user["company"])
 
     return None
 
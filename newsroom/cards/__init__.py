@@ -1,9 +1,12 @@
 import superdesk
+from typing import List
 from flask import Blueprint
 from flask_babel import lazy_gettext
 from typing_extensions import assert_never
 
-from newsroom.types import DashboardCardType
+from newsroom import directory
+from newsroom.types import DashboardCard, DashboardCardType
+from newsroom.utils import query_resource
 
 from .cards import CardsResource, CardsService
 
@@ -66,6 +69,17 @@ def get_card_type(cardType: str) -> DashboardCardType:
     raise ValueError(f"Invalid card type: {cardType}")
 
 
+def get_dashboard_cards(dashboard: str) -> List[DashboardCard]:
+    """Get the cards configured for the dashboard"""
+    if not directory.is_directory_enabled():
+        return list(query_resource("cards", lookup={"dashboard": dashboard}))
+
+    return sorted(
+        (dict(card) for card in directory.get_directory("cards").get_index("dashboard").get(dashboard) or []),
+        key=lambda card: (card.get("order") is not None, card.get("order") or 0, card.get("label") or ""),
+    )
+
+
 def init_app(app):
     from . import views  # noqa
 
@@ -1,6 +1,7 @@
 import typing
 import newsroom
 
+from newsroom import directory
 from newsroom.types import DashboardCardType
 
 
@@ -35,4 +36,14 @@ class CardsResource(newsroom.Resource):
 
 
 class CardsService(newsroom.Service):
-    pass
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed("cards", [doc["_id"] for doc in docs])
+
+    def on_updated(self, updates, original):
+        super().on_updated(updates, original)
+        directory.mark_changed("cards", [original["_id"]])
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        directory.mark_changed("cards", [doc["_id"]])
@@ -15,6 +15,7 @@ Created on May 29, 2014
 """
 
 import logging
+from datetime import datetime, timezone
 
 import arrow
 from bson import ObjectId
@@ -56,13 +57,51 @@ def try_cast(v):
             return v
 
 
+#: Envelope key of the typed message format, messages without it are decoded using :func:`serialize`.
+#: Only tagged values are decoded as datetimes and ObjectIds in the typed format, strings are never
+#: casted like :func:`try_cast` does, so tasks must not rely on ``str`` ids being converted.
+#: It's written only when ``TYPED_CELERY_MESSAGES`` is enabled.
+TYPED_FORMAT_KEY = "__newsroom_json__"
+TYPED_FORMAT_VERSION = 1
+
+
+class TypedJSONEncoder(MongoJSONEncoder):
+    """Encode datetimes and ObjectIds as tagged objects, so these can be decoded without guessing"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            if o.tzinfo is None:
+                o = o.replace(tzinfo=timezone.utc)
+            return {"$date": o.isoformat()}
+        elif isinstance(o, ObjectId):
+            return {"$oid": str(o)}
+        return super().default(o)
+
+
+def decode_typed_object(o):
+    if len(o) == 1:
+        if "$date" in o:
+            return datetime.fromisoformat(o["$date"])
+        elif "$oid" in o:
+            return ObjectId(o["$oid"])
+    if o.get("kwargs") and isinstance(o["kwargs"], str):
+        o["kwargs"] = json.loads(o["kwargs"], object_hook=decode_typed_object)
+    return o
+
+
 def dumps(o):
     with newsroom.flask_app.app_context():
-        return MongoJSONEncoder().encode(o)
+        if not newsroom.flask_app.config.get("TYPED_CELERY_MESSAGES"):
+            return MongoJSONEncoder().encode(o)
+        return TypedJSONEncoder().encode({TYPED_FORMAT_KEY: TYPED_FORMAT_VERSION, "body": o})
 
 
 def loads(s):
-    o = json.loads(s)
+    o = json.loads(s, object_hook=decode_typed_object)
+    if isinstance(o, dict) and o.get(TYPED_FORMAT_KEY) == TYPED_FORMAT_VERSION:
+        return o["body"]
+
+    # message in the old format, sent before the typed format was introduced
     with newsroom.flask_app.app_context():
         return serialize(o)
 
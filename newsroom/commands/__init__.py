@@ -15,6 +15,7 @@ from .schema_migrate import schema_migrate  # noqa
 from .fix_topic_nested_filters import fix_topic_nested_filters  # noqa
 from .remove_expired_agenda import remove_expired_agenda  # noqa
 from .scheduled_notifications import send_scheduled_notifications  # noqa
+from .topics_percolator import rebuild_topics_percolator  # noqa
 
 from newsroom.celery_app import celery
 
@@ -12,18 +12,30 @@ from .manager import app, manager
 @manager.option("-c", "--collection", dest="collection", default=None)
 @manager.option("-t", "--timestamp", dest="timestamp", default=None)
 @manager.option("-d", "--direction", dest="direction", choices=["older", "newer"], default="older")
-def index_from_mongo_period(hours, collection, timestamp, direction):
+@manager.option("-w", "--workers", dest="workers", type=int, default=None)
+@manager.option("-r", "--resume", dest="resume", action="store_true", default=False)
+def index_from_mongo_period(hours, collection, timestamp, direction, workers, resume):
     """
     It allows to reindex up to a certain period.
+
+    Documents are indexed using ``--workers`` processes (``REINDEX_WORKERS`` config by default),
+    use ``--resume`` to continue previously interrupted indexing.
+
+    Example:
+    ::
+
+        $ python manage.py index_from_mongo_period --collection=items --workers=8
+        $ python manage.py index_from_mongo_period --collection=items --resume
+
     """
     print("Checking if elastic index exists, a new one will be created if not")
     app.data.init_elastic(app)
     print("Elastic index check has been completed")
 
     if timestamp:
-        index_elastic_from_mongo_from_timestamp(collection, timestamp, direction)
+        index_elastic_from_mongo_from_timestamp(collection, timestamp, direction, workers=workers, resume=resume)
     else:
-        index_elastic_from_mongo(hours=hours, collection=collection)
+        index_elastic_from_mongo(hours=hours, collection=collection, workers=workers, resume=resume)
 
 
 @manager.option("--from", "-f", dest="collection_name")
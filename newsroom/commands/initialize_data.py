@@ -8,6 +8,7 @@ from apps.prepopulate.app_initialize import (
     AppInitializeWithDataCommand as _AppInitializeWithDataCommand,
 )
 
+from newsroom import directory
 from .manager import app, manager
 from .elastic_rebuild import elastic_rebuild
 
@@ -65,6 +66,7 @@ class AppInitializeWithDataCommand(_AppInitializeWithDataCommand):
                 for path in data_paths:
                     if path.joinpath(file_name).exists():
                         self.import_file(name, path, file_name, index_params, do_patch, force)
+                        directory.mark_reload(name)
                         break
             except KeyError:
                 continue
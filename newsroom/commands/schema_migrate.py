@@ -1,7 +1,7 @@
 from flask import current_app as app
 from superdesk.lock import lock, unlock
-from superdesk.commands.rebuild_elastic_index import RebuildElasticIndex
 from newsroom import SCHEMA_VERSIONS
+from newsroom.reindex import rebuild_index_from_mongo
 from .manager import manager
 
 
@@ -18,6 +18,8 @@ def schema_migrate(resource_name=None):
     Current version is read from settings and fallbacks to newsroom.SCHEMA_VERSION[``resource``],
     so that you can avoid migration via settings file if needed.
 
+    Index is rebuilt from mongo, if interrupted it continues from the last indexed documents on next run.
+
     Example:
     ::
 
@@ -43,7 +45,7 @@ def _resource_schema_migrate(resource: str):
 
     if resource_schema_version < newsroom_schema_version:
         print(f"Update {resource} schema from version {resource_schema_version} to {newsroom_schema_version}")
-        RebuildElasticIndex().run("items" if resource == "wire" else resource)
+        rebuild_index_from_mongo("items" if resource == "wire" else resource)
         set_schema_version(resource, newsroom_schema_version)
     else:
         print(f"Resource {resource} already at version {resource_schema_version}")
@@ -0,0 +1,21 @@
+from newsroom.topics.percolator import rebuild_percolator
+
+from .manager import manager
+
+
+@manager.command
+def rebuild_topics_percolator():
+    """Re-create the topics percolator indexes and re-compile the queries of all subscribed topics
+
+    Example:
+    ::
+
+        $ python manage.py rebuild_topics_percolator
+
+    """
+
+    print("Rebuilding topics percolator")
+    failed = rebuild_percolator()
+    if failed:
+        print(f"Failed to compile {failed} topic(s), see logs for details")
+    print("Topics percolator rebuilt")
@@ -8,6 +8,9 @@ import newsroom
 from newsroom.companies.utils import get_company_section_names, get_company_product_ids
 from newsroom.products.types import PRODUCT_TYPES
 from newsroom.signals import company_create
+from newsroom.topics import percolator
+from newsroom import directory
+from newsroom.auth import invalidate_identity
 
 
 class CompaniesResource(newsroom.Resource):
@@ -107,6 +110,22 @@ class CompaniesService(newsroom.Service):
             self.validate_auth_provider(doc)
             company_create.send(self, company=doc)
 
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed("companies", [doc["_id"] for doc in docs])
+
+    def update(self, id, updates, original):
+        res = super().update(id, updates, original)
+        directory.mark_changed("companies", [id])
+        invalidate_identity("companies", [id])
+        return res
+
+    def system_update(self, id, updates, original, **kwargs):
+        res = super().system_update(id, updates, original, **kwargs)
+        directory.mark_changed("companies", [id])
+        invalidate_identity("companies", [id])
+        return res
+
     def on_update(self, updates, original):
         self.validate_auth_provider(updates)
         if "sections" in updates or "products" in updates:
@@ -146,8 +165,16 @@ class CompaniesService(newsroom.Service):
                 }
                 user_service.patch(user[config.ID_FIELD], updates=user_updates)
 
+        if percolator.is_percolator_enabled() and percolator.COMPANY_FIELDS.intersection(updates.keys()):
+            percolator.update_topics_percolator.delay({"company": original["_id"]})
+
     def on_deleted(self, doc):
         app.cache.delete(str(doc["_id"]))
+        directory.mark_changed("companies", [doc["_id"]])
+        invalidate_identity("companies", [doc["_id"]])
+
+        if percolator.is_percolator_enabled():
+            percolator.update_topics_percolator.delay({"company": doc["_id"]})
 
     def validate_auth_provider(self, company):
         supported_provider_ids = [provider["_id"] for provider in app.config["AUTH_PROVIDERS"]]
@@ -0,0 +1,183 @@
+"""Dashboard cache
+===============
+
+Cache of the dashboard items (per company home and public dashboard), which are invalidated
+on every push of a new item or change of the dashboard cards.
+
+Instead of deleting each cached key, all entries are tagged with a generation number stored in Redis,
+and invalidation only increments it, see :func:`invalidate_dashboard_caches`.
+
+Entries from previous generations, or older than their timeout, are kept for another
+``DASHBOARD_CACHE_STALE_TIMEOUT`` seconds. When such entry is requested only the worker which gets the rebuild
+lock for the key builds it again, the others keep serving the stale value until the rebuild is done.
+
+Hits, stale hits, misses and rebuilds are counted per process and added to the ``STATS_KEY`` Redis hash
+every ``DASHBOARD_CACHE_STATS_INTERVAL`` seconds, so the totals from all workers are logged
+and available via :meth:`DashboardCache.get_stats`.
+"""
+
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app as app
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+#: Redis counter used to tag the cached entries
+GENERATION_KEY = "newsroom:dashboard_cache:generation"
+
+#: Redis hash with the cache stats of all workers
+STATS_KEY = "newsroom:dashboard_cache:stats"
+
+STATS_NAMES = ("hit", "stale", "miss", "rebuild")
+
+#: Time in seconds after which the rebuild lock expires, in case the worker holding it fails
+REBUILD_LOCK_TIMEOUT = 60
+
+# Only release the lock if it's still held by this worker
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def get_lock_key(key: str) -> str:
+    return f"newsroom:dashboard_cache:lock:{key}"
+
+
+class DashboardCache:
+    def __init__(self):
+        self.stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = dict.fromkeys(STATS_NAMES, 0)
+        self.flushed_at = time.monotonic()
+
+    def count(self, name: str) -> None:
+        with self.stats_lock:
+            self.stats[name] += 1
+            flush = time.monotonic() - self.flushed_at >= app.config.get("DASHBOARD_CACHE_STATS_INTERVAL", 60)
+
+        if flush:
+            totals = self.flush_stats()
+            if totals is not None:
+                logger.info("Dashboard cache stats %s", totals)
+
+    def flush_stats(self) -> Optional[Dict[str, int]]:
+        """Adds the stats counted since the last flush to Redis, returns the totals of all workers"""
+
+        with self.stats_lock:
+            stats, self.stats = self.stats, dict.fromkeys(STATS_NAMES, 0)
+            self.flushed_at = time.monotonic()
+
+        try:
+            pipe = app.redis.pipeline()
+            for name, value in stats.items():
+                if value:
+                    pipe.hincrby(STATS_KEY, name, value)
+            pipe.hgetall(STATS_KEY)
+            totals = pipe.execute()[-1]
+        except RedisError:
+            logger.warning("Failed to store dashboard cache stats")
+            with self.stats_lock:
+                for name, value in stats.items():
+                    self.stats[name] += value
+            return None
+
+        totals = {(name.decode() if isinstance(name, bytes) else name): int(value) for name, value in totals.items()}
+        return {name: totals.get(name, 0) for name in STATS_NAMES}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns the stats of all workers, or of this one only if Redis is not available"""
+
+        totals = self.flush_stats()
+        if totals is None:
+            with self.stats_lock:
+                return self.stats.copy()
+        return totals
+
+    def get_generation(self) -> Optional[int]:
+        try:
+            return int(app.redis.get(GENERATION_KEY) or 0)
+        except RedisError:
+            logger.warning("Failed to read dashboard cache generation")
+            return None
+
+    def get(self, key: str, build: Callable[[], Any], timeout: int) -> Any:
+        """Returns the cached value for the key, calling ``build`` if it's missing or outdated"""
+
+        entry = app.cache.get(key)
+        if not isinstance(entry, dict) or "generation" not in entry:
+            # missing or cached before using generations
+            entry = None
+
+        generation = self.get_generation()
+
+        if entry and entry["generation"] == generation and entry["expires"] > time.time():
+            self.count("hit")
+            return entry["value"]
+
+        if generation is None:
+            # without redis there is no generation nor lock, just use the timeout
+            if entry and entry["expires"] > time.time():
+                self.count("hit")
+                return entry["value"]
+            self.count("miss")
+            return self.build(key, build, timeout, generation)
+
+        lock_key = get_lock_key(key)
+        token = uuid.uuid4().hex
+        try:
+            locked = app.redis.set(lock_key, token, nx=True, px=REBUILD_LOCK_TIMEOUT * 1000)
+        except RedisError:
+            locked = True
+
+        if not locked:
+            if entry:
+                self.count("stale")
+                return entry["value"]
+            # nothing to serve yet, build it without storing to let the lock holder finish
+            self.count("miss")
+            return build()
+
+        self.count("miss" if not entry else "stale")
+        try:
+            return self.build(key, build, timeout, generation)
+        finally:
+            try:
+                app.redis.register_script(RELEASE_LOCK_SCRIPT)(keys=[lock_key], args=[token])
+            except RedisError:
+                pass
+
+    def build(self, key: str, build: Callable[[], Any], timeout: int, generation: Optional[int]) -> Any:
+        value = build()
+        self.count("rebuild")
+        entry = {"value": value, "generation": generation, "expires": time.time() + timeout}
+        app.cache.set(key, entry, timeout=timeout + app.config.get("DASHBOARD_CACHE_STALE_TIMEOUT", 600))
+        return value
+
+    def invalidate(self) -> None:
+        """Mark all entries as outdated"""
+
+        try:
+            app.redis.incr(GENERATION_KEY)
+        except RedisError:
+            logger.exception("Failed to update dashboard cache generation")
+
+
+def get_dashboard_cache() -> DashboardCache:
+    if "newsroom_dashboard_cache" not in app.extensions:
+        app.extensions["newsroom_dashboard_cache"] = DashboardCache()
+    return app.extensions["newsroom_dashboard_cache"]
+
+
+def get_cached(key: str, build: Callable[[], Any], timeout: int) -> Any:
+    return get_dashboard_cache().get(key, build, timeout)
+
+
+def invalidate_dashboard_caches() -> None:
+    get_dashboard_cache().invalidate()
@@ -0,0 +1,213 @@
+"""Users & Companies directory
+============================
+
+Process wide, in memory copy of the enabled users and companies, used when sending notifications,
+of the News API tokens used to authenticate API requests, and of the configuration resources
+(products, navigations, section filters, cards and ui config) used for every search.
+
+Instead of reloading whole collections for every item, each process keeps the last seen
+change version, and on access only reloads the documents changed since then.
+The version is a counter stored in Redis, incremented together with the ids of the changed
+documents by the resource services, see :func:`mark_changed`.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from flask import current_app as app
+from redis.exceptions import RedisError
+
+import superdesk
+
+logger = logging.getLogger(__name__)
+
+#: Number of changed ids kept in Redis, processes further behind will reload the whole collection
+MAX_CHANGES = 10000
+
+#: Reload the whole collection after this many seconds, in case some changes were not recorded
+MAX_AGE = 3600
+
+# Atomically increment the version and store it as the score of all the changed ids
+MARK_CHANGED_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+for _, _id in ipairs(ARGV) do
+    redis.call('ZADD', KEYS[2], version, _id)
+end
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -%d)
+return version
+""" % (
+    MAX_CHANGES + 1
+)
+
+#: Resources with a directory, and the lookup of the documents kept in memory
+DIRECTORY_LOOKUPS: Dict[str, Dict[str, Any]] = {
+    "users": {"is_enabled": True},
+    "companies": {"is_enabled": True},
+    "news_api_tokens": {},
+    "products": {},
+    "navigations": {},
+    "section_filters": {},
+    "cards": {},
+    "ui_config": {},
+}
+
+#: Changed id used to reload the whole collection, when it's not known which documents were changed
+RELOAD_ALL = "*"
+
+
+def get_version_key(resource: str) -> str:
+    return f"newsroom:directory:{resource}:version"
+
+
+def get_changes_key(resource: str) -> str:
+    return f"newsroom:directory:{resource}:changes"
+
+
+class ResourceDirectory:
+    """In memory copy of the enabled documents of a resource, indexed by ``str(_id)``"""
+
+    def __init__(self, resource: str, lookup: Optional[Dict[str, Any]] = None):
+        self.resource = resource
+        self.lookup = lookup if lookup is not None else {"is_enabled": True}
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self.lock = threading.Lock()
+
+    def find(self, lookup: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        return superdesk.get_resource_service(self.resource).find(where={"$and": [self.lookup, lookup]})
+
+    def get_docs(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the enabled documents, refreshing the ones changed since the last call
+
+        The documents are shared by all requests, return copies of these to callers.
+        """
+
+        try:
+            with self.lock:
+                self.refresh()
+        except RedisError:
+            logger.warning("Failed to read %s directory version, loading from database", self.resource)
+            return {str(doc["_id"]): doc for doc in self.find({})}
+
+        return self.docs
+
+    def get_index(self, field: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Returns the documents grouped by ``str`` of the field value, or of each value for list fields"""
+
+        docs = self.get_docs()
+        if docs is not self.docs:
+            # loaded from database
+            return build_index(docs, field)
+
+        with self.lock:
+            if field not in self.indexes:
+                self.indexes[field] = build_index(self.docs, field)
+            return self.indexes[field]
+
+    def refresh(self) -> None:
+        version = int(app.redis.get(get_version_key(self.resource)) or 0)
+        expired = time.monotonic() - self.loaded_at > MAX_AGE
+        if version == self.version and not expired:
+            return
+
+        changed_ids = self.get_changed_ids(version) if not expired else None
+        if changed_ids is None:
+            self.reload()
+        else:
+            self.update(changed_ids)
+
+        logger.debug("%s directory updated from version %s to %s", self.resource, self.version, version)
+        self.version = version
+
+    def get_changed_ids(self, version: int) -> Optional[List[str]]:
+        """Returns the ids changed since the last refresh, or ``None`` if it's not possible to tell"""
+
+        if self.version is None or version < self.version:
+            # first load or the counter has been reset
+            return None
+
+        changes_key = get_changes_key(self.resource)
+        oldest = app.redis.zrange(changes_key, 0, 0, withscores=True)
+        if oldest and oldest[0][1] > self.version + 1:
+            # some of the changes were already removed from the list
+            return None
+
+        changed_ids = app.redis.zrangebyscore(changes_key, self.version + 1, version)
+        changed_ids = [_id.decode() if isinstance(_id, bytes) else _id for _id in changed_ids]
+        return changed_ids if RELOAD_ALL not in changed_ids else None
+
+    def reload(self) -> None:
+        self.docs = {str(doc["_id"]): doc for doc in self.find({})}
+        self.indexes = {}
+        self.loaded_at = time.monotonic()
+
+    def update(self, changed_ids: List[str]) -> None:
+        if not changed_ids:
+            return
+
+        lookup_ids: List[Any] = changed_ids + [ObjectId(_id) for _id in changed_ids if ObjectId.is_valid(_id)]
+        updated = {str(doc["_id"]): doc for doc in self.find({"_id": {"$in": lookup_ids}})}
+
+        docs = self.docs.copy()
+        for _id in changed_ids:
+            if _id in updated:
+                docs[_id] = updated[_id]
+            else:
+                # deleted or disabled
+                docs.pop(_id, None)
+        self.docs = docs
+        self.indexes = {}
+
+
+def build_index(docs: Dict[str, Dict[str, Any]], field: str) -> Dict[str, List[Dict[str, Any]]]:
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    for doc in docs.values():
+        values = doc.get(field)
+        if values is None:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            index.setdefault(str(value), []).append(doc)
+    return index
+
+
+def is_directory_enabled() -> bool:
+    """Directories are not used in tests by default, as these insert data bypassing the services
+
+    Set ``DIRECTORY_ENABLED`` config to override it.
+    """
+
+    enabled = app.config.get("DIRECTORY_ENABLED")
+    return not app.testing if enabled is None else bool(enabled)
+
+
+def get_directory(resource: str) -> ResourceDirectory:
+    directories: Dict[str, ResourceDirectory] = app.extensions.setdefault("newsroom_directory", {})
+    if resource not in directories:
+        directories[resource] = ResourceDirectory(resource, DIRECTORY_LOOKUPS.get(resource))
+    return directories[resource]
+
+
+def mark_changed(resource: str, ids: List[Any]) -> None:
+    """Increment the resource version, so the directories reload the provided documents"""
+
+    if resource not in DIRECTORY_LOOKUPS or not ids:
+        return
+
+    try:
+        app.redis.register_script(MARK_CHANGED_SCRIPT)(
+            keys=[get_version_key(resource), get_changes_key(resource)],
+            args=[str(_id) for _id in ids],
+        )
+    except RedisError:
+        logger.exception("Failed to update %s directory version", resource)
+
+
+def mark_reload(resource: str) -> None:
+    """Increment the resource version, so the directories reload the whole collection"""
+
+    mark_changed(resource, [RELOAD_ALL])
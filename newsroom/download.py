@@ -0,0 +1,100 @@
+"""Streaming downloads
+=====================
+
+Helpers to write download archives and CSV exports directly to the response, so the memory used
+doesn't depend on the number or size of the downloaded items.
+"""
+
+import io
+import csv
+import zlib
+import zipfile
+from typing import Any, BinaryIO, Iterable, Iterator, Tuple, Union
+
+import flask
+
+#: Size of the chunks read from media files and sent to the client
+CHUNK_SIZE = 256 * 1024
+
+
+class StreamBuffer(io.RawIOBase):
+    """Write only, non seekable buffer, which is emptied every time its content is read"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+def read_chunks(file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read the file (GridFS or S3 media) in chunks, instead of loading it to memory"""
+
+    return iter(lambda: file.read(chunk_size), b"")
+
+
+def stream_zip(entries: Iterable[Tuple[str, Iterable[Union[bytes, str]]]]) -> Iterator[bytes]:
+    """Generate a zip archive of the provided ``(filename, content chunks)`` entries
+
+    The entries are consumed one by one, the archive is generated as these are produced.
+    ``str`` chunks are utf-8 encoded.
+    """
+
+    buffer = StreamBuffer()
+    zf = zipfile.ZipFile(buffer, mode="w")
+    try:
+        for filename, content in entries:
+            with zf.open(filename, mode="w", force_zip64=True) as entry:
+                for chunk in content:
+                    entry.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+                    if buffer.size >= CHUNK_SIZE:
+                        yield buffer.pop()
+            yield buffer.pop()
+    finally:
+        zf.close()
+    yield buffer.pop()
+
+
+def stream_csv(rows: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """Generate utf-8 encoded CSV of the provided rows, in chunks of about ``CHUNK_SIZE``"""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, dialect="excel")
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_gzip(content: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress the content chunks using gzip, as these are produced"""
+
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in content:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_response(content: Iterable[bytes], mimetype: str, attachment_filename: str) -> flask.Response:
+    response = flask.current_app.response_class(flask.stream_with_context(content), mimetype=mimetype)
+    response.headers.set("Content-Disposition", "attachment", filename=attachment_filename)
+    return response
@@ -1,20 +1,26 @@
+import time
 import base64
+import smtplib
+import threading
 import email.policy as email_policy
 
+from contextlib import ExitStack, contextmanager
 from lxml import etree
 from typing import List, Optional, Dict, Any, Union
 from typing_extensions import TypedDict
 
+from celery.exceptions import SoftTimeLimitExceeded
 from superdesk import get_resource_service
-from flask import current_app, render_template, url_for
+from flask import current_app, g, has_app_context, render_template, url_for
 from flask_babel import gettext
-from flask_mail import Attachment, Message
+from flask_mail import Attachment, Connection, Message
 from jinja2 import TemplateNotFound
 
 from newsroom.gettext import get_user_timezone
 from newsroom.types import Company, User, Country, CompanyType
 from newsroom.auth import get_company
 from newsroom.celery_app import celery
+from newsroom.email_attachments import get_email_attachment
 from newsroom.template_loaders import template_locale
 from newsroom.utils import (
     get_agenda_dates,
@@ -80,8 +86,16 @@ def handle_long_lines_html(html):
     return etree.tostring(parsed, method="html", encoding="unicode")
 
 
-@celery.task(soft_time_limit=120)
-def _send_email(to, subject, text_body, html_body=None, sender=None, sender_name=None, attachments_info=None):
+def get_email_message(
+    to,
+    subject,
+    text_body,
+    html_body=None,
+    sender=None,
+    sender_name=None,
+    attachments_info=None,
+    attachments_cache: Optional[Dict[str, bytes]] = None,
+) -> NewsroomMessage:
     if attachments_info is None:
         attachments_info = []
 
@@ -94,7 +108,10 @@ def _send_email(to, subject, text_body, html_body=None, sender=None, sender_name
     decoded_attachments = []
     for a in attachments_info:
         try:
-            content = base64.b64decode(a["file"])
+            if a.get("media_id"):
+                content = get_email_attachment(a["media_id"], attachments_cache)
+            else:
+                content = base64.b64decode(a["file"])
             decoded_attachments.append(Attachment(a["file_name"], a["content_type"], data=content))
         except Exception as e:
             logger.error("Error attaching {} file to mail. Receipient(s): {}. Error: {}".format(a["file_desc"], to, e))
@@ -102,10 +119,158 @@ def _send_email(to, subject, text_body, html_body=None, sender=None, sender_name
     msg = NewsroomMessage(subject=subject, sender=sender, recipients=to, attachments=decoded_attachments)
     msg.body = text_body
     msg.html = html_body
+    return msg
+
+
+@celery.task(soft_time_limit=120)
+def _send_email(to, subject, text_body, html_body=None, sender=None, sender_name=None, attachments_info=None):
+    msg = get_email_message(to, subject, text_body, html_body, sender, sender_name, attachments_info)
     app = current_app._get_current_object()
     return app.mail.send(msg)
 
 
+class PooledMailConnection:
+    """SMTP connection kept open for sending many messages from a worker
+
+    Reconnects after ``MAIL_CONNECTION_MAX_EMAILS`` messages, after being idle
+    for ``MAIL_CONNECTION_IDLE_TIMEOUT`` seconds or after an error,
+    and sends at most ``MAIL_RATE_LIMIT`` messages per second.
+    """
+
+    def __init__(self, mail, max_emails: int, idle_timeout: int, rate_limit: float):
+        self.mail = mail
+        self.max_emails = max_emails
+        self.idle_timeout = idle_timeout
+        self.interval = 1.0 / rate_limit if rate_limit else 0
+        self.lock = threading.Lock()
+        self.stack: Optional[ExitStack] = None
+        self.connection: Optional[Connection] = None
+        self.sent = 0
+        self.last_used = 0.0
+        self.next_send = 0.0
+
+    def get_connection(self) -> Connection:
+        if self.connection is not None and (
+            (self.max_emails and self.sent >= self.max_emails) or time.monotonic() - self.last_used > self.idle_timeout
+        ):
+            self.close()
+
+        if self.connection is None:
+            self.stack = ExitStack()
+            self.connection = self.stack.enter_context(self.mail.connect())
+            self.sent = 0
+        return self.connection
+
+    def throttle(self) -> None:
+        now = time.monotonic()
+        if self.next_send > now:
+            time.sleep(self.next_send - now)
+        self.next_send = max(now, self.next_send) + self.interval
+
+    def send(self, msg: Message) -> None:
+        with self.lock:
+            self.throttle()
+            try:
+                self.get_connection().send(msg)
+            except Exception:
+                # the connection state is unknown, use a new one for next message
+                self.close()
+                raise
+            self.sent += 1
+            self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        stack, self.stack, self.connection = self.stack, None, None
+        if stack is not None:
+            try:
+                stack.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+
+def get_mail_connection() -> PooledMailConnection:
+    """Returns SMTP connection shared by all batches sent from this worker"""
+
+    if "newsroom_mail_connection" not in current_app.extensions:
+        current_app.extensions["newsroom_mail_connection"] = PooledMailConnection(
+            current_app.mail,
+            max_emails=current_app.config.get("MAIL_CONNECTION_MAX_EMAILS", 100),
+            idle_timeout=current_app.config.get("MAIL_CONNECTION_IDLE_TIMEOUT", 30),
+            rate_limit=current_app.config.get("MAIL_RATE_LIMIT", 0),
+        )
+    return current_app.extensions["newsroom_mail_connection"]
+
+
+def is_permanent_error(error: Exception) -> bool:
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+@celery.task(soft_time_limit=600)
+def _send_email_batch(messages: List[Dict[str, Any]]) -> int:
+    """Send messages using pooled connection, retrying each failed message
+
+    :param messages: List of :func:`send_email` kwargs
+    :return: Number of sent messages
+    """
+
+    connection = get_mail_connection()
+    retries = current_app.config.get("MAIL_SEND_RETRIES", 3)
+    attachments: Dict[str, bytes] = {}
+    sent = 0
+
+    for kwargs in messages:
+        msg = get_email_message(**kwargs, attachments_cache=attachments)
+        for attempt in range(retries + 1):
+            try:
+                connection.send(msg)
+                sent += 1
+                break
+            except (smtplib.SMTPException, OSError) as error:
+                if attempt == retries or is_permanent_error(error):
+                    logger.exception("Failed to send email. Recipient(s): {}".format(kwargs["to"]))
+                    break
+                logger.warning("Failed to send email, retrying. Error: {}".format(error))
+                time.sleep(2**attempt)
+            except SoftTimeLimitExceeded:
+                # stop sending, the rest of the batch would be killed by the hard time limit
+                raise
+            except Exception:
+                logger.exception("Failed to send email. Recipient(s): {}".format(kwargs["to"]))
+                break
+
+    return sent
+
+
+def send_email_batch(messages: List[Dict[str, Any]]) -> None:
+    if messages:
+        _send_email_batch.apply_async(kwargs={"messages": messages})
+
+
+@contextmanager
+def email_batch():
+    """Collect emails sent within this context and send them in batches of ``MAIL_BATCH_SIZE``
+
+    Usage::
+
+        with email_batch():
+            for user in users:
+                send_user_email(user, template="...")
+    """
+    if getattr(g, "email_batch", None) is not None:
+        # already batching
+        yield
+        return
+
+    g.email_batch = []
+    try:
+        yield
+    finally:
+        messages, g.email_batch = g.email_batch, None
+        send_email_batch(messages)
+
+
 def send_email(to, subject, text_body, html_body=None, sender=None, sender_name=None, attachments_info=None):
     """
     Sends the email
@@ -126,6 +291,15 @@ def send_email(to, subject, text_body, html_body=None, sender=None, sender_name=
         "sender_name": sender_name or current_app.config.get("EMAIL_DEFAULT_SENDER_NAME"),
         "attachments_info": attachments_info,
     }
+
+    batch = g.get("email_batch") if has_app_context() else None
+    if batch is not None:
+        batch.append(kwargs)
+        if len(batch) >= current_app.config.get("MAIL_BATCH_SIZE", 100):
+            send_email_batch(batch[:])
+            batch.clear()
+        return
+
     _send_email.apply_async(kwargs=kwargs)
 
 
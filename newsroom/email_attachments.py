@@ -0,0 +1,58 @@
+"""Email attachments
+=================
+
+Files attached to emails sent to many users are stored once in media storage and the email tasks
+only carry the reference, instead of a base64 encoded copy of the file for every message.
+
+Stored attachments are not served via ``/assets`` and are removed after ``EMAIL_ATTACHMENTS_EXPIRY_HOURS``.
+"""
+
+from typing import Dict, Optional
+
+from flask import current_app as app
+
+from newsroom.upload import ASSETS_RESOURCE, remove_expired_media
+
+#: Media storage folder for attachments, not served via ``/assets``
+ATTACHMENTS_FOLDER = "email_attachments"
+
+
+def store_email_attachment(content, filename: str, content_type: str) -> str:
+    """Store attachment content, returns media id to use in ``attachments_info``
+
+    :param content: File like object or bytes
+    :param filename: Attachment filename
+    :param content_type: Attachment mime type
+    """
+    media_id = app.media.put(
+        content,
+        filename=filename,
+        content_type=content_type,
+        resource=ASSETS_RESOURCE,
+        folder=ATTACHMENTS_FOLDER,
+    )
+    return str(media_id)
+
+
+def get_email_attachment(media_id: str, cache: Optional[Dict[str, bytes]] = None) -> bytes:
+    """Read stored attachment content
+
+    :param media_id: Media id returned by :func:`store_email_attachment`
+    :param cache: Content of attachments already read, so it's read once for all messages in a batch
+    """
+    if cache is not None and media_id in cache:
+        return cache[media_id]
+
+    media_file = app.media.get(media_id, ASSETS_RESOURCE)
+    if not media_file:
+        raise FileNotFoundError("Email attachment {} not found".format(media_id))
+
+    content = media_file.read()
+    if cache is not None:
+        cache[media_id] = content
+    return content
+
+
+def remove_expired_email_attachments() -> int:
+    """Remove attachments stored before ``EMAIL_ATTACHMENTS_EXPIRY_HOURS``"""
+    return remove_expired_media(ATTACHMENTS_FOLDER)
@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import hashlib
 import logging
 import newsroom
 
-from flask import render_template_string, current_app
+from flask import current_app
+from jinja2 import Template
 from flask_babel import gettext
 from werkzeug.exceptions import BadRequest, NotFound
 from eve.utils import config
@@ -13,6 +15,8 @@ from superdesk.services import CacheableService
 logger = logging.getLogger(__name__)
 RESOURCE = "email_templates"
 
+SubjectKey = Tuple[str, str, str]
+
 
 class EmailTemplatesResource(newsroom.Resource):
     endpoint_name = RESOURCE
@@ -64,6 +68,7 @@ DEFAULT_SUBJECTS = {
     "additional_product_seat_request_email": "New Product Seat request",
     "scheduled_notification_topic_matches_email": "Your {{ app_name }} daily digest at {{ date | notification_time }}",
     "scheduled_notification_no_matches_email": "Your {{ app_name }} daily digest at {{ date | notification_time }}",
+    "report_export_email": "{{ app_name }} report export",
     "test_template": "This templates is for testing",
 }
 
@@ -104,19 +109,60 @@ class EmailTemplatesService(CacheableService):
             email["subject"].setdefault("default", DEFAULT_SUBJECTS[email_id])
             email["subject"].setdefault("translations", {})
 
-    def get_translated_subject(self, email_id: str, language_code: Optional[str] = None, **kwargs) -> str:
-        language_code = language_code or current_app.config["DEFAULT_LANGUAGE"]
-        email = self.get_cached_by_id(email_id)
+    def on_created(self, docs):
+        super().on_created(docs)
+        for doc in docs:
+            self.clear_compiled_subjects(doc["_id"])
 
-        try:
-            subject = email["subject"]["translations"][language_code.lower()]
-        except (KeyError, AttributeError):
-            subject = email["subject"]["default"]
+    def on_updated(self, updates, original):
+        super().on_updated(updates, original)
+        self.clear_compiled_subjects(original["_id"])
+
+    def on_replaced(self, document, original):
+        super().on_replaced(document, original)
+        self.clear_compiled_subjects(original["_id"])
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        self.clear_compiled_subjects(doc["_id"])
+
+    def get_compiled_subjects(self) -> Dict[SubjectKey, Template]:
+        """Compiled subject templates of the current app, keyed by email id, language and subject hash"""
+
+        return current_app.extensions.setdefault("newsroom_email_subjects", {})
+
+    def clear_compiled_subjects(self, email_id: str) -> None:
+        compiled = self.get_compiled_subjects()
+        for key in [key for key in compiled if key[0] == email_id]:
+            compiled.pop(key, None)
+
+    def get_subjects(self, email_id: str) -> Tuple[Dict[str, str], str]:
+        """Returns subject translations and default subject, without enhancing the cached item"""
+
+        email = super().get_cached_by_id(email_id) or {}
+        subject = email.get("subject") or {}
+        return subject.get("translations") or {}, subject.get("default") or DEFAULT_SUBJECTS[email_id]
+
+    def render_subject(self, email_id: str, language: str, subject: str, **kwargs) -> str:
+        compiled = self.get_compiled_subjects()
+        key = (email_id, language, hashlib.sha1(subject.encode()).hexdigest())
+        template = compiled.get(key)
+        if template is None:
+            template = compiled[key] = current_app.jinja_env.from_string(subject)
+
+        # same context as ``render_template_string``
+        current_app.update_template_context(kwargs)
+        return template.render(kwargs)
+
+    def get_translated_subject(self, email_id: str, language_code: Optional[str] = None, **kwargs) -> str:
+        language_code = (language_code or current_app.config["DEFAULT_LANGUAGE"]).lower()
+        translations, default = self.get_subjects(email_id)
+        subject = translations.get(language_code) or default
 
         try:
-            return render_template_string(subject, **kwargs)
+            return self.render_subject(email_id, language_code, subject, **kwargs)
         except Exception as ex:
-            if subject == email["subject"]["default"]:
+            if subject == default:
                 logger.error("Failed to render email subject")
                 logger.exception(ex)
                 raise
@@ -125,8 +171,7 @@ class EmailTemplatesService(CacheableService):
             # If the rendering fails, assume it is an error with the translation template
             # and fallback to using the default template
             logger.warning("Failed to render custom email subject, reverting to default instead")
-            subject = email["subject"]["default"]
-            return render_template_string(subject, **kwargs)
+            return self.render_subject(email_id, "default", default, **kwargs)
         except Exception as ex:
             logger.error("Failed to render email subject using default template")
             logger.exception(ex)
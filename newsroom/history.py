@@ -11,6 +11,7 @@ from eve.utils import ParsedRequest
 import newsroom
 from newsroom.utils import get_json_or_400
 from newsroom.auth import get_user
+from newsroom.search.scroll import scroll_search
 
 blueprint = Blueprint("history", __name__)
 
@@ -41,10 +42,18 @@ class HistoryResource(newsroom.Resource):
 
 class HistoryService(newsroom.Service):
     def create(self, docs, action, user, section="wire", **kwargs):
-        now = utcnow()
+        for doc in self.get_history_docs(docs, action, user, section):
+            try:
+                super().create([doc])
+            except (werkzeug.exceptions.Conflict, pymongo.errors.BulkWriteError):
+                continue
 
-        def transform(item):
-            return {
+    def get_history_docs(self, docs, action, user, section="wire"):
+        """Returns the history records of the action done by the user on the provided items"""
+
+        now = utcnow()
+        return [
+            {
                 "action": action,
                 "versioncreated": now,
                 "user": user["_id"],
@@ -53,12 +62,8 @@ class HistoryService(newsroom.Service):
                 "version": item.get("version", item.get("_current_version")),
                 "section": section,
             }
-
-        for doc in docs:
-            try:
-                super().create([transform(doc)])
-            except (werkzeug.exceptions.Conflict, pymongo.errors.BulkWriteError):
-                continue
+            for item in docs
+        ]
 
     def create_history_record(self, items, action, user, section):
         self.create(items, action, user, section)
@@ -73,15 +78,18 @@ class HistoryService(newsroom.Service):
         return super().get(req, None)
 
     def fetch_history(self, query, all=False):
-        results = self.query_items(query)
-        docs = results.docs
         if all:
-            while results.hits["hits"]["total"]["value"] > len(docs):
-                query["from"] = len(docs)
-                results = self.query_items(query)
-                docs.extend(results.docs)
+            # aggregations are not returned when fetching all records
+            return {"items": [doc for docs in self.scroll_history(query) for doc in docs], "hits": {}}
+
+        results = self.query_items(query)
+        return {"items": results.docs, "hits": results.hits}
+
+    def scroll_history(self, query):
+        """Yield pages of all the records matching the query, without the ``from`` limit"""
 
-        return {"items": docs, "hits": results.hits}
+        for results in scroll_search(self.datasource, query):
+            yield results.docs
 
 
 def get_history_users(item_ids, active_user_ids, active_company_ids, section, action):
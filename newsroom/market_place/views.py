@@ -20,8 +20,8 @@ from newsroom.utils import (
     get_entity_or_404,
     is_json_request,
     get_type,
-    query_resource,
 )
+from newsroom.cards import get_dashboard_cards
 from newsroom.notifications import push_user_notification
 
 
@@ -71,7 +71,7 @@ def get_home_page_data():
         "user": str(user["_id"]) if user else None,
         "company": str(user["company"]) if user and user.get("company") else None,
         "navigations": navigations,
-        "cards": list(query_resource("cards", lookup={"dashboard": SECTION_ID})),
+        "cards": get_dashboard_cards(SECTION_ID),
         "saved_items": get_bookmarks_count(user["_id"], SECTION_ID),
         "context": SECTION_ID,
         "home_page": True,
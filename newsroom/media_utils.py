@@ -1,9 +1,11 @@
 import io
 import logging
+from functools import lru_cache
 
 from PIL import Image, ImageEnhance
 from flask import current_app as app
 from newsroom.upload import ASSETS_RESOURCE
+from newsroom.celery_app import celery
 
 THUMBNAIL_SIZE = (640, 640)
 THUMBNAIL_QUALITY = 80
@@ -11,8 +13,8 @@ THUMBNAIL_QUALITY = 80
 logger = logging.getLogger(__name__)
 
 
-def store_image(image, filename=None, _id=None):
-    """Store the image to GridFs or AWS S3"""
+def put_image(image, filename=None, _id=None):
+    """Store the image to GridFs or AWS S3, returns the media id and the stored image"""
     binary = io.BytesIO()
     if image.mode != "RGB":
         image = image.convert("RGB")
@@ -28,7 +30,12 @@ def store_image(image, filename=None, _id=None):
     if not media_id:
         # media with the same id exists
         media_id = _id
-    binary.seek(0)
+    return media_id, image
+
+
+def store_image(image, filename=None, _id=None):
+    """Store the image to GridFs or AWS S3"""
+    media_id, image = put_image(image, filename=filename, _id=_id)
     return {
         "media": str(media_id),
         "href": app.upload_url(media_id),
@@ -38,10 +45,42 @@ def store_image(image, filename=None, _id=None):
     }
 
 
+def get_thumbnail_size(width, height):
+    """Get the size of the image resized to fit the ``THUMBNAIL_SIZE``, keeping the aspect ratio"""
+    ratio = min(THUMBNAIL_SIZE[0] / width, THUMBNAIL_SIZE[1] / height, 1)
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
 def get_thumbnail(image):
-    image = image.copy()
-    image.thumbnail(THUMBNAIL_SIZE)
-    return image
+    size = get_thumbnail_size(*image.size)
+    if size == image.size:
+        return image.copy()
+    return image.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+
+
+@lru_cache(maxsize=4)
+def load_watermark_image(path):
+    """Load the watermark image with the opacity applied, only once per process"""
+    with open(path, mode="rb") as watermark_binary:
+        watermark_image = Image.open(watermark_binary)
+        watermark_image.load()
+    set_opacity(watermark_image, 0.3)
+    return watermark_image
+
+
+@lru_cache(maxsize=32)
+def get_watermark_layer(path, size):
+    """Get the transparent layer with the watermark positioned for the given image size"""
+    watermark_image = load_watermark_image(path)
+    watermark_layer = Image.new("RGBA", size)
+    watermark_layer.paste(
+        watermark_image,
+        (
+            size[0] - watermark_image.size[0],
+            int((size[1] - watermark_image.size[1]) * 0.66),
+        ),
+    )
+    return watermark_layer
 
 
 def get_watermark(image):
@@ -50,18 +89,7 @@ def get_watermark(image):
         return image
     if image.mode != "RGBA":
         image = image.convert("RGBA")
-    with open(app.config["WATERMARK_IMAGE"], mode="rb") as watermark_binary:
-        watermark_image = Image.open(watermark_binary)
-        set_opacity(watermark_image, 0.3)
-        watermark_layer = Image.new("RGBA", image.size)
-        watermark_layer.paste(
-            watermark_image,
-            (
-                image.size[0] - watermark_image.size[0],
-                int((image.size[1] - watermark_image.size[1]) * 0.66),
-            ),
-        )
-
+    watermark_layer = get_watermark_layer(app.config["WATERMARK_IMAGE"], image.size)
     watermark = Image.alpha_composite(image, watermark_layer)
     return watermark.convert("RGB")
 
@@ -72,27 +100,68 @@ def set_opacity(image, opacity=1):
     image.putalpha(alpha)
 
 
+#: Functions generating the rendition variants from the source image
+RENDITION_VARIANTS = {
+    "thumbnail": get_thumbnail,
+    "watermark": get_watermark,
+}
+
+#: Functions computing the rendition variant size from the source image width and height
+RENDITION_VARIANT_SIZES = {
+    "thumbnail": get_thumbnail_size,
+    "watermark": lambda width, height: (width, height),
+}
+
+#: Renditions used for the thumbnails, in order of preference
+THUMBNAIL_SOURCE_RENDITIONS = ["4-3", "baseImage"]
+
+
+def get_rendition_id(media_id, name):
+    return "%s%s" % (media_id, name)
+
+
+def add_pending_rendition(picture, jobs, source, name, variant):
+    """Reference the rendition in the picture, and add it to the jobs generating it
+
+    The rendition id is based on the source media id, so the reference can be stored
+    before the rendition is generated. Its size is computed from the source size, when known.
+
+    :param jobs: Renditions to generate, indexed by source media id and rendition media id
+    """
+
+    media_id = get_rendition_id(source["media"], name)
+    picture["renditions"][name] = {
+        "media": media_id,
+        "href": app.upload_url(media_id),
+        "mimetype": "image/jpeg",
+    }
+    if source.get("width") and source.get("height"):
+        width, height = RENDITION_VARIANT_SIZES[variant](source["width"], source["height"])
+        picture["renditions"][name].update(width=width, height=height)
+    jobs.setdefault(source["media"], {})[media_id] = variant
+
+
+def add_preview_details_jobs(picture, jobs):
+    # add watermark to base/view images
+    for key in ["base", "view"]:
+        rendition = picture.get("renditions", {}).get("%sImage" % key)
+        if rendition and rendition.get("media"):
+            add_pending_rendition(picture, jobs, rendition, "_newsroom_%s" % key, "watermark")
+
+
+def schedule_renditions(jobs):
+    if jobs:
+        generate_picture_renditions.delay(jobs)
+
+
 def generate_preview_details_renditions(picture):
     """Generate preview and details rendition"""
     if not picture or not picture.get("renditions"):
         return
 
-    # add watermark to base/view images
-    for key in ["base", "view"]:
-        rendition = picture.get("renditions", {}).get("%sImage" % key)
-        if rendition:
-            binary = app.media.get(rendition["media"], resource=ASSETS_RESOURCE)
-            im = Image.open(binary)
-            watermark = get_watermark(im)
-            picture["renditions"].update(
-                {
-                    "_newsroom_%s"
-                    % key: store_image(
-                        watermark,
-                        _id="%s%s" % (rendition["media"], "_newsroom_%s" % key),
-                    )
-                }
-            )
+    jobs = {}
+    add_preview_details_jobs(picture, jobs)
+    schedule_renditions(jobs)
 
 
 def generate_renditions(picture):
@@ -101,25 +170,59 @@ def generate_renditions(picture):
 
     # use 4-3 rendition for generated thumbs
     renditions = picture.get("renditions", {})
-    rendition = renditions.get("4-3", renditions.get("baseImage"))
-    if not rendition:
+    rendition = next(
+        (renditions[name] for name in THUMBNAIL_SOURCE_RENDITIONS if renditions.get(name)),
+        None,
+    )
+    if not rendition or not rendition.get("media"):
         return
 
-    # generate thumbnails
-    binary = app.media.get(rendition["media"], resource=ASSETS_RESOURCE)
-    im = Image.open(binary)
-    thumbnail = get_thumbnail(im)  # 4-3 rendition resized
-    watermark = get_watermark(im)  # 4-3 rendition with watermark
-    picture["renditions"].update(
-        {
-            "_newsroom_thumbnail": store_image(thumbnail, _id="%s%s" % (rendition["media"], "_newsroom_thumbnail")),
-            "_newsroom_thumbnail_large": store_image(
-                watermark,
-                _id="%s%s" % (rendition["media"], "_newsroom_thumbnail_large"),
-            ),
+    jobs = {}
+    add_pending_rendition(picture, jobs, rendition, "_newsroom_thumbnail", "thumbnail")  # 4-3 rendition resized
+    add_pending_rendition(picture, jobs, rendition, "_newsroom_thumbnail_large", "watermark")  # with watermark
+
+    if app.generate_preview_details_renditions is generate_preview_details_renditions:
+        # generate all renditions in a single task, decoding each source image once
+        add_preview_details_jobs(picture, jobs)
+    else:
+        app.generate_preview_details_renditions(picture)
+
+    schedule_renditions(jobs)
+
+
+@celery.task(soft_time_limit=300)
+def generate_picture_renditions(jobs):
+    """Generate the missing renditions, decoding every source image only once
+
+    :param jobs: Dict of source media id -> dict of rendition media id -> variant
+    """
+
+    for source_id, renditions in jobs.items():
+        missing = {
+            media_id: variant
+            for media_id, variant in renditions.items()
+            if not app.media.exists(media_id, resource=ASSETS_RESOURCE)
         }
-    )
-    app.generate_preview_details_renditions(picture)
+        if not missing:
+            continue
+
+        binary = app.media.get(source_id, resource=ASSETS_RESOURCE)
+        if not binary:
+            logger.warning("Source image %s for renditions not found", source_id)
+            continue
+
+        try:
+            image = Image.open(binary)
+            image.load()
+        except Exception:
+            logger.exception("Failed to read source image %s for renditions", source_id)
+            continue
+
+        variants = {}
+        for media_id, variant in missing.items():
+            if variant not in variants:
+                variants[variant] = RENDITION_VARIANTS[variant](image)
+            put_image(variants[variant], _id=media_id)
 
 
 def init_app(app):
@@ -8,7 +8,6 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-import base64
 import datetime
 import logging
 from bson import ObjectId
@@ -22,7 +21,8 @@ from superdesk.celery_task_utils import get_lock_id
 from superdesk.lock import lock, unlock
 
 from newsroom.celery_app import celery
-from newsroom.email import send_user_email
+from newsroom.email import email_batch, send_user_email
+from newsroom.email_attachments import store_email_attachment
 from newsroom.settings import get_settings_collection, GENERAL_SETTINGS_LOOKUP
 from newsroom.utils import parse_date_str, get_items_by_id, get_entity_or_404
 
@@ -59,10 +59,11 @@ class MonitoringEmailAlerts(Command):
 
             now_to_minute = now_local.replace(second=0, microsecond=0)
 
-            if immediate:
-                self.immediate_worker(now_to_minute)
-            else:
-                self.scheduled_worker(now_to_minute)
+            with email_batch():
+                if immediate:
+                    self.immediate_worker(now_to_minute)
+                else:
+                    self.scheduled_worker(now_to_minute)
         except Exception as e:
             logger.exception(e)
         finally:
@@ -257,8 +258,9 @@ class MonitoringEmailAlerts(Command):
                         )
                         truncate_article_body(items, m)
                         _file = get_monitoring_file(m, items)
-                        attachment = base64.b64encode(_file.read())
                         formatter = app.download_formatters[m["format_type"]]["formatter"]
+                        content_type = "application/{}".format(formatter.FILE_EXTENSION)
+                        attachment = store_email_attachment(_file, formatter.format_filename(None), content_type)
 
                         for user in users:
                             send_user_email(
@@ -267,9 +269,9 @@ class MonitoringEmailAlerts(Command):
                                 template_kwargs=template_kwargs,
                                 attachments_info=[
                                     {
-                                        "file": attachment,
+                                        "media_id": attachment,
                                         "file_name": formatter.format_filename(None),
-                                        "content_type": "application/{}".format(formatter.FILE_EXTENSION),
+                                        "content_type": content_type,
                                         "file_desc": "Monitoring Report for Celery monitoring alerts for profile: {}".format(
                                             m["name"]
                                         ),
@@ -1,4 +1,3 @@
-import base64
 from bson import ObjectId
 
 import flask
@@ -12,6 +11,7 @@ from superdesk import get_resource_service
 from superdesk.logging import logger
 
 from newsroom.email import send_user_email
+from newsroom.email_attachments import store_email_attachment
 from newsroom.template_filters import is_admin
 from newsroom.auth import get_user, get_user_id
 from newsroom.wire.utils import update_action_list
@@ -259,6 +259,13 @@ def share():
     monitoring_profile = get_entity_or_404(data.get("monitoring_profile"), "monitoring")
     items = get_items_for_monitoring_report(data.get("items"), monitoring_profile)
 
+    formatter = app.download_formatters["monitoring_pdf"]["formatter"]
+    monitoring_profile["format_type"] = "monitoring_pdf"
+    content_type = "application/{}".format(formatter.FILE_EXTENSION)
+    attachment = store_email_attachment(
+        get_monitoring_file(monitoring_profile, items), formatter.format_filename(None), content_type
+    )
+
     for user_id in data["users"]:
         user = get_resource_service("users").find_one(req=None, _id=user_id)
         template_kwargs = {
@@ -269,10 +276,6 @@ def share():
             "message": data.get("message"),
             "item_name": "Monitoring Report",
         }
-        formatter = app.download_formatters["monitoring_pdf"]["formatter"]
-        monitoring_profile["format_type"] = "monitoring_pdf"
-        _file = get_monitoring_file(monitoring_profile, items)
-        attachment = base64.b64encode(_file.read())
 
         send_user_email(
             user,
@@ -280,9 +283,9 @@ def share():
             template_kwargs=template_kwargs,
             attachments_info=[
                 {
-                    "file": attachment,
+                    "media_id": attachment,
                     "file_name": formatter.format_filename(None),
-                    "content_type": "application/{}".format(formatter.FILE_EXTENSION),
+                    "content_type": content_type,
                     "file_desc": "Monitoring Report",
                 }
             ],
@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 import newsroom
 from newsroom.products.products import get_products_by_company, get_products_by_user
 import superdesk
 
+from newsroom import directory
 from newsroom.utils import is_admin
 from newsroom.types import Company, Navigation, UserData
 
@@ -30,6 +31,18 @@ class NavigationsResource(newsroom.Resource):
 
 
 class NavigationsService(newsroom.Service):
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed("navigations", [doc["_id"] for doc in docs])
+
+    def on_updated(self, updates, original):
+        super().on_updated(updates, original)
+        directory.mark_changed("navigations", [original["_id"]])
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        directory.mark_changed("navigations", [doc["_id"]])
+
     def on_delete(self, doc):
         super().on_delete(doc)
         navigation = doc.get("_id")
@@ -44,6 +57,12 @@ def get_navigations(user: Optional[UserData], company: Optional[Company], produc
     Returns list of navigations for given user and company
     """
     if user and is_admin(user):
+        if directory.is_directory_enabled():
+            return sort_navigations(
+                dict(navigation)
+                for navigation in directory.get_directory("navigations").get_docs().values()
+                if navigation.get("product_type") == product_type
+            )
         return list(superdesk.get_resource_service("navigations").get(req=None, lookup={"product_type": product_type}))
 
     products = []
@@ -74,8 +93,28 @@ def get_navigations_by_ids(navigation_ids):
     if not navigation_ids:
         return []
 
+    if directory.is_directory_enabled():
+        navigations = directory.get_directory("navigations").get_docs()
+        return sort_navigations(
+            dict(navigation)
+            for navigation in (navigations.get(str(_id)) for _id in set(navigation_ids))
+            if navigation and navigation.get("is_enabled")
+        )
+
     return list(
         superdesk.get_resource_service("navigations").get(
             req=None, lookup={"_id": {"$in": navigation_ids}, "is_enabled": True}
         )
     )
+
+
+def sort_navigations(navigations: Iterable[Navigation]) -> List[Navigation]:
+    """Sort the navigations like the navigations resource does by default, navigations without order first"""
+    return sorted(
+        navigations,
+        key=lambda navigation: (
+            navigation.get("order") is not None,
+            navigation.get("order") or 0,
+            navigation.get("name") or "",
+        ),
+    )
@@ -9,6 +9,7 @@ from flask_babel import gettext
 from superdesk import get_resource_service
 from superdesk.cache import cache
 
+from newsroom import directory
 from newsroom.decorator import admin_only
 from newsroom.navigations import blueprint
 from newsroom.utils import (
@@ -112,9 +113,13 @@ def add_remove_products_for_navigation(nav_id: ObjectId, product_ids: List[str])
     get_entity_or_404(nav_id, "navigations")
     products = query_resource("products")
     db = app.data.get_mongo_collection("products")
+    changed_ids = []
     for product in products:
         if str(product["_id"]) in product_ids:
-            db.update_one({"_id": product["_id"]}, {"$addToSet": {"navigations": nav_id}})
+            result = db.update_one({"_id": product["_id"]}, {"$addToSet": {"navigations": nav_id}})
         else:
-            db.update_one({"_id": product["_id"]}, {"$pull": {"navigations": nav_id}})
+            result = db.update_one({"_id": product["_id"]}, {"$pull": {"navigations": nav_id}})
+        if result.modified_count:
+            changed_ids.append(product["_id"])
     cache.clean(["products"])
+    directory.mark_changed("products", changed_ids)
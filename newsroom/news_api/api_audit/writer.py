@@ -0,0 +1,207 @@
+"""News API audit writer
+========================
+
+Audit and history records of News API requests are queued in memory and written in bulk,
+using a single Mongo ``insert_many`` and Elasticsearch bulk request per resource,
+once ``NEWS_API_AUDIT_BATCH_SIZE`` records are queued or every ``NEWS_API_AUDIT_FLUSH_INTERVAL`` seconds.
+
+Records get the Eve ``_created``, ``_updated`` and ``_etag`` fields like when posted via the service,
+and only records stored in Mongo are indexed in Elasticsearch.
+
+When the queue is full, requests wait up to ``NEWS_API_AUDIT_QUEUE_TIMEOUT`` seconds for the writer
+to catch up, after that the record is dropped and counted in the ``dropped`` metric.
+The remaining records are written when the process exits.
+"""
+
+import os
+import queue
+import atexit
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from elasticsearch import helpers as es_helpers
+from eve.methods.common import resolve_document_etag
+from flask import current_app as app
+from pymongo.errors import BulkWriteError
+from redis.exceptions import RedisError
+
+from superdesk import get_resource_service
+from superdesk.utc import utcnow
+
+logger = logging.getLogger(__name__)
+
+#: Redis counter of dropped records, shared by all processes
+DROPPED_KEY = "newsroom:news_api:audit:dropped"
+
+
+class AuditWriter:
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self.batch_size: int = flask_app.config.get("NEWS_API_AUDIT_BATCH_SIZE", 100)
+        self.interval: float = flask_app.config.get("NEWS_API_AUDIT_FLUSH_INTERVAL", 5)
+        self.timeout: float = flask_app.config.get("NEWS_API_AUDIT_QUEUE_TIMEOUT", 0.1)
+        self.queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(
+            maxsize=flask_app.config.get("NEWS_API_AUDIT_QUEUE_SIZE", 10000)
+        )
+        self.written = 0
+        self.dropped = 0
+        self.pid = None
+        self.thread = None
+        self.exit_handler_registered = False
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.flush_lock = threading.Lock()
+
+    def add(self, resource: str, doc: Dict[str, Any]) -> bool:
+        """Queue the record to be written, returns ``False`` if it was dropped"""
+
+        self.start()
+        now = utcnow()
+        doc.setdefault("_id", ObjectId())
+        doc.setdefault("_created", now)
+        doc.setdefault("_updated", now)
+
+        try:
+            self.queue.put_nowait((resource, doc))
+        except queue.Full:
+            # let the writer catch up before dropping the record
+            self.wakeup.set()
+            try:
+                self.queue.put((resource, doc), timeout=self.timeout)
+            except queue.Full:
+                self.on_dropped(resource)
+                return False
+
+        if self.queue.qsize() >= self.batch_size:
+            self.wakeup.set()
+
+        return True
+
+    def on_dropped(self, resource: str) -> None:
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning("News API audit queue is full, %d records dropped", self.dropped)
+
+        try:
+            self.app.redis.incr(DROPPED_KEY)
+        except (AttributeError, RedisError):
+            pass
+
+    def start(self) -> None:
+        # the writer thread is not copied to forked worker processes
+        if self.pid == os.getpid():
+            return
+
+        self.pid = os.getpid()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="news-api-audit-writer", daemon=True)
+        self.thread.start()
+
+        if not self.exit_handler_registered:
+            atexit.register(self.stop)
+            self.exit_handler_registered = True
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to write News API audit records")
+
+    def stop(self) -> None:
+        """Stop the writer thread and write the remaining records"""
+
+        self.stopped.set()
+        self.wakeup.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    def flush(self) -> int:
+        """Write all queued records, returns the number of written records"""
+
+        written = 0
+        with self.flush_lock, self.app.app_context():
+            while True:
+                batch = self.get_batch()
+                if not batch:
+                    break
+
+                docs_by_resource: Dict[str, List[Dict[str, Any]]] = {}
+                for resource, doc in batch:
+                    docs_by_resource.setdefault(resource, []).append(doc)
+
+                for resource, docs in docs_by_resource.items():
+                    written += write_docs(resource, docs)
+
+        self.written += written
+        return written
+
+    def get_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"queued": self.queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+
+def _get_es_source(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: str(value) if isinstance(value, ObjectId) else value for key, value in doc.items() if key != "_id"}
+
+
+def write_docs(resource: str, docs: List[Dict[str, Any]]) -> int:
+    """Store the records in Mongo and index the stored ones, returns the number of stored records"""
+
+    resolve_document_etag(docs, resource)
+    try:
+        app.data.get_mongo_collection(resource).insert_many(docs, ordered=False)
+    except BulkWriteError as error:
+        logger.warning("Failed to store some %s records", resource, extra={"errors": error.details})
+        failed = {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+        docs = [doc for i, doc in enumerate(docs) if i not in failed]
+
+    if not docs:
+        return 0
+
+    index = app.data.elastic._resource_index(resource)
+    _success, errors = es_helpers.bulk(
+        app.data.elastic.es,
+        ({"_index": index, "_id": str(doc["_id"]), "_source": _get_es_source(doc)} for doc in docs),
+        raise_on_error=False,
+        refresh=bool(app.config.get("ELASTICSEARCH_FORCE_REFRESH")),
+    )
+    if errors:
+        logger.warning("Failed to index some %s records", resource, extra={"errors": errors[:10]})
+    return len(docs)
+
+
+def get_audit_writer() -> AuditWriter:
+    if "news_api_audit_writer" not in app.extensions:
+        app.extensions["news_api_audit_writer"] = AuditWriter(app._get_current_object())
+    return app.extensions["news_api_audit_writer"]
+
+
+def write_audit(doc: Dict[str, Any]) -> None:
+    if app.config.get("NEWS_API_AUDIT_ASYNC"):
+        get_audit_writer().add("api_audit", doc)
+    else:
+        get_resource_service("api_audit").post([doc])
+
+
+def write_history(items, action, user, section) -> None:
+    service = get_resource_service("history")
+    if app.config.get("NEWS_API_AUDIT_ASYNC"):
+        writer = get_audit_writer()
+        for doc in service.get_history_docs(items, action, user, section):
+            writer.add("history", doc)
+    else:
+        service.create_history_record(items, action, user, section)
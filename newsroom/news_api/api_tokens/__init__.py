@@ -7,10 +7,11 @@ from flask import g, current_app as app, abort, request
 from eve.auth import TokenAuth
 import superdesk
 from superdesk.utc import utcnow
-from superdesk import get_resource_service
 
+from newsroom.directory import get_directory
 from .resource import NewsApiTokensResource
 from .service import NewsApiTokensService
+from .rate_limit import check_rate_limit
 
 
 API_TOKENS = "news_api_tokens"
@@ -20,10 +21,24 @@ blueprint = Blueprint("news_api_tokens", __name__)
 from . import views  # noqa
 
 
+def get_token(token_id):
+    """Get the token from the in memory directory, or the database if it's not there yet"""
+
+    token = get_directory(API_TOKENS).get_docs().get(str(token_id))
+    return token if token else app.data.mongo.find_one(API_TOKENS, req=None, _id=token_id)
+
+
+def get_token_company(company_id):
+    """Get the enabled company from the in memory directory, or the database if not found there"""
+
+    company = get_directory("companies").get_docs().get(str(company_id))
+    return company if company else app.data.mongo.find_one("companies", req=None, _id=company_id)
+
+
 class CompanyTokenAuth(TokenAuth):
     def check_auth(self, token_id, allowed_roles, resource, method):
         """Try to find auth token and if valid put subscriber id into ``g.company_id``."""
-        token = app.data.mongo.find_one(API_TOKENS, req=None, _id=token_id)
+        token = get_token(token_id)
         if not token:
             return False
         # Check if the token has expired
@@ -35,7 +50,7 @@ class CompanyTokenAuth(TokenAuth):
             return False
 
         # Make sure that the company is enabled
-        company = app.data.mongo.find_one("companies", req=None, _id=token.get("company"))
+        company = get_token_company(token.get("company"))
         if not company:
             return False
         if not company.get("is_enabled", False):
@@ -55,28 +70,23 @@ class CompanyTokenAuth(TokenAuth):
                 return False
 
         # Check rate_limit
-        updates = {}
-        new_period = False
         if app.config.get("RATE_LIMIT_REQUESTS"):
-            new_period = not token.get("rate_limit_expiry") or token["rate_limit_expiry"] <= now
-            if new_period:
-                updates["rate_limit_requests"] = 1
-            elif token.get("rate_limit_expiry"):
-                if token.get("rate_limit_requests", 0) >= app.config.get("RATE_LIMIT_REQUESTS"):
-                    abort(429, gettext("Rate limit exceeded"))
-                else:
-                    updates["rate_limit_requests"] = token.get("rate_limit_requests", 0) + 1
-
-        if app.config.get("RATE_LIMIT_PERIOD") and new_period:
-            updates["rate_limit_expiry"] = now + timedelta(seconds=app.config.get("RATE_LIMIT_PERIOD"))
-
-        if updates:
-            get_resource_service(API_TOKENS).patch(token_id, updates)
-
-            # Set Flask global variables
-            g.rate_limit_requests = updates["rate_limit_requests"]
-            if updates.get("rate_limit_expiry"):
-                g.rate_limit_expiry = updates["rate_limit_expiry"]
+            if app.config.get("RATE_LIMIT_PERIOD"):
+                rate_limit = check_rate_limit(
+                    str(token_id), app.config["RATE_LIMIT_REQUESTS"], app.config["RATE_LIMIT_PERIOD"]
+                )
+                if rate_limit:
+                    count, ttl, allowed = rate_limit
+                    if not allowed:
+                        abort(429, gettext("Rate limit exceeded"))
+
+                    # Set Flask global variables
+                    g.rate_limit_requests = count
+                    if count == 1:
+                        g.rate_limit_expiry = now + timedelta(milliseconds=ttl)
+            else:
+                # there is no period to count the requests in
+                g.rate_limit_requests = 1
 
         g.company_id = str(token.get("company"))
         return g.company_id
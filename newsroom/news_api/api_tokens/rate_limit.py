@@ -0,0 +1,114 @@
+"""News API rate limiting
+=========================
+
+Requests are counted per token in Redis, using a fixed window of ``RATE_LIMIT_PERIOD`` seconds
+allowing ``RATE_LIMIT_REQUESTS`` requests. The counter is checked and incremented atomically,
+so concurrent requests can't go over the limit.
+
+The counters are written to the ``news_api_tokens`` collection only periodically for reporting,
+see :func:`flush_rate_limits`.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app as app
+from pymongo import UpdateOne
+from redis.exceptions import RedisError
+from superdesk.utc import utcnow
+
+from newsroom.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+#: Tokens with counters not yet written to the database
+PENDING_KEY = "newsroom:news_api:rate_limit:pending"
+
+FLUSH_BATCH_SIZE = 500
+
+# Returns the current count, milliseconds until the window resets and 1 if the request is allowed
+RATE_LIMIT_SCRIPT = """
+local count = tonumber(redis.call('GET', KEYS[1]) or '0')
+if count >= tonumber(ARGV[1]) then
+    return {count, redis.call('PTTL', KEYS[1]), 0}
+end
+count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+redis.call('SADD', KEYS[2], ARGV[3])
+return {count, redis.call('PTTL', KEYS[1]), 1}
+"""
+
+
+def get_counter_key(token_id: str) -> str:
+    return f"newsroom:news_api:rate_limit:{token_id}"
+
+
+def check_rate_limit(token_id: str, limit: int, period: int) -> Optional[Tuple[int, int, bool]]:
+    """Count the request for the given token
+
+    :return: Tuple of number of requests in the current window, milliseconds until it resets
+        and if the request is allowed, or ``None`` if Redis is not available
+    """
+
+    try:
+        count, ttl, allowed = app.redis.register_script(RATE_LIMIT_SCRIPT)(
+            keys=[get_counter_key(token_id), PENDING_KEY],
+            args=[limit, period * 1000, token_id],
+        )
+    except RedisError:
+        logger.exception("Failed to check rate limit for News API token")
+        return None
+
+    return int(count), int(ttl), bool(allowed)
+
+
+def flush_rate_limits() -> int:
+    """Store the current counters of the tokens used since the last flush
+
+    :return: The number of updated tokens
+    """
+
+    updated = 0
+    collection = app.data.get_mongo_collection("news_api_tokens")
+
+    while True:
+        token_ids: List[Any] = app.redis.spop(PENDING_KEY, FLUSH_BATCH_SIZE)
+        if not token_ids:
+            break
+
+        token_ids = [_id.decode() if isinstance(_id, bytes) else _id for _id in token_ids]
+        pipe = app.redis.pipeline(transaction=False)
+        for token_id in token_ids:
+            pipe.get(get_counter_key(token_id))
+            pipe.pttl(get_counter_key(token_id))
+        values = pipe.execute()
+
+        now = utcnow()
+        requests = []
+        for i, token_id in enumerate(token_ids):
+            count, ttl = values[i * 2], values[i * 2 + 1]
+            if count is None or ttl is None or ttl < 0:
+                # window already expired
+                continue
+
+            updates: Dict[str, Any] = {
+                "rate_limit_requests": int(count),
+                "rate_limit_expiry": now + timedelta(milliseconds=ttl),
+            }
+            requests.append(UpdateOne({"_id": token_id}, {"$set": updates}))
+
+        if requests:
+            collection.bulk_write(requests, ordered=False)
+            updated += len(requests)
+
+    return updated
+
+
+@celery.task(soft_time_limit=60)
+def flush_rate_limit_counters():
+    if app.config.get("RATE_LIMIT_REQUESTS") and app.config.get("RATE_LIMIT_PERIOD"):
+        updated = flush_rate_limits()
+        logger.debug("Updated rate limit counters for %d News API tokens", updated)
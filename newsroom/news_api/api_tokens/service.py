@@ -2,6 +2,8 @@ from content_api.tokens import CompanyTokenService
 from content_api.errors import BadParameterValueError
 from superdesk.utc import utcnow
 
+from newsroom import directory
+
 
 class NewsApiTokensService(CompanyTokenService):
     def _validate(self, token):
@@ -35,6 +37,24 @@ class NewsApiTokensService(CompanyTokenService):
 
         return super().on_update(updates, original)
 
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed(self.datasource, [doc["_id"] for doc in docs])
+
+    def update(self, id, updates, original):
+        res = super().update(id, updates, original)
+        directory.mark_changed(self.datasource, [id])
+        return res
+
+    def system_update(self, id, updates, original, **kwargs):
+        res = super().system_update(id, updates, original, **kwargs)
+        directory.mark_changed(self.datasource, [id])
+        return res
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        directory.mark_changed(self.datasource, [doc.get("_id") or doc.get("token")])
+
     def find_one(self, req, **lookup):
         """
         Used to lookup the token for the company, so swap the _id for token
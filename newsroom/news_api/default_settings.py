@@ -1,6 +1,7 @@
 from urllib.parse import urlparse
 from newsroom.web.default_settings import (  # noqa
     env,
+    strtobool,
     ELASTICSEARCH_URL,
     ELASTICSEARCH_SETTINGS,
     CONTENTAPI_ELASTICSEARCH_URL,
@@ -55,3 +56,34 @@ CONTENTAPI_ELASTICSEARCH_INDEX = env("CONTENTAPI_ELASTICSEARCH_INDEX", MONGO_DBN
 FILTER_AGGREGATIONS = False
 ELASTIC_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
 ELASTICSEARCH_FIX_QUERY = False
+
+#: Write the News API audit and history records in batches from a background thread
+#:
+#: .. versionadded: 2.8
+#:
+NEWS_API_AUDIT_ASYNC = strtobool(env("NEWS_API_AUDIT_ASYNC", "true"))
+
+#: Number of audit records written in a single batch
+#:
+#: .. versionadded: 2.8
+#:
+NEWS_API_AUDIT_BATCH_SIZE = int(env("NEWS_API_AUDIT_BATCH_SIZE", 100))
+
+#: Max number of seconds audit records wait in the queue before being written
+#:
+#: .. versionadded: 2.8
+#:
+NEWS_API_AUDIT_FLUSH_INTERVAL = float(env("NEWS_API_AUDIT_FLUSH_INTERVAL", 5))
+
+#: Max number of queued audit records, when full requests wait ``NEWS_API_AUDIT_QUEUE_TIMEOUT``
+#: seconds for a free slot before the record is dropped
+#:
+#: .. versionadded: 2.8
+#:
+NEWS_API_AUDIT_QUEUE_SIZE = int(env("NEWS_API_AUDIT_QUEUE_SIZE", 10000))
+
+#: Max number of seconds a request waits for a free slot in the full audit queue
+#:
+#: .. versionadded: 2.8
+#:
+NEWS_API_AUDIT_QUEUE_TIMEOUT = float(env("NEWS_API_AUDIT_QUEUE_TIMEOUT", 0.1))
@@ -9,6 +9,7 @@ from superdesk.errors import SuperdeskApiError
 
 from newsroom.factory import BaseNewsroomApp
 from newsroom.news_api.api_tokens import CompanyTokenAuth
+from newsroom.celery_app import init_celery
 from superdesk.utc import utcnow
 from newsroom.template_filters import (
     datetime_short,
@@ -43,6 +44,9 @@ class NewsroomNewsAPI(BaseNewsroomApp):
 
         super(NewsroomNewsAPI, self).__init__(import_name=import_name, config=config, **kwargs)
 
+        # Redis is used for rate limiting and the tokens directory
+        init_celery(self)
+
         template_folder = os.path.abspath(os.path.join(API_DIR, "../templates"))
 
         self.add_template_filter(datetime_short)
@@ -5,7 +5,7 @@ from flask import abort
 from flask_babel import gettext
 import superdesk
 
-from newsroom.upload import ASSETS_RESOURCE
+from newsroom.upload import ASSETS_RESOURCE, is_private_media
 from newsroom.news_api.utils import post_api_audit
 from flask import current_app as app
 
@@ -27,7 +27,7 @@ def get_item(asset_id):
         media_file = flask.current_app.media.get(asset_id, ASSETS_RESOURCE)
     except bson.errors.InvalidId:
         media_file = None
-    if not media_file:
+    if not media_file or is_private_media(media_file):
         flask.abort(404)
 
     data = wrap_file(flask.request.environ, media_file, buffer_size=1024 * 256)
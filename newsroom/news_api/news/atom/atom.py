@@ -23,30 +23,152 @@ def init_app(app):
     superdesk.blueprint(blueprint, app)
 
 
-@blueprint.route("/atom", methods=["GET"])
-def get_atom():
-    def _format_date(date):
-        iso8601 = date.isoformat()
-        if date.tzinfo:
-            return iso8601
-        return iso8601 + "Z"
+XML_ROOT = '<?xml version="1.0" encoding="UTF-8"?>'
 
-    def _format_update_date(date):
-        DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
-        return date.strftime(DATETIME_FORMAT) + "Z"
+_message_nsmap = {
+    None: "http://www.w3.org/2005/Atom",
+    "dcterms": "http://purl.org/dc/terms/",
+    "media": "http://search.yahoo.com/mrss/",
+    "mi": "http://schemas.ingestion.microsoft.com/common/",
+}
+
+#: Placeholder for the ``dcterms:valid`` value in the cached entries, which depends on the current time
+VALID_PLACEHOLDER = "__ATOM_ENTRY_VALID__"
+
+ENTRY_NS_DECLARATIONS = re.compile(r"^<entry[^>]*>")
+
+#: Rendered entries are cached by item ``_id`` and ``_etag``, so changed items get a new key
+ENTRY_CACHE_TIMEOUT = 24 * 60 * 60
 
-    auth = app.auth
-    if not auth.authorized([], None, flask.request.method):
-        return auth.authenticate()
 
-    XML_ROOT = '<?xml version="1.0" encoding="UTF-8"?>'
+def _format_date(date):
+    iso8601 = date.isoformat()
+    if date.tzinfo:
+        return iso8601
+    return iso8601 + "Z"
 
-    _message_nsmap = {
-        None: "http://www.w3.org/2005/Atom",
-        "dcterms": "http://purl.org/dc/terms/",
-        "media": "http://search.yahoo.com/mrss/",
-        "mi": "http://schemas.ingestion.microsoft.com/common/",
+
+def _format_update_date(date):
+    DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+    return date.strftime(DATETIME_FORMAT) + "Z"
+
+
+def get_entry_cache_key(item):
+    version = item.get("_etag") or item.get("versioncreated")
+    return "atom-entry:{}:{}:{}".format(flask.request.host_url, item["_id"], version)
+
+
+def get_entry_xml(complete_item):
+    """Render the ``<entry>`` element of the item, without namespace declarations"""
+
+    feed = etree.Element("feed", nsmap=_message_nsmap)
+    entry = SubElement(feed, "entry")
+
+    # If the item has any parents we use the id of the first, this should be constant throught the update
+    # history
+    if complete_item.get("ancestors") and len(complete_item.get("ancestors")):
+        SubElement(entry, "id").text = complete_item.get("ancestors")[0]
+    else:
+        SubElement(entry, "id").text = str(complete_item.get("_id"))
+
+    SubElement(entry, "title").text = etree.CDATA(complete_item.get("headline"))
+    SubElement(entry, "published").text = _format_date(complete_item.get("firstpublished"))
+    SubElement(entry, "updated").text = _format_update_date(complete_item.get("versioncreated"))
+    SubElement(
+        entry,
+        "link",
+        attrib={
+            "rel": "self",
+            "href": flask.url_for(
+                "news/item.get_item",
+                item_id=complete_item.get("_id"),
+                format="TextFormatter",
+                _external=True,
+            ),
+        },
+    )
+    if complete_item.get("byline"):
+        SubElement(SubElement(entry, "author"), "name").text = complete_item.get("byline")
+
+    SubElement(entry, etree.QName(_message_nsmap.get("dcterms"), "valid")).text = VALID_PLACEHOLDER
+
+    categories = [{"name": s.get("name")} for s in complete_item.get("service", [])]
+    for category in categories:
+        SubElement(entry, "category", attrib={"term": category.get("name")})
+
+    SubElement(entry, "summary").text = etree.CDATA(complete_item.get("description_text", ""))
+
+    # If there are any image embeds then reset the source to a Newshub asset
+    html_updated = False
+    regex = r" EMBED START Image {id: \"editor_([0-9]+)"
+    root_elem = lxml_html.fromstring(complete_item.get("body_html", ""))
+    comments = root_elem.xpath("//comment()")
+    for comment in comments:
+        if "EMBED START Image" in comment.text:
+            m = re.search(regex, comment.text)
+            # Assumes the sibling of the Embed Image comment is the figure tag containing the image
+            figure_elem = comment.getnext()
+            if figure_elem is not None and figure_elem.tag == "figure":
+                imgElem = figure_elem.find("./img")
+                if imgElem is not None and m and m.group(1):
+                    embed_id = "editor_" + m.group(1)
+                    src = complete_item.get("associations").get(embed_id).get("renditions").get("16-9")
+                    if src:
+                        imgElem.attrib["src"] = flask.url_for(
+                            "assets.get_item",
+                            asset_id=src.get("media"),
+                            _external=True,
+                            _scheme="https",
+                        )
+                        html_updated = True
+    if html_updated:
+        complete_item["body_html"] = to_string(root_elem, method="html")
+
+    SubElement(entry, "content", attrib={"type": "html"}).text = etree.CDATA(complete_item.get("body_html", ""))
+
+    if ((complete_item.get("associations") or {}).get("featuremedia") or {}).get("renditions"):
+        image = ((complete_item.get("associations") or {}).get("featuremedia") or {}).get("renditions").get("16-9")
+        metadata = (complete_item.get("associations") or {}).get("featuremedia") or {}
+
+        url = flask.url_for("assets.get_item", _external=True, asset_id=image.get("media"))
+        media = SubElement(
+            entry,
+            etree.QName(_message_nsmap.get("media"), "content"),
+            attrib={
+                "url": url,
+                "type": image.get("mimetype"),
+                "medium": "image",
+            },
+        )
+
+        SubElement(media, etree.QName(_message_nsmap.get("media"), "credit")).text = metadata.get("byline")
+        SubElement(media, etree.QName(_message_nsmap.get("media"), "title")).text = metadata.get("description_text")
+        SubElement(media, etree.QName(_message_nsmap.get("media"), "text")).text = metadata.get("body_text")
+        focr = SubElement(media, etree.QName(_message_nsmap.get("mi"), "focalRegion"))
+        SubElement(focr, etree.QName(_message_nsmap.get("mi"), "x1")).text = str(image.get("poi").get("x"))
+        SubElement(focr, etree.QName(_message_nsmap.get("mi"), "x2")).text = str(image.get("poi").get("x"))
+        SubElement(focr, etree.QName(_message_nsmap.get("mi"), "y1")).text = str(image.get("poi").get("y"))
+        SubElement(focr, etree.QName(_message_nsmap.get("mi"), "y2")).text = str(image.get("poi").get("y"))
+
+    xml = etree.tostring(entry, pretty_print=True).decode("utf-8")
+    # namespaces are declared on the feed element already
+    return ENTRY_NS_DECLARATIONS.sub("<entry>", xml, count=1)
+
+
+def get_complete_items(item_ids):
+    """Fetch all the items using a single query, in the order of provided ids"""
+
+    items = {
+        item["_id"]: item for item in superdesk.get_resource_service("items").find(where={"_id": {"$in": item_ids}})
     }
+    return [items[item_id] for item_id in item_ids if item_id in items]
+
+
+@blueprint.route("/atom", methods=["GET"])
+def get_atom():
+    auth = app.auth
+    if not auth.authorized([], None, flask.request.method):
+        return auth.authenticate()
 
     #    feed = etree.Element('feed', attrib={'lang': 'en-us'}, nsmap=_message_nsmap)
     feed = etree.Element("feed", nsmap=_message_nsmap)
@@ -68,124 +190,49 @@ def get_atom():
     company = get_company()
     products = get_products_by_company(company)
 
-    for item in response[0].get("_items"):
-        try:
-            complete_item = superdesk.get_resource_service("items").find_one(req=None, _id=item.get("_id"))
-
-            # If featuremedia is not allowed for the company don't add the item
-            if ((complete_item.get("associations") or {}).get("featuremedia") or {}).get("renditions"):
-                if not check_association_permission(complete_item, products):
-                    continue
-
-            entry = SubElement(feed, "entry")
-
-            # If the item has any parents we use the id of the first, this should be constant throught the update
-            # history
-            if complete_item.get("ancestors") and len(complete_item.get("ancestors")):
-                SubElement(entry, "id").text = complete_item.get("ancestors")[0]
-            else:
-                SubElement(entry, "id").text = str(complete_item.get("_id"))
-
-            SubElement(entry, "title").text = etree.CDATA(complete_item.get("headline"))
-            SubElement(entry, "published").text = _format_date(complete_item.get("firstpublished"))
-            SubElement(entry, "updated").text = _format_update_date(complete_item.get("versioncreated"))
-            SubElement(
-                entry,
-                "link",
-                attrib={
-                    "rel": "self",
-                    "href": flask.url_for(
-                        "news/item.get_item",
-                        item_id=item.get("_id"),
-                        format="TextFormatter",
-                        _external=True,
-                    ),
-                },
-            )
-            if complete_item.get("byline"):
-                SubElement(SubElement(entry, "author"), "name").text = complete_item.get("byline")
-
-            if complete_item.get("pubstatus") == "usable":
-                SubElement(
-                    entry, etree.QName(_message_nsmap.get("dcterms"), "valid")
-                ).text = "start={}; end={}; scheme=W3C-DTF".format(
-                    _format_date(utcnow()),
-                    _format_date(utcnow() + datetime.timedelta(days=30)),
-                )
-            else:
-                # in effect a kill set the end date into the past
-                SubElement(
-                    entry, etree.QName(_message_nsmap.get("dcterms"), "valid")
-                ).text = "start={}; end={}; scheme=W3C-DTF".format(
-                    _format_date(utcnow()),
-                    _format_date(utcnow() - datetime.timedelta(days=30)),
-                )
-
-            categories = [{"name": s.get("name")} for s in complete_item.get("service", [])]
-            for category in categories:
-                SubElement(entry, "category", attrib={"term": category.get("name")})
-
-            SubElement(entry, "summary").text = etree.CDATA(complete_item.get("description_text", ""))
-
-            # If there are any image embeds then reset the source to a Newshub asset
-            html_updated = False
-            regex = r" EMBED START Image {id: \"editor_([0-9]+)"
-            root_elem = lxml_html.fromstring(complete_item.get("body_html", ""))
-            comments = root_elem.xpath("//comment()")
-            for comment in comments:
-                if "EMBED START Image" in comment.text:
-                    m = re.search(regex, comment.text)
-                    # Assumes the sibling of the Embed Image comment is the figure tag containing the image
-                    figure_elem = comment.getnext()
-                    if figure_elem is not None and figure_elem.tag == "figure":
-                        imgElem = figure_elem.find("./img")
-                        if imgElem is not None and m and m.group(1):
-                            embed_id = "editor_" + m.group(1)
-                            src = complete_item.get("associations").get(embed_id).get("renditions").get("16-9")
-                            if src:
-                                imgElem.attrib["src"] = flask.url_for(
-                                    "assets.get_item",
-                                    asset_id=src.get("media"),
-                                    _external=True,
-                                    _scheme="https",
-                                )
-                                html_updated = True
-            if html_updated:
-                complete_item["body_html"] = to_string(root_elem, method="html")
-
-            SubElement(entry, "content", attrib={"type": "html"}).text = etree.CDATA(complete_item.get("body_html", ""))
-
-            if ((complete_item.get("associations") or {}).get("featuremedia") or {}).get("renditions"):
-                image = (
-                    ((complete_item.get("associations") or {}).get("featuremedia") or {}).get("renditions").get("16-9")
-                )
-                metadata = (complete_item.get("associations") or {}).get("featuremedia") or {}
-
-                url = flask.url_for("assets.get_item", _external=True, asset_id=image.get("media"))
-                media = SubElement(
-                    entry,
-                    etree.QName(_message_nsmap.get("media"), "content"),
-                    attrib={
-                        "url": url,
-                        "type": image.get("mimetype"),
-                        "medium": "image",
-                    },
-                )
-
-                SubElement(media, etree.QName(_message_nsmap.get("media"), "credit")).text = metadata.get("byline")
-                SubElement(media, etree.QName(_message_nsmap.get("media"), "title")).text = metadata.get(
-                    "description_text"
-                )
-                SubElement(media, etree.QName(_message_nsmap.get("media"), "text")).text = metadata.get("body_text")
-                focr = SubElement(media, etree.QName(_message_nsmap.get("mi"), "focalRegion"))
-                SubElement(focr, etree.QName(_message_nsmap.get("mi"), "x1")).text = str(image.get("poi").get("x"))
-                SubElement(focr, etree.QName(_message_nsmap.get("mi"), "x2")).text = str(image.get("poi").get("x"))
-                SubElement(focr, etree.QName(_message_nsmap.get("mi"), "y1")).text = str(image.get("poi").get("y"))
-                SubElement(focr, etree.QName(_message_nsmap.get("mi"), "y2")).text = str(image.get("poi").get("y"))
-        except Exception as ex:
-            logger.exception("processing {} - {}".format(item.get("_id"), ex))
-
-    return flask.Response(
-        XML_ROOT + etree.tostring(feed, pretty_print=True).decode("utf-8"),
-        mimetype="application/atom+xml",
+    now = utcnow()
+    valid_usable = "start={}; end={}; scheme=W3C-DTF".format(
+        _format_date(now), _format_date(now + datetime.timedelta(days=30))
     )
+    # in effect a kill set the end date into the past
+    valid_killed = "start={}; end={}; scheme=W3C-DTF".format(
+        _format_date(now), _format_date(now - datetime.timedelta(days=30))
+    )
+
+    complete_items = get_complete_items([item.get("_id") for item in response[0].get("_items")])
+    cache_keys = [get_entry_cache_key(item) for item in complete_items]
+    cached_entries = app.cache.get_many(*cache_keys) if cache_keys else []
+
+    feed_xml = etree.tostring(feed, pretty_print=True).decode("utf-8")
+    feed_start, feed_end = feed_xml.rsplit("</feed>", 1)
+
+    def generate_entries():
+        """Render the missing entries while sending the response, caching them once done"""
+
+        rendered_entries = {}
+        try:
+            for complete_item, cache_key, entry_xml in zip(complete_items, cache_keys, cached_entries):
+                try:
+                    # If featuremedia is not allowed for the company don't add the item
+                    if ((complete_item.get("associations") or {}).get("featuremedia") or {}).get("renditions"):
+                        if not check_association_permission(complete_item, products):
+                            continue
+
+                    if not entry_xml:
+                        entry_xml = get_entry_xml(complete_item)
+                        rendered_entries[cache_key] = entry_xml
+
+                    valid = valid_usable if complete_item.get("pubstatus") == "usable" else valid_killed
+                    yield entry_xml.replace(VALID_PLACEHOLDER, valid, 1)
+                except Exception as ex:
+                    logger.exception("processing {} - {}".format(complete_item.get("_id"), ex))
+        finally:
+            if rendered_entries:
+                app.cache.set_many(rendered_entries, timeout=ENTRY_CACHE_TIMEOUT)
+
+    def generate():
+        yield XML_ROOT + feed_start
+        yield from generate_entries()
+        yield "</feed>" + feed_end
+
+    return flask.Response(flask.stream_with_context(generate()), mimetype="application/atom+xml")
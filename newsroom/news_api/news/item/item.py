@@ -7,6 +7,7 @@ from flask_babel import gettext
 
 from superdesk import get_resource_service
 from newsroom.news_api.utils import post_api_audit
+from newsroom.news_api.api_audit.writer import write_history
 
 
 blueprint = superdesk.Blueprint("news/item", __name__)
@@ -31,7 +32,7 @@ def get_item(item_id):
 
     post_api_audit({"_items": [{"_id": item_id}]})
     # Record the retrieval of the item in the history collection
-    get_resource_service("history").create_history_record(
+    write_history(
         [{"_id": item_id, "version": formatted.get("version")}],
         "api",
         {"_id": None, "company": ObjectId(g.company_id)},
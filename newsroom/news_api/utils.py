@@ -1,7 +1,8 @@
-from superdesk import get_resource_service
 from superdesk.utc import utcnow
 from flask import request, g, current_app as app
 
+from newsroom.news_api.api_audit.writer import write_audit
+
 
 def post_api_audit(doc):
     audit_doc = {
@@ -16,7 +17,7 @@ def post_api_audit(doc):
     if "company_id" in g:
         audit_doc["subscriber"] = g.company_id
 
-    get_resource_service("api_audit").post([audit_doc])
+    write_audit(audit_doc)
 
 
 def format_report_results(search_result, unique_endpoints, companies):
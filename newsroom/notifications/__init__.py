@@ -7,6 +7,7 @@ import superdesk
 
 from superdesk.notification import push_notification
 from newsroom.auth import get_user, get_user_id
+from newsroom.types import User
 from .notification_queue import NotificationQueueResource, NotificationQueueService
 
 blueprint = flask.Blueprint("notifications", __name__)
@@ -29,9 +30,18 @@ class UserNotification(TypedDict):
     data: Optional[Dict[str, Any]]
 
 
-def save_user_notifications(entries: List[UserNotification]):
+def save_user_notifications(entries: List[UserNotification], users: Optional[Dict[str, User]] = None):
+    """Store the notifications and notify the recipients about the new notifications
+
+    :param entries: List of notifications
+    :param users: Optional dict of already loaded recipients, indexed by str(_id)
+    """
+
+    if not entries:
+        return
+
     service = superdesk.get_resource_service("notifications")
-    notification_ids = service.post(entries)
+    notification_ids = service.post(entries, users=users)
     new_notifications = service.get_items(notification_ids)
 
     # Iterate over the new notifications and collect the number
@@ -1,4 +1,8 @@
 from copy import deepcopy
+from typing import List
+
+from bson import ObjectId
+from flask import current_app as app
 
 from newsroom import Resource, Service, MongoIndexes
 
@@ -73,3 +77,11 @@ class NotificationQueueService(Service):
 
     def reset_queue(self, user_id):
         self.delete_action({"user": user_id})
+
+    def reset_queues(self, user_ids: List[ObjectId]):
+        """Reset queues of all the users using single ``delete_many``"""
+        if user_ids:
+            app.data.get_mongo_collection(self.datasource).delete_many({"user": {"$in": user_ids}})
+
+    def get_queued_user_ids(self) -> List[ObjectId]:
+        return app.data.get_mongo_collection(self.datasource).distinct("user")
@@ -2,10 +2,14 @@ import datetime
 import newsroom
 import superdesk
 
+from typing import Any, Dict, List, Optional, Set
 from bson import ObjectId
+from pymongo import UpdateOne
 from superdesk.utc import utcnow
 from flask import current_app as app, session
 
+from newsroom.types import User
+
 
 class NotificationsResource(newsroom.Resource):
     url = 'users/<regex("[a-f0-9]{24}"):user>/notifications'
@@ -31,46 +35,59 @@ class NotificationsResource(newsroom.Resource):
 
 
 class NotificationsService(newsroom.Service):
-    def create(self, docs, **kwargs):
+    def create(self, docs, users: Optional[Dict[str, User]] = None, **kwargs):
+        """Create or refresh the notifications using a single unordered bulk write
+
+        Notifications are keyed on ``user_item``, so existing notifications for the same item
+        are updated instead.
+
+        :param docs: List of notifications to store
+        :param users: Already loaded users indexed by str(_id), missing users are loaded from the database
+        """
+
         now = utcnow()
-        ids = []
+        users = get_notification_users(docs, users)
+        ids: List[str] = []
+        seen_ids: Set[str] = set()
+        requests = []
 
         for doc in docs:
             user_id = str(doc["user"])
-            user = superdesk.get_resource_service("users").find_one(req=None, _id=user_id)
+            user = users.get(user_id)
 
-            if not user.get("receive_app_notifications"):
+            if not user or not user.get("receive_app_notifications"):
                 continue
 
             notification_id = "_".join(map(str, [user_id, doc["item"]]))
-            original = self.find_one(req=None, _id=notification_id)
-
-            if original:
-                self.update(
-                    id=notification_id,
-                    updates={
-                        "created": now,
-                        "action": doc.get("action") or original.get("action"),
-                        "data": doc.get("data") or original.get("data"),
-                    },
-                    original=original,
-                )
-            else:
-                super().create(
-                    [
-                        {
-                            "_id": notification_id,
-                            "created": now,
-                            "user": ObjectId(doc["user"]),
-                            "item": doc["item"],
-                            "resource": doc.get("resource"),
-                            "action": doc.get("action"),
-                            "data": doc.get("data"),
-                        }
-                    ]
-                )
+            if notification_id in seen_ids:
+                continue
 
+            updates: Dict[str, Any] = {
+                "created": now,
+                "_updated": now,
+            }
+            inserts: Dict[str, Any] = {
+                "user": ObjectId(doc["user"]),
+                "item": doc["item"],
+                "resource": doc.get("resource"),
+                "_created": now,
+            }
+
+            # keep the original action/data if not set
+            for field in ("action", "data"):
+                if doc.get(field):
+                    updates[field] = doc[field]
+                else:
+                    inserts[field] = doc.get(field)
+
+            requests.append(
+                UpdateOne({"_id": notification_id}, {"$set": updates, "$setOnInsert": inserts}, upsert=True)
+            )
             ids.append(notification_id)
+            seen_ids.add(notification_id)
+
+        if requests:
+            app.data.get_mongo_collection(self.datasource).bulk_write(requests, ordered=False)
 
         return ids
 
@@ -78,6 +95,21 @@ class NotificationsService(newsroom.Service):
         return self.get(req=None, lookup={"_id": {"$in": item_ids}})
 
 
+def get_notification_users(docs, users: Optional[Dict[str, User]] = None) -> Dict[str, User]:
+    """Returns the recipient users of the provided notifications, loading the missing ones in a single query"""
+
+    users = dict(users or {})
+    missing_ids = list({str(doc["user"]) for doc in docs if str(doc["user"]) not in users})
+
+    if missing_ids:
+        for user in superdesk.get_resource_service("users").find(
+            where={"_id": {"$in": [ObjectId(user_id) for user_id in missing_ids]}}
+        ):
+            users[str(user["_id"])] = user
+
+    return users
+
+
 def get_user_notifications(user_id):
     ttl = app.config.get("NOTIFICATIONS_TTL", 1)
     lookup = {
@@ -11,8 +11,8 @@ from superdesk.celery_task_utils import get_lock_id
 from superdesk.lock import lock, unlock
 
 from newsroom.types import User, NotificationSchedule, Company, NotificationQueue, NotificationQueueTopic, Topic
-from newsroom.utils import get_user_dict, get_company_dict
-from newsroom.email import send_user_email
+from newsroom.utils import get_company_dict, is_company_enabled, is_company_expired
+from newsroom.email import email_batch, send_user_email
 from newsroom.celery_app import celery
 from newsroom.topics.topics import get_user_id_to_topic_for_subscribers, TopicNotificationType
 from newsroom.gettext import get_session_timezone, set_session_timezone
@@ -26,6 +26,14 @@ class NotificationEmailTopicEntry(TypedDict):
 
 
 class SendScheduledNotificationEmails(Command):
+    """Send scheduled notification emails
+
+    Users with a due schedule are found using the notification queue and processed
+    in chunks of ``SCHEDULED_NOTIFICATIONS_CHUNK_SIZE`` users by parallel celery tasks.
+    Every user is locked while processed, so a user in chunks running at the same time
+    gets a single email.
+    """
+
     def run(self, force: bool = False):
         self.log_msg = "Scheduled Notifications: {}".format(utcnow())
         logger.info(f"{self.log_msg} Starting to send scheduled notifications")
@@ -45,38 +53,99 @@ class SendScheduledNotificationEmails(Command):
     def run_schedules(self, force: bool):
         try:
             now_utc = utcnow().replace(second=0, microsecond=0)
-            companies = get_company_dict(False)
-            users = get_user_dict(False)
-            user_topic_map = get_user_id_to_topic_for_subscribers(TopicNotificationType.SCHEDULED.value)
-
-            schedules: List[NotificationQueue] = get_resource_service("notification_queue").get(req=None, lookup={})
+            user_ids = self.get_due_user_ids(now_utc, force)
         except Exception as e:
             logger.exception(e)
             logger.error("Failed to retrieve data to run schedules")
             return
 
-        for schedule in schedules:
-            user_id = schedule.get("user")
-            try:
-                user = users.get(str(user_id))
+        chunk_size = app.config.get("SCHEDULED_NOTIFICATIONS_CHUNK_SIZE", 50)
+        for i in range(0, len(user_ids), chunk_size):
+            send_scheduled_notifications_chunk.apply_async(
+                kwargs={"user_ids": user_ids[i : i + chunk_size], "now_utc": now_utc, "force": force}
+            )
 
-                if not user:
-                    # User not found, this account might be disabled
-                    # Reset the queue for this user, so it does not get checked on future runs
-                    get_resource_service("notification_queue").reset_queue(schedule["user"])
-                    continue
+    def get_users(self, user_ids: List[ObjectId]) -> Dict[ObjectId, User]:
+        """Get active users with active company"""
+
+        companies = get_company_dict(False)
+        users = get_resource_service("users").find(where={"_id": {"$in": user_ids}, "is_enabled": True})
+        return {
+            user["_id"]: user
+            for user in users
+            if (
+                is_company_enabled(user, companies.get(str(user.get("company"))))
+                and not is_company_expired(user, companies.get(str(user.get("company"))))
+            )
+        }
+
+    def get_due_user_ids(self, now_utc: datetime, force: bool) -> List[ObjectId]:
+        """Get users with queued notifications and a schedule due to run"""
+
+        queue_service = get_resource_service("notification_queue")
+        queued_user_ids = queue_service.get_queued_user_ids()
+        users = self.get_users(queued_user_ids)
 
-                if not user.get("notification_schedule"):
-                    user["notification_schedule"] = {}
+        # User not found, this account might be disabled
+        # Reset the queue for this user, so it does not get checked on future runs
+        queue_service.reset_queues([user_id for user_id in queued_user_ids if user_id not in users])
 
-                user["notification_schedule"].setdefault("timezone", get_session_timezone())
-                user["notification_schedule"].setdefault("times", app.config["DEFAULT_SCHEDULED_NOTIFICATION_TIMES"])
+        return [user_id for user_id, user in users.items() if self._is_user_due(user, now_utc, force)]
 
-                company = companies.get(str(user.get("company", "")))
-                self.process_schedule(schedule, user, company, now_utc, user_topic_map.get(user["_id"]) or {}, force)
-            except Exception as e:
-                logger.exception(e)
-                logger.error("Failed to run schedule for user %s", user_id)
+    def _is_user_due(self, user: User, now_utc: datetime, force: bool) -> bool:
+        if not user.get("notification_schedule"):
+            user["notification_schedule"] = {}
+
+        user["notification_schedule"].setdefault("timezone", get_session_timezone())
+        user["notification_schedule"].setdefault("times", app.config["DEFAULT_SCHEDULED_NOTIFICATION_TIMES"])
+
+        now_local = utc_to_local(user["notification_schedule"]["timezone"], now_utc)
+        return self._is_scheduled_to_run_for_user(user["notification_schedule"], now_local, force)
+
+    def run_chunk(self, user_ids: List[ObjectId], now_utc: datetime, force: bool):
+        """Send notifications to the users, queues of processed users are reset at the end
+
+        Users locked by another chunk are skipped, the others are loaded once locked
+        so the schedule last run time is up to date.
+        """
+
+        locked: List[ObjectId] = []
+        for user_id in user_ids:
+            if lock(get_user_lock_id(user_id), expire=610):
+                locked.append(user_id)
+            else:
+                logger.info("Scheduled notifications for user %s already running", user_id)
+
+        if not locked:
+            return
+
+        processed: List[ObjectId] = []
+        try:
+            companies = get_company_dict(False)
+            users = self.get_users(locked)
+            user_topic_map = get_user_id_to_topic_for_subscribers(TopicNotificationType.SCHEDULED.value)
+            schedules = get_resource_service("notification_queue").get(
+                req=None, lookup={"user": {"$in": list(users.keys())}}
+            )
+
+            with email_batch():
+                for schedule in schedules:
+                    user = users[schedule["user"]]
+                    try:
+                        # check again with fresh user data, the schedule could run meanwhile in another chunk
+                        if not self._is_user_due(user, now_utc, force):
+                            continue
+
+                        company = companies.get(str(user.get("company", "")))
+                        self.process_schedule(schedule, user, company, now_utc, user_topic_map.get(user["_id"]) or {})
+                        processed.append(user["_id"])
+                    except Exception as e:
+                        logger.exception(e)
+                        logger.error("Failed to run schedule for user %s", user["_id"])
+        finally:
+            get_resource_service("notification_queue").reset_queues(processed)
+            for user_id in locked:
+                unlock(get_user_lock_id(user_id))
 
     def process_schedule(
         self,
@@ -85,13 +154,7 @@ class SendScheduledNotificationEmails(Command):
         company: Optional[Company],
         now_utc: datetime,
         user_topics: Dict[ObjectId, Topic],
-        force: bool,
     ):
-        now_local = utc_to_local(user["notification_schedule"]["timezone"], now_utc)
-
-        if not self._is_scheduled_to_run_for_user(user["notification_schedule"], now_local, force):
-            return
-
         # Set the timezone on the session, so Babel is able to get the timezone for this user
         # when rendering the email, otherwise it uses the system default
         set_session_timezone(user["notification_schedule"]["timezone"])
@@ -120,8 +183,7 @@ class SendScheduledNotificationEmails(Command):
                 template_kwargs=template_kwargs,
             )
 
-        # Now clear the topic match queue
-        self._clear_user_notification_queue(user)
+        get_resource_service("users").update_notification_schedule_run_time(user, utcnow())
 
     def _is_scheduled_to_run_for_user(self, schedule: NotificationSchedule, now_local: datetime, force: bool):
         try:
@@ -144,10 +206,6 @@ class SendScheduledNotificationEmails(Command):
 
         return False
 
-    def _clear_user_notification_queue(self, user: User):
-        get_resource_service("notification_queue").reset_queue(user["_id"])
-        get_resource_service("users").update_notification_schedule_run_time(user, utcnow())
-
     def _convert_schedule_times(self, now_local: datetime, times: List[str]) -> List[datetime]:
         schedule_datetimes: List[datetime] = []
 
@@ -172,21 +230,46 @@ class SendScheduledNotificationEmails(Command):
         company: Optional[Company],
         exclude_items: Set[str],
     ) -> Optional[Dict[str, Any]]:
-        for item_id in reversed(topic_queue["items"]):
-            if item_id in exclude_items:
-                continue
-            search_service = get_resource_service("wire_search" if topic["topic_type"] == "wire" else "agenda")
-
-            query = search_service.get_topic_query(topic, user, company, args={"es_highlight": 1, "ids": [item_id]})
-
-            if not query:  # user might not have access to section anymore
-                return None
+        queued_items = self._get_queued_items(topic["topic_type"], [(topic_queue, topic)], user, company)[0]
+        return self._pick_latest_item(topic_queue, queued_items, exclude_items)
 
-            items = search_service.get_items_by_query(query, size=1)
+    def _get_queued_items(
+        self,
+        section: str,
+        topic_queues: List[Tuple[NotificationQueueTopic, Topic]],
+        user: User,
+        company: Optional[Company],
+    ) -> List[Dict[str, Any]]:
+        """Get highlighted queued items of all the topics using a single ``_msearch`` request
 
-            if items.count():
-                return items[0]
+        :return: Items accessible to the user indexed by id, for every topic queue
+        """
 
+        search_service = get_resource_service("wire_search" if section == "wire" else "agenda")
+        searches = [
+            search_service.get_topic_query(
+                topic, user, company, args={"es_highlight": 1, "ids": list(dict.fromkeys(topic_queue["items"]))}
+            )
+            for topic_queue, topic in topic_queues
+        ]
+
+        # user might not have access to section anymore
+        valid_searches = [search for search in searches if search is not None]
+        size = max((len(topic_queue["items"]) for topic_queue, _ in topic_queues), default=0)
+        results = iter(search_service.get_items_by_queries(valid_searches, size=size) if valid_searches else [])
+
+        queued_items: List[Dict[str, Any]] = []
+        for search in searches:
+            items = next(results) if search is not None else None
+            queued_items.append({item["_id"]: item for item in items} if items is not None else {})
+        return queued_items
+
+    def _pick_latest_item(
+        self, topic_queue: NotificationQueueTopic, queued_items: Dict[str, Any], exclude_items: Set[str]
+    ) -> Optional[Dict[str, Any]]:
+        for item_id in reversed(topic_queue["items"]):
+            if item_id not in exclude_items and item_id in queued_items:
+                return queued_items[item_id]
         return None
 
     def _get_topic_entries_and_match_table(
@@ -207,7 +290,7 @@ class SendScheduledNotificationEmails(Command):
             return topic_entries, topic_match_table
 
         for section in ["wire", "agenda"]:
-            items_in_entries: Set[str] = set()
+            topic_queues: List[Tuple[NotificationQueueTopic, Topic]] = []
             for topic_queue in self._get_queue_entries_for_section(schedule, section):
                 if not len(topic_queue.get("items") or []):
                     # This Topic Queue didn't match any items during this period
@@ -221,10 +304,15 @@ class SendScheduledNotificationEmails(Command):
 
                 topic_match_table[section].append((topic["label"], len(topic_queue["items"])))
                 topics_matched.append(topic["_id"])
+                topic_queues.append((topic_queue, topic))
 
-                latest_item = self._get_latest_item_from_topic_queue(
-                    topic_queue, topic, user, company, items_in_entries
-                )
+            if not topic_queues:
+                continue
+
+            items_in_entries: Set[str] = set()
+            queued_items = self._get_queued_items(section, topic_queues, user, company)
+            for (topic_queue, topic), topic_items in zip(topic_queues, queued_items):
+                latest_item = self._pick_latest_item(topic_queue, topic_items, items_in_entries)
 
                 if latest_item is None:
                     # Latest item was not found. It may have matched multiple topics
@@ -245,6 +333,15 @@ class SendScheduledNotificationEmails(Command):
         return topic_entries, topic_match_table
 
 
+def get_user_lock_id(user_id: ObjectId) -> str:
+    return get_lock_id("newsroom", "send_scheduled_notifications", str(user_id))
+
+
 @celery.task(soft_time_limit=600)
 def send_scheduled_notifications():
     SendScheduledNotificationEmails().run()
+
+
+@celery.task(soft_time_limit=600)
+def send_scheduled_notifications_chunk(user_ids: List[ObjectId], now_utc: datetime, force: bool = False):
+    SendScheduledNotificationEmails().run_chunk(user_ids, now_utc, force)
@@ -1,7 +1,29 @@
+import logging
+
+from flask import current_app as app
+
+logger = logging.getLogger(__name__)
+
+
 def set_photo_coverage_href(coverage, planning_item, deliveries=[]):
     pass
 
 
+def set_photo_coverages_href(coverages):
+    """Set ``delivery_href`` of completed media coverages, used when listing agenda items
+
+    Override it to get the hrefs of all the coverages at once,
+    by default it's using :func:`set_photo_coverage_href` for every coverage.
+    """
+    for coverage in coverages:
+        try:
+            coverage["deliveries"][0]["delivery_href"] = coverage["delivery_href"] = app.set_photo_coverage_href(
+                coverage, None, coverage["deliveries"]
+            )
+        except Exception:
+            logger.exception("Failed to generate delivery_href for coverage={}".format(coverage.get("coverage_id")))
+
+
 def get_media_cards_external(card):
     """Get media cards data from external source. This is will be used to render wire home page media cards.
 
@@ -24,5 +46,6 @@ def customize_rtf_file(rtf_document):
 
 def init_app(app):
     app.set_photo_coverage_href = set_photo_coverage_href
+    app.set_photo_coverages_href = set_photo_coverages_href
     app.get_media_cards_external = get_media_cards_external
     app.customize_rtf_file = customize_rtf_file
@@ -1,6 +1,6 @@
 import warnings
 
-from typing import List, Optional, Union
+from typing import Iterable, List, Optional, Union
 from bson import ObjectId
 
 import newsroom
@@ -9,6 +9,8 @@ from superdesk.services import CacheableService
 from .types import PRODUCT_TYPES
 
 from newsroom.types import Company, Product, User, NavigationIds
+from newsroom.topics import percolator
+from newsroom import directory
 from newsroom.utils import any_objectid_in_list, parse_objectid
 
 IdsList = NavigationIds
@@ -49,7 +51,30 @@ class ProductsResource(newsroom.Resource):
 class ProductsService(CacheableService):
     cache_lookup = {"is_enabled": True}
 
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed("products", [doc["_id"] for doc in docs])
+        if percolator.is_percolator_enabled():
+            for doc in docs:
+                if doc.get("navigations"):
+                    percolator.update_topics_percolator.delay({"navigation": {"$in": doc["navigations"]}})
+
+    def on_updated(self, updates, original):
+        super().on_updated(updates, original)
+        directory.mark_changed("products", [original["_id"]])
+        if percolator.is_percolator_enabled():
+            updated = original.copy()
+            updated.update(updates)
+            topics_lookup = percolator.get_product_topics_lookup(updated)
+            if original.get("navigations"):
+                topics_lookup["$or"].append({"navigation": {"$in": original["navigations"]}})
+            percolator.update_topics_percolator.delay(topics_lookup)
+
     def on_deleted(self, doc: Product) -> None:
+        super().on_deleted(doc)
+        directory.mark_changed("products", [doc["_id"]])
+        topics_lookup = percolator.get_product_topics_lookup(doc) if percolator.is_percolator_enabled() else None
+
         lookup = {"products._id": doc["_id"]}
         for resource in ("users", "companies"):
             items = superdesk.get_resource_service(resource).get(req=None, lookup=lookup)
@@ -57,6 +82,9 @@ class ProductsService(CacheableService):
                 updates = {"products": [p for p in item["products"] if p["_id"] != doc["_id"]]}
                 superdesk.get_resource_service(resource).system_update(item["_id"], updates, item)
 
+        if topics_lookup is not None:
+            percolator.update_topics_percolator.delay(topics_lookup)
+
     def create(self, docs):
         company_products = {}
         for doc in docs:
@@ -84,6 +112,20 @@ products_service = ProductsService()
 
 
 def get_products_by_navigation(navigation_ids: NavigationIds, product_type: Optional[str] = None) -> List[Product]:
+    if directory.is_directory_enabled():
+        products_by_navigation = directory.get_directory("products").get_index("navigations")
+        products = {
+            product["_id"]: product
+            for navigation_id in navigation_ids
+            for product in products_by_navigation.get(str(navigation_id)) or []
+            if product.get("is_enabled")
+        }
+        return [
+            dict(product)
+            for product in sort_products(products.values())
+            if product_type is None or product.get("product_type") == product_type
+        ]
+
     return [
         product
         for product in products_service.get_cached()
@@ -97,7 +139,11 @@ def get_products_by_navigation(navigation_ids: NavigationIds, product_type: Opti
 def get_product_by_id(
     product_id: Union[str, ObjectId], product_type: Optional[str] = None, company_id: Optional[ObjectId] = None
 ) -> Optional[Product]:
-    product = products_service.get_cached_by_id(product_id)
+    if directory.is_directory_enabled():
+        product = directory.get_directory("products").get_docs().get(str(product_id))
+        product = dict(product) if product and product.get("is_enabled") else None
+    else:
+        product = products_service.get_cached_by_id(product_id)
     if not product:
         return None
 
@@ -134,8 +180,7 @@ def get_products_by_company(
     ]
 
     if company_product_ids:
-        lookup = get_products_lookup(company_product_ids, navigation_ids)
-        return list(products_service.get_from_mongo(req=None, lookup=lookup))
+        return get_products(company_product_ids, navigation_ids)
 
     return []
 
@@ -144,8 +189,7 @@ def get_products_by_user(user: User, section: str, navigation_ids: Optional[Navi
     if user.get("products"):
         ids = [parse_objectid(p["_id"]) for p in user["products"] if p["section"] == section]
         if ids:
-            lookup = get_products_lookup(ids, navigation_ids)
-            return list(products_service.get_from_mongo(req=None, lookup=lookup))
+            return get_products(ids, navigation_ids)
 
     return []
 
@@ -157,3 +201,22 @@ def get_products_lookup(product_ids: IdsList, navigation_ids: Optional[IdsList])
         lookup["navigations"] = {"$in": navigation_ids}
 
     return lookup
+
+
+def get_products(product_ids: IdsList, navigation_ids: Optional[IdsList]) -> List[Product]:
+    """Get the products by ids, optionally only those in one of the navigations"""
+    if not directory.is_directory_enabled():
+        lookup = get_products_lookup(product_ids, navigation_ids)
+        return list(products_service.get_from_mongo(req=None, lookup=lookup))
+
+    products = directory.get_directory("products").get_docs()
+    return sort_products(
+        dict(product)
+        for product in (products.get(str(product_id)) for product_id in set(product_ids))
+        if product and (not navigation_ids or any_objectid_in_list(navigation_ids, product.get("navigations") or []))
+    )
+
+
+def sort_products(products: Iterable[Product]) -> List[Product]:
+    """Sort the products like the products resource does by default"""
+    return sorted(products, key=lambda product: product.get("name") or "")
@@ -8,7 +8,8 @@ from newsroom.auth.utils import is_valid_session
 
 from newsroom.types import DashboardCard, Article
 from newsroom.public import blueprint
-from newsroom.utils import query_resource
+from newsroom.cards import get_dashboard_cards
+from newsroom.dashboard_cache import get_cached
 from newsroom.wire.items import get_items_for_dashboard
 
 PUBLIC_DASHBOARD_CONFIG_CACHE_KEY = "public-dashboard-config"
@@ -17,35 +18,27 @@ PUBLIC_DASHBOARD_ITEMS_CACHE_KEY = "public-dashboard-items"
 
 
 def get_public_dashboard_config():
-    if app.cache.get(PUBLIC_DASHBOARD_CONFIG_CACHE_KEY):
-        return app.cache.get(PUBLIC_DASHBOARD_CONFIG_CACHE_KEY)
-
-    config = get_resource_service("ui_config").get_section_config("home")
-    app.cache.set(
-        PUBLIC_DASHBOARD_CONFIG_CACHE_KEY, config, timeout=app.config.get("PUBLIC_CONTENT_CACHE_TIMEOUT", 240)
+    return get_cached(
+        PUBLIC_DASHBOARD_CONFIG_CACHE_KEY,
+        lambda: get_resource_service("ui_config").get_section_config("home"),
+        app.config.get("PUBLIC_CONTENT_CACHE_TIMEOUT", 240),
     )
-    return config
 
 
 def get_public_items_by_cards() -> Dict[str, List[Article]]:
-    if app.cache.get(PUBLIC_DASHBOARD_ITEMS_CACHE_KEY):
-        return app.cache.get(PUBLIC_DASHBOARD_ITEMS_CACHE_KEY)
-
-    items_by_card = get_items_for_dashboard(get_public_cards(), True, True)
-    app.cache.set(
-        PUBLIC_DASHBOARD_ITEMS_CACHE_KEY, items_by_card, timeout=app.config.get("PUBLIC_CONTENT_CACHE_TIMEOUT", 240)
+    return get_cached(
+        PUBLIC_DASHBOARD_ITEMS_CACHE_KEY,
+        lambda: get_items_for_dashboard(get_public_cards(), True, True),
+        app.config.get("PUBLIC_CONTENT_CACHE_TIMEOUT", 240),
     )
-    return items_by_card
 
 
 def get_public_cards() -> List[DashboardCard]:
-    if app.cache.get(PUBLIC_DASHBOARD_CARDS_CACHE_KEY):
-        return app.cache.get(PUBLIC_DASHBOARD_CARDS_CACHE_KEY)
-
-    cards = list(query_resource("cards", lookup={"dashboard": "newsroom"}))
-    app.cache.set(PUBLIC_DASHBOARD_CARDS_CACHE_KEY, cards, timeout=app.config.get("PUBLIC_CONTENT_CACHE_TIMEOUT", 240))
-
-    return cards
+    return get_cached(
+        PUBLIC_DASHBOARD_CARDS_CACHE_KEY,
+        lambda: get_dashboard_cards("newsroom"),
+        app.config.get("PUBLIC_CONTENT_CACHE_TIMEOUT", 240),
+    )
 
 
 @blueprint.route("/page/<path:template>")
@@ -7,7 +7,7 @@ import newsroom.signals as signals
 
 from copy import copy, deepcopy
 from datetime import datetime, timedelta
-from typing import Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from contextlib import contextmanager
 
 from flask import current_app as app
@@ -32,6 +32,7 @@ from newsroom.topics.topics import (
 )
 from newsroom.utils import parse_dates, get_user_dict, get_company_dict, parse_date_str
 from newsroom.email import (
+    email_batch,
     send_new_item_notification_email,
     send_history_match_notification_email,
     send_item_killed_notification_email,
@@ -46,6 +47,8 @@ from newsroom.agenda.utils import (
     push_agenda_item_notification,
 )
 from newsroom.users import users_service
+from newsroom.types import Topic, User
+from newsroom.search.service import SearchQuery
 
 
 logger = logging.getLogger(__name__)
@@ -894,7 +897,8 @@ def notify_user_matches(item, users_dict, companies_dict, user_ids, company_ids,
                     data=None,
                 )
                 for user in users_ids
-            ]
+            ],
+            users=users_dict,
         )
 
         send_user_notification_emails(item, users_ids, users_dict, section)
@@ -962,6 +966,9 @@ def notify_agenda_topic_matches(item, users_dict, companies_dict) -> Set[ObjectI
 def send_topic_notification_emails(item, topics, topic_matches, users, companies) -> Set[ObjectId]:
     users_processed: Set[ObjectId] = set()
     users_with_realtime_subscription: Set[ObjectId] = set()
+    realtime_emails: List[Tuple[User, Topic, str, str]] = []
+    highlight_searches: Dict[str, Dict[str, SearchQuery]] = {}
+    notifications: List[UserNotification] = []
 
     for topic in topics:
         if topic["_id"] not in topic_matches:
@@ -978,16 +985,14 @@ def send_topic_notification_emails(item, topics, topic_matches, users, companies
             section = topic.get("topic_type") or "wire"
             if user["_id"] not in users_processed:
                 # Only send websocket notification once for each item
-                save_user_notifications(
-                    [
-                        UserNotification(
-                            user=user["_id"],
-                            item=item["_id"],
-                            resource=section,
-                            action="topic_matches",
-                            data=None,
-                        )
-                    ]
+                notifications.append(
+                    UserNotification(
+                        user=user["_id"],
+                        item=item["_id"],
+                        resource=section,
+                        action="topic_matches",
+                        data=None,
+                    )
                 )
                 users_processed.add(user["_id"])
 
@@ -1003,28 +1008,68 @@ def send_topic_notification_emails(item, topics, topic_matches, users, companies
                 continue
             else:
                 users_with_realtime_subscription.add(user["_id"])
-                search_service = superdesk.get_resource_service(
-                    "wire_search" if topic["topic_type"] == "wire" else "agenda"
-                )
+                search_service = get_topic_search_service(section)
                 query = search_service.get_topic_query(
                     topic, user, company, args={"es_highlight": 1, "ids": [item["_id"]]}
                 )
 
-                items = search_service.get_items_by_query(query, size=1)
-                highlighted_item = item
-                if items.count():
-                    highlighted_item = items[0]
-
-                send_new_item_notification_email(
-                    user,
-                    topic["label"],
-                    item=highlighted_item,
-                    section=section,
-                )
+                # Users with the same topic, products and section filters share the same query,
+                # so it's only executed once
+                query_key = get_search_query_key(query) if query else ""
+                if query:
+                    highlight_searches.setdefault(section, {}).setdefault(query_key, query)
+                realtime_emails.append((user, topic, section, query_key))
+
+    save_user_notifications(notifications, users=users)
+
+    highlighted_items = get_highlighted_items(highlight_searches)
+    with email_batch():
+        for user, topic, section, query_key in realtime_emails:
+            send_new_item_notification_email(
+                user,
+                topic["label"],
+                item=highlighted_items.get(query_key) or item,
+                section=section,
+            )
 
     return users_with_realtime_subscription
 
 
+def get_topic_search_service(section: str):
+    return superdesk.get_resource_service("wire_search" if section == "wire" else "agenda")
+
+
+def get_search_query_key(search: SearchQuery) -> str:
+    """Returns key of the search query, before the source is generated
+
+    Highlight settings are generated from ``search.args`` later, so these are part of the key.
+    """
+
+    return flask.json.dumps({"query": search.query, "args": search.args}, sort_keys=True)
+
+
+def get_highlighted_items(searches: Dict[str, Dict[str, SearchQuery]]) -> Dict[str, Any]:
+    """Run the highlight searches for each section in a single ``_msearch`` request
+
+    :return: Highlighted item for each of the query keys
+    """
+
+    highlighted_items: Dict[str, Any] = {}
+    for section, section_searches in searches.items():
+        search_service = get_topic_search_service(section)
+        try:
+            results = search_service.get_items_by_queries(list(section_searches.values()), size=1)
+        except Exception:
+            logger.exception("Failed to get highlighted items for %s notifications", section)
+            continue
+
+        for query_key, items in zip(section_searches.keys(), results):
+            if items is not None and items.count():
+                highlighted_items[query_key] = items[0]
+
+    return highlighted_items
+
+
 # keeping this for testing
 @blueprint.route("/notify", methods=["POST"])
 def notify():
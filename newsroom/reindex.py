@@ -0,0 +1,351 @@
+"""Mongo to Elasticsearch reindex
+================================
+
+Used by ``index_from_mongo_period`` and ``schema_migrate`` commands to index documents stored in mongo.
+
+The ``_id`` range of the collection is split into ``REINDEX_WORKERS`` parts, each one indexed in a separate process.
+Every process reads documents from mongo in a separate thread, passing batches of ``REINDEX_BULK_BYTES``
+to the bulk requests via a bounded queue, so reading the next batch overlaps with indexing of the previous one.
+
+Progress of each part is stored in the ``newsroom`` db after every batch, so an interrupted reindex
+can continue from there using ``resume``.
+"""
+
+import time
+import queue
+import threading
+import multiprocessing
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import bson
+import pymongo
+from bson import json_util
+from elasticsearch import helpers as es_helpers
+from eve_elastic.elastic import generate_index_name
+from flask import current_app as app
+from superdesk.errors import BulkIndexError
+from superdesk.utc import utcnow
+
+#: Collections with less documents than this per worker are indexed in a single process
+MIN_PART_SIZE = 10000
+
+#: Number of ids sampled per worker to find the part boundaries
+SAMPLE_SIZE = 100
+
+#: Number of batches read ahead of the bulk requests
+QUEUE_SIZE = 4
+
+#: Print throughput every this many seconds
+REPORT_INTERVAL = 10
+
+Report = Callable[[int, List[Dict[str, Any]]], None]
+
+
+def get_checkpoint_id(resource: str) -> str:
+    return f"reindex:{resource}"
+
+
+def _get_checkpoint_db():
+    return app.data.mongo.pymongo().db["newsroom"]
+
+
+def get_parts(collection, lookup: Dict[str, Any], workers: int) -> List[Dict[str, Any]]:
+    """Split the ``_id`` range of documents matching the lookup into parts of similar size"""
+
+    part: Dict[str, Any] = {"lower": None, "upper": None, "last_id": None, "indexed": 0, "done": False}
+    if workers <= 1 or collection.estimated_document_count() < workers * MIN_PART_SIZE:
+        return [part]
+
+    sample = [
+        doc["_id"]
+        for doc in collection.aggregate(
+            [
+                {"$match": lookup},
+                {"$sample": {"size": workers * SAMPLE_SIZE}},
+                {"$project": {"_id": 1}},
+                {"$sort": {"_id": 1}},
+            ]
+        )
+    ]
+    if not sample or len({type(_id) for _id in sample}) > 1:
+        # range queries only match ids of the same type
+        return [part]
+
+    bounds: List[Any] = []
+    for i in range(1, workers):
+        bound = sample[len(sample) * i // workers]
+        if not bounds or bounds[-1] != bound:
+            bounds.append(bound)
+
+    edges = [None] + bounds + [None]
+    return [dict(part, lower=edges[i], upper=edges[i + 1]) for i in range(len(edges) - 1)]
+
+
+def get_part_lookup(lookup: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    id_lookup = {}
+    if part.get("last_id") is not None:
+        id_lookup["$gt"] = part["last_id"]
+    elif part.get("lower") is not None:
+        id_lookup["$gte"] = part["lower"]
+    if part.get("upper") is not None:
+        id_lookup["$lt"] = part["upper"]
+
+    if not id_lookup:
+        return lookup
+    return {"$and": [lookup, {"_id": id_lookup}]} if lookup else {"_id": id_lookup}
+
+
+class BatchReader(threading.Thread):
+    """Reads documents from the cursor into batches of about ``bulk_bytes`` size"""
+
+    def __init__(self, cursor, bulk_bytes: int):
+        super().__init__(name="reindex-reader", daemon=True)
+        self.cursor = cursor
+        self.bulk_bytes = bulk_bytes
+        self.batches: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self.stopped = threading.Event()
+        self.error: Optional[Exception] = None
+
+    def run(self) -> None:
+        try:
+            batch: List[Dict[str, Any]] = []
+            size = 0
+            for doc in self.cursor:
+                batch.append(doc)
+                size += len(bson.BSON.encode(doc))
+                if size >= self.bulk_bytes:
+                    self.put(batch)
+                    batch = []
+                    size = 0
+            if batch:
+                self.put(batch)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.put(None)
+
+    def put(self, batch: Optional[List[Dict[str, Any]]]) -> None:
+        while not self.stopped.is_set():
+            try:
+                self.batches.put(batch, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        self.start()
+        try:
+            while True:
+                batch = self.batches.get()
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            self.stopped.set()
+            self.cursor.close()
+
+        if self.error is not None:
+            raise self.error
+
+
+def index_part(resource: str, index: str, lookup: Dict[str, Any], part_no: int, report: Report) -> None:
+    """Index documents of the given part, storing the last indexed id after every batch"""
+
+    checkpoints = _get_checkpoint_db()
+    checkpoint_id = get_checkpoint_id(resource)
+    part = checkpoints.find_one({"_id": checkpoint_id})["parts"][part_no]
+    bulk_bytes = app.config.get("REINDEX_BULK_BYTES", 10 * 1024 * 1024)
+
+    elastic = app.data.elastic
+    es = elastic.elastic(resource)
+    cursor = app.data.get_mongo_collection(resource).find(
+        get_part_lookup(lookup, part), sort=[("_id", pymongo.ASCENDING)], no_cursor_timeout=True
+    )
+
+    for batch in BatchReader(cursor, bulk_bytes):
+        actions = [{"_id": doc["_id"], "_source": elastic._prepare_for_storage(resource, doc, {})} for doc in batch]
+        indexed, errors = es_helpers.bulk(
+            es,
+            actions,
+            index=index,
+            chunk_size=len(actions),
+            max_chunk_bytes=bulk_bytes * 2,
+            max_retries=3,
+            raise_on_error=False,
+        )
+        checkpoints.update_one(
+            {"_id": checkpoint_id},
+            {
+                "$set": {f"parts.{part_no}.last_id": batch[-1]["_id"]},
+                "$inc": {f"parts.{part_no}.indexed": indexed},
+            },
+        )
+        report(indexed, errors)
+
+    checkpoints.update_one({"_id": checkpoint_id}, {"$set": {f"parts.{part_no}.done": True}})
+
+
+def _index_part_process(flask_app, resource: str, index: str, lookup: Dict[str, Any], part_no: int, results) -> None:
+    with flask_app.app_context():
+        # connections must not be shared with the parent process
+        flask_app.data.mongo.driver.clear()
+        flask_app.data.elastic.elastics.clear()
+        index_part(resource, index, lookup, part_no, lambda indexed, errors: results.put((indexed, errors[:10])))
+
+
+class Progress:
+    def __init__(self, resource: str):
+        self.resource = resource
+        self.indexed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.started = time.monotonic()
+        self.reported = self.started
+
+    def add(self, indexed: int, errors: List[Dict[str, Any]]) -> None:
+        self.indexed += indexed
+        self.errors.extend(errors)
+        if time.monotonic() - self.reported >= REPORT_INTERVAL:
+            self.report()
+
+    def report(self) -> None:
+        self.reported = time.monotonic()
+        elapsed = self.reported - self.started
+        print(
+            "{} Indexed {} {} documents, {:.0f} docs/sec".format(
+                time.strftime("%X %x %Z"), self.indexed, self.resource, self.indexed / elapsed if elapsed else 0
+            )
+        )
+
+
+def reindex_from_mongo(
+    resource: str,
+    lookup: Optional[Dict[str, Any]] = None,
+    index: Optional[str] = None,
+    workers: Optional[int] = None,
+    resume: bool = False,
+) -> int:
+    """Index documents matching the lookup from mongo to elastic
+
+    :param resource: Resource name
+    :param lookup: Mongo filter of documents to index
+    :param index: Elastic index, defaults to the resource index
+    :param workers: Number of processes, defaults to ``REINDEX_WORKERS`` config
+    :param resume: Continue previously interrupted reindex of the resource into the same index
+    :return: Number of indexed documents
+    """
+
+    lookup = lookup or {}
+    index = index or app.data.elastic._resource_index(resource)
+    workers = workers or app.config.get("REINDEX_WORKERS", 4)
+    checkpoints = _get_checkpoint_db()
+    checkpoint_id = get_checkpoint_id(resource)
+
+    checkpoint = checkpoints.find_one({"_id": checkpoint_id}) if resume else None
+    if checkpoint and checkpoint.get("index") == index:
+        lookup = json_util.loads(checkpoint["lookup"])
+        parts = checkpoint["parts"]
+        print(
+            "Resuming indexing of {}, {} documents already indexed".format(resource, sum(p["indexed"] for p in parts))
+        )
+    else:
+        parts = get_parts(app.data.get_mongo_collection(resource), lookup, workers)
+        checkpoints.replace_one(
+            {"_id": checkpoint_id},
+            {"index": index, "lookup": json_util.dumps(lookup), "parts": parts, "started": utcnow()},
+            upsert=True,
+        )
+
+    progress = Progress(resource)
+    pending = [part_no for part_no, part in enumerate(parts) if not part.get("done")]
+    if len(pending) == 1:
+        index_part(resource, index, lookup, pending[0], progress.add)
+    elif pending:
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=_index_part_process,
+                args=(app._get_current_object(), resource, index, lookup, part_no, results),
+                name=f"reindex-{resource}-{part_no}",
+            )
+            for part_no in pending
+        ]
+        for process in processes:
+            process.start()
+
+        while any(process.is_alive() for process in processes) or not results.empty():
+            try:
+                progress.add(*results.get(timeout=1))
+            except queue.Empty:
+                continue
+
+        for process in processes:
+            process.join()
+
+        failed = [process.name for process in processes if process.exitcode]
+        if failed:
+            raise SystemExit("Failed to index {}, run again with resume to continue".format(", ".join(failed)))
+
+    progress.report()
+    if progress.errors:
+        print("Failed to do bulk insert of items {}. Errors: {}".format(len(progress.errors), progress.errors))
+        raise BulkIndexError(resource=resource, errors=progress.errors)
+
+    checkpoints.delete_one({"_id": checkpoint_id})
+    app.data.elastic.elastic(resource).indices.refresh(index=index)
+    return progress.indexed
+
+
+def rebuild_index_from_mongo(resource: str, workers: Optional[int] = None) -> None:
+    """Create new index with the current mapping, index all documents from mongo and switch the alias to it
+
+    An interrupted rebuild continues in the same index next time.
+
+    Documents updated during the rebuild are indexed again before switching the alias,
+    but documents deleted during the rebuild are not removed, so these stay in the new index.
+    """
+
+    elastic = app.data.elastic
+    es = elastic.elastic(resource)
+    alias = elastic._resource_index(resource)
+    settings = elastic._resource_config(resource, "SETTINGS")
+
+    checkpoint = _get_checkpoint_db().find_one({"_id": get_checkpoint_id(resource)})
+    if (
+        checkpoint
+        and checkpoint.get("index", "").startswith(f"{alias}_")
+        and es.indices.exists(index=checkpoint["index"])
+    ):
+        index = checkpoint["index"]
+        started = checkpoint["started"]
+    else:
+        index = generate_index_name(alias)
+        started = utcnow()
+        print("Creating index {}".format(index))
+        elastic._create_index(es, index, settings)
+        elastic._put_mapping(es, index, elastic._resource_mapping(resource))
+
+    # refresh is not needed until the alias is switched
+    es.indices.put_settings(index=index, body={"index": {"refresh_interval": "-1"}})
+    reindex_from_mongo(resource, index=index, workers=workers, resume=True)
+
+    # index documents updated while the rebuild was running
+    reindex_from_mongo(resource, lookup={"_updated": {"$gte": started}}, index=index, workers=1)
+
+    refresh_interval = ((settings or {}).get("settings") or {}).get("refresh_interval")
+    es.indices.put_settings(index=index, body={"index": {"refresh_interval": refresh_interval}})
+
+    old_indices = list(es.indices.get_alias(name=alias).keys()) if es.indices.exists_alias(name=alias) else []
+    if not old_indices and es.indices.exists(index=alias):
+        # this was not an alias, but an index
+        es.indices.delete(index=alias)
+
+    print("Switching alias {} to index {}".format(alias, index))
+    actions = [{"remove": {"index": old_index, "alias": alias}} for old_index in old_indices]
+    actions.append({"add": {"index": index, "alias": alias}})
+    es.indices.update_aliases(body={"actions": actions})
+
+    for old_index in old_indices:
+        if old_index != index:
+            print("Removing index {}".format(old_index))
+            es.indices.delete(index=old_index)
@@ -1,12 +1,14 @@
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import abort, request
+from flask import abort, request, current_app as app
 from flask_babel import gettext
 
 from superdesk import get_resource_service
 from superdesk.utc import utc_to_local
 
 from newsroom.wire.search import items_query
+from newsroom.search.scroll import scroll_search
 from newsroom.agenda.agenda import get_date_filters
 from newsroom.utils import query_resource, MAX_TERMS_SIZE
 
@@ -18,7 +20,8 @@ def get_items(args):
     """Get all the news items for the date and filters provided
 
     For performance reasons, returns an iterator that yields an array of CHUNK_SIZE
-    So that aggregations can be queried while the next iteration is retrieved
+    So that aggregations can be queried while the next iteration is retrieved,
+    see :func:`get_items_with_aggregations`
     """
 
     if not args.get("section"):
@@ -26,8 +29,6 @@ def get_items(args):
 
     source = {
         "query": items_query(True),
-        "size": CHUNK_SIZE,
-        "from": 0,
         "sort": [{"versioncreated": "asc"}],
         "_source": [
             "_resource",
@@ -57,16 +58,9 @@ def get_items(args):
     section = args["section"]
     get_resource_service("section_filters").apply_section_filter(source["query"], section)
 
-    while True:
-        results = get_resource_service(section if section == "agenda" else f"{section}_search").search(source)
-        items = list(results)
-
-        if not len(items):
-            break
-
-        source["from"] += CHUNK_SIZE
-
-        yield items
+    resource = get_resource_service(section if section == "agenda" else f"{section}_search").datasource
+    for results in scroll_search(resource, source, CHUNK_SIZE):
+        yield list(results)
 
 
 def get_aggregations(args, ids):
@@ -114,6 +108,38 @@ def get_aggregations(args, ids):
     }
 
 
+def _get_aggregations_in_app_context(flask_app, args, ids):
+    with flask_app.app_context():
+        return get_aggregations(args, ids)
+
+
+def add_aggregations(items, aggs):
+    for item in items:
+        item["aggs"] = aggs.get(item["_id"]) or {"total": 0, "actions": {}, "companies": []}
+        yield item
+
+
+def get_items_with_aggregations(args):
+    """Yield the news items with their action aggregations
+
+    Aggregations for a chunk of items are fetched while the next chunk is retrieved.
+    """
+
+    flask_app = app._get_current_object()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        previous = None
+        for items in get_items(args):
+            future = executor.submit(
+                _get_aggregations_in_app_context, flask_app, args, [item.get("_id") for item in items]
+            )
+            if previous is not None:
+                yield from add_aggregations(previous[0], previous[1].result())
+            previous = (items, future)
+
+        if previous is not None:
+            yield from add_aggregations(previous[0], previous[1].result())
+
+
 def get_facets(args):
     """Get aggregations for genre and companies using the date range and section
 
@@ -178,22 +204,20 @@ def get_facets(args):
 
 
 def export_csv(args, results):
-    """Generate 2-dimensional array for generating the CSV output"""
+    """Generate rows of the CSV output, as the results are iterated"""
 
     companies = {str(company["_id"]): company for company in query_resource("companies")}
 
-    rows = [
-        [
-            gettext("Published"),
-            gettext("Headline"),
-            gettext("Take Key"),
-            gettext("Place"),
-            gettext("Category"),
-            gettext("Subject"),
-            gettext("Source"),
-            gettext("Companies"),
-            gettext("Actions"),
-        ]
+    header = [
+        gettext("Published"),
+        gettext("Headline"),
+        gettext("Take Key"),
+        gettext("Place"),
+        gettext("Category"),
+        gettext("Subject"),
+        gettext("Source"),
+        gettext("Companies"),
+        gettext("Actions"),
     ]
 
     actions = args.get("action") or [
@@ -208,28 +232,30 @@ def export_csv(args, results):
     ]
 
     if "download" in actions:
-        rows[0].append(gettext("Download"))
+        header.append(gettext("Download"))
 
     if "copy" in actions:
-        rows[0].append(gettext("Copy"))
+        header.append(gettext("Copy"))
 
     if "share" in actions:
-        rows[0].append(gettext("Share"))
+        header.append(gettext("Share"))
 
     if "print" in actions:
-        rows[0].append(gettext("Print"))
+        header.append(gettext("Print"))
 
     if "open" in actions:
-        rows[0].append(gettext("Open"))
+        header.append(gettext("Open"))
 
     if "preview" in actions:
-        rows[0].append(gettext("Preview"))
+        header.append(gettext("Preview"))
 
     if "clipboard" in actions:
-        rows[0].append(gettext("Clipboard"))
+        header.append(gettext("Clipboard"))
 
     if "api" in actions:
-        rows[0].append(gettext("API retrieval"))
+        header.append(gettext("API retrieval"))
+
+    yield header
 
     for item in results:
         aggs = item.get("aggs") or {}
@@ -258,9 +284,7 @@ def export_csv(args, results):
             if action_name in actions:
                 row.append((aggs.get("actions") or {}).get(action_name, 0))
 
-        rows.append(row)
-
-    return rows
+        yield row
 
 
 def get_content_activity_report():
@@ -282,20 +306,7 @@ def get_content_activity_report():
         # for genre and companies
         return get_facets(args)
 
-    response = {"results": [], "name": gettext("Content activity")}
-
-    for items in get_items(args):
-        item_ids = [item.get("_id") for item in items]
-        aggs = get_aggregations(args, item_ids)
-
-        for item in items:
-            item_id = item["_id"]
-
-            if aggs.get(item_id):
-                item["aggs"] = aggs[item_id]
-            else:
-                item["aggs"] = {"total": 0, "actions": {}, "companies": []}
-
-            response["results"].append(item)
+    if args.get("export"):
+        return export_csv(args, get_items_with_aggregations(args))
 
-    return export_csv(args, response["results"]) if args.get("export") else response
+    return {"results": list(get_items_with_aggregations(args)), "name": gettext("Content activity")}
@@ -0,0 +1,95 @@
+"""Report exports
+==============
+
+Reports are exported by iterating the rows generated by the report, so neither the data
+nor the CSV output is kept in memory. The CSV is either streamed to the response,
+or in async mode written to media storage and a link to download it is sent via email.
+
+Stored exports are only available to the requesting user, they are not served via ``/assets``
+and are removed after ``REPORTS_EXPORT_EXPIRY_HOURS``.
+"""
+
+import logging
+import tempfile
+from typing import Any, Dict, Iterable, Optional
+
+import flask
+from bson import ObjectId
+from flask import current_app as app, url_for
+from flask_babel import gettext
+from superdesk import get_resource_service
+from superdesk.utc import utcnow
+
+from newsroom.celery_app import celery
+from newsroom.download import CHUNK_SIZE, stream_csv
+from newsroom.email import send_user_email
+from newsroom.upload import ASSETS_RESOURCE
+
+from .utils import get_current_user_reports
+
+logger = logging.getLogger(__name__)
+
+#: Media storage folder for async exports, not served via ``/assets``
+EXPORTS_FOLDER = "report_exports"
+
+
+def get_report_rows(report: str) -> Optional[Iterable[Any]]:
+    """Returns the rows of the report for the current request, ``None`` for unknown report"""
+
+    func = get_current_user_reports().get(report)
+    if not func:
+        return None
+
+    rows = func()
+    if isinstance(rows, dict):
+        # report only available as json
+        flask.abort(400, gettext("Report {} can't be exported".format(report)))
+    return rows
+
+
+def get_export_filename(report: str) -> str:
+    return "{}-{}.csv".format(report, utcnow().strftime("%Y%m%d%H%M%S"))
+
+
+@celery.task(soft_time_limit=1800)
+def export_report_async(report: str, args: Dict[str, Any], user_id: str):
+    """Generate the report export in the name of the user, store it and send the user a link to download it"""
+
+    user = get_resource_service("users").find_one(req=None, _id=ObjectId(user_id))
+    if not user:
+        logger.warning("User %s not found, skipping report %s export", user_id, report)
+        return
+
+    with app.test_request_context(query_string=args):
+        flask.session["user"] = str(user["_id"])
+        flask.session["user_type"] = user.get("user_type")
+
+        rows = get_report_rows(report)
+        if rows is None:
+            logger.warning("Report %s is not available for user %s", report, user_id)
+            return
+
+        filename = get_export_filename(report)
+        with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 4) as export_file:
+            for chunk in stream_csv(rows):
+                export_file.write(chunk)
+            export_file.seek(0)
+            media_id = app.media.put(
+                export_file,
+                filename=filename,
+                content_type="text/csv",
+                resource=ASSETS_RESOURCE,
+                folder=EXPORTS_FOLDER,
+                metadata={"user": str(user["_id"])},
+            )
+
+        send_user_email(
+            user,
+            template="report_export_email",
+            template_kwargs=dict(
+                app_name=app.config["SITE_NAME"],
+                name=user.get("first_name"),
+                url=url_for("reports.download_export", media_id=media_id, _external=True),
+            ),
+            ignore_preferences=True,
+        )
@@ -1,14 +1,11 @@
-import io
-import csv
 from collections import defaultdict
 from copy import deepcopy
 
 from bson import ObjectId
 from flask import abort
 from flask_babel import gettext
-from flask import request, send_file, current_app as newsroom_app, json
+from flask import request, current_app as newsroom_app, json
 from eve.utils import ParsedRequest
-from werkzeug.utils import secure_filename
 import superdesk
 from superdesk.utc import utcnow
 
@@ -165,6 +162,9 @@ def get_product_stories():
 
 def get_company_report():
     """Returns products by company"""
+    if request.args.get("export"):
+        return export_company_report()
+
     results = []
     companies = list(query_resource("companies"))
     products_data = get_entity_dict(query_resource("products"))
@@ -188,6 +188,28 @@ def get_company_report():
     return {"results": sorted_results, "name": gettext("Company")}
 
 
+def export_company_report():
+    """Generate rows of the CSV output, loading users of one company at a time"""
+
+    products_data = get_entity_dict(query_resource("products"))
+    companies = sorted(query_resource("companies"), key=lambda company: company.get("name") or "")
+
+    yield [gettext("Company"), gettext("Enabled"), gettext("Products"), gettext("Users")]
+    for company in companies:
+        users = query_resource("users", lookup={"company": str(company["_id"])})
+        yield [
+            company.get("name"),
+            company.get("is_enabled"),
+            "\r\n".join(
+                sorted(
+                    (products_data.get(product.get("_id")) or {}).get("name") or ""
+                    for product in company.get("products") or []
+                )
+            ),
+            "\r\n".join(sorted("{} {}".format(user.get("first_name"), user.get("last_name")) for user in users)),
+        ]
+
+
 def get_subscriber_activity_report():
     args = deepcopy(request.args.to_dict())
 
@@ -213,6 +235,9 @@ def get_subscriber_activity_report():
     if len(must_terms) > 0:
         source["query"] = {"bool": {"filter": must_terms}}
 
+    if request.args.get("export"):
+        return export_subscriber_activity(source)
+
     source["size"] = 25
     source["from"] = int(args.get("from", 0))
     source["aggs"] = aggregations
@@ -222,11 +247,17 @@ def get_subscriber_activity_report():
         return abort(400)
 
     # Get the results
-    results = superdesk.get_resource_service("history").fetch_history(source, args.get("export"))
-    docs = results["items"]
-    hits = results["hits"]
+    results = superdesk.get_resource_service("history").fetch_history(source)
+    docs = enhance_subscriber_activity(results["items"])
 
-    # Enhance the results
+    return {
+        "results": docs,
+        "name": gettext("SubscriberActivity"),
+        "aggregations": results["hits"].get("aggregations"),
+    }
+
+
+def enhance_subscriber_activity(docs):
     wire_ids = []
     agenda_ids = []
     company_ids = []
@@ -275,45 +306,23 @@ def get_subscriber_activity_report():
         doc["section"] = get_section_name(doc["section"])
         doc["action"] = doc["action"].capitalize() if doc["action"].lower() != "api" else "API retrieval"
 
-    if not request.args.get("export"):
-        results = {
-            "results": docs,
-            "name": gettext("SubscriberActivity"),
-            "aggregations": hits.get("aggregations"),
-        }
-        return results
-    else:
-        field_names = ["Company", "Section", "Item", "Action", "User", "Created"]
-        temp_file = io.StringIO()
-        attachment_filename = "%s.csv" % utcnow().strftime("%Y%m%d%H%M%S")
-        writer = csv.DictWriter(temp_file, delimiter=",", fieldnames=field_names)
-        writer.writeheader()
-        for doc in docs:
-            row = {
-                "Company": doc.get("company"),
-                "Section": doc.get("section"),
-                "Item": (doc.get("item") or {})["item_text"],
-                "Action": doc.get("action"),
-                "User": doc.get("user"),
-                "Created": doc.get("versioncreated").strftime("%H:%M %d/%m/%y"),
-            }
+    return docs
 
-            writer.writerow(row)
-        temp_file.seek(0)
-        mimetype = "text/plain"
-        # Creating the byteIO object from the StringIO Object
-        mem = io.BytesIO()
-        mem.write(temp_file.getvalue().encode("utf-8"))
-        # seeking was necessary. Python 3.5.2, Flask 0.12.2
-        mem.seek(0)
-        temp_file.close()
-        attachment_filename = secure_filename(attachment_filename)
-        return send_file(
-            mem,
-            mimetype=mimetype,
-            attachment_filename=attachment_filename,
-            as_attachment=True,
-        )
+
+def export_subscriber_activity(source):
+    """Generate rows of the CSV output, enhancing the records page by page as these are fetched"""
+
+    yield ["Company", "Section", "Item", "Action", "User", "Created"]
+    for docs in superdesk.get_resource_service("history").scroll_history(source):
+        for doc in enhance_subscriber_activity(docs):
+            yield [
+                doc.get("company"),
+                doc.get("section"),
+                doc["item"].get("item_text") if isinstance(doc.get("item"), dict) else doc.get("item"),
+                doc.get("action"),
+                doc.get("user"),
+                doc.get("versioncreated").strftime("%H:%M %d/%m/%y"),
+            ]
 
 
 def get_company_api_usage():
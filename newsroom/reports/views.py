@@ -1,13 +1,16 @@
-from io import StringIO
-import csv
-
-from flask import session, jsonify, render_template, abort, current_app as newsroom_app
+import os
+import bson.errors
+from flask import request, session, jsonify, render_template, abort, current_app as newsroom_app
 from flask_babel import gettext, current_app as app
 
+from newsroom.auth import get_user_id
 from newsroom.decorator import account_manager_or_company_admin_only
+from newsroom.download import read_chunks, stream_csv, stream_gzip, stream_response
 from newsroom.reports import blueprint
+from newsroom.upload import ASSETS_RESOURCE
 from newsroom.utils import query_resource
 
+from .export import export_report_async, get_export_filename, get_report_rows
 from .utils import get_current_user_reports
 
 
@@ -53,25 +56,36 @@ def get_report(report):
 @blueprint.route("/reports/export/<report>", methods=["GET"])
 @account_manager_or_company_admin_only
 def export_reports(report):
-    reports = get_current_user_reports()
-    func = reports.get(report)
-
-    if not func:
+    if report not in get_current_user_reports():
         abort(400, gettext("Unknown report {}".format(report)))
 
-    rows = func()
-    data = StringIO()
-    writer = csv.writer(data, dialect="excel")
+    if request.args.get("async"):
+        export_report_async.delay(report, request.args.to_dict(), str(get_user_id()))
+        return jsonify({"message": gettext("The report will be sent to your email once it's ready.")}), 202
 
-    for row in rows:
-        writer.writerow(row)
-
-    csv_file = data.getvalue().encode("utf-8")
-
-    response = newsroom_app.response_class(response=csv_file, status=200, mimetype="text/csv", direct_passthrough=True)
+    content = stream_csv(get_report_rows(report))
+    gzip = app.config.get("REPORTS_EXPORT_GZIP") and "gzip" in request.accept_encodings
+    response = stream_response(stream_gzip(content) if gzip else content, "text/csv", "report-export.csv")
+    if gzip:
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+    return response
 
-    response.content_length = len(csv_file)
-    response.headers["Content-Type"] = "text/csv"
-    response.headers["Content-Disposition"] = 'attachment; filename="report-export.csv"'
 
-    return response
+@blueprint.route("/reports/exports/<media_id>", methods=["GET"])
+@account_manager_or_company_admin_only
+def download_export(media_id):
+    try:
+        media_file = newsroom_app.media.get(media_id, ASSETS_RESOURCE)
+    except bson.errors.InvalidId:
+        media_file = None
+
+    # exports are only available to the user who requested them
+    if not media_file or str((media_file.metadata or {}).get("user")) != str(get_user_id()):
+        abort(404)
+
+    return stream_response(
+        read_chunks(media_file),
+        "text/csv",
+        os.path.basename(media_file.filename or "") or get_export_filename("report-export"),
+    )
@@ -0,0 +1,85 @@
+"""Search scroll
+=============
+
+Iterates over all results of a search, without the ``from + size`` window limit and without elastic
+having to collect all the skipped documents for every deep page.
+
+Pages are fetched using ``search_after`` the sort values of the last hit, in a point in time
+so the results are consistent even if documents are added while iterating.
+When point in time is not supported by the elastic client or server, ``_id`` is used as a tiebreaker instead.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from elasticsearch.exceptions import TransportError
+from eve_elastic.elastic import ElasticCursor
+from flask import current_app as app
+
+logger = logging.getLogger(__name__)
+
+#: Number of documents fetched per request
+SCROLL_PAGE_SIZE = 500
+
+#: How long is the point in time kept between requests
+SCROLL_KEEP_ALIVE = "2m"
+
+
+def open_point_in_time(es, index: str) -> Optional[str]:
+    try:
+        return es.open_point_in_time(index=index, keep_alive=SCROLL_KEEP_ALIVE)["id"]
+    except (AttributeError, TransportError):
+        logger.warning("Point in time is not available, using search_after only")
+        return None
+
+
+def close_point_in_time(es, pit_id: str) -> None:
+    try:
+        es.close_point_in_time(body={"id": pit_id})
+    except TransportError:
+        logger.warning("Failed to close point in time")
+
+
+def scroll_search(resource: str, source: Dict[str, Any], page_size: int = SCROLL_PAGE_SIZE) -> Iterator[ElasticCursor]:
+    """Yields pages of results of the search, sorted using ``source["sort"]``
+
+    Aggregations, ``from`` and ``size`` of the source are ignored.
+    """
+
+    elastic = app.data.elastic
+    es = elastic.elastic(resource)
+    index = elastic._resource_index(resource)
+    sort: List[Any] = list(source.get("sort") or [{"versioncreated": "asc"}])
+
+    body = {key: value for key, value in source.items() if key not in ("from", "size", "aggs", "sort")}
+    body["size"] = page_size
+    body["track_total_hits"] = False
+
+    pit_id = open_point_in_time(es, index)
+    if pit_id is None:
+        body["sort"] = sort + [{"_id": "asc"}]
+    else:
+        # point in time adds a tiebreaker to the sort
+        body["sort"] = sort
+
+    try:
+        while True:
+            if pit_id is None:
+                response = es.search(body=body, index=index)
+            else:
+                body["pit"] = {"id": pit_id, "keep_alive": SCROLL_KEEP_ALIVE}
+                response = es.search(body=body)
+                pit_id = response.get("pit_id") or pit_id
+
+            hits = response["hits"]["hits"]
+            if not hits:
+                break
+
+            yield elastic._parse_hits(response, resource)
+
+            if len(hits) < page_size:
+                break
+            body["search_after"] = hits[-1]["sort"]
+    finally:
+        if pit_id is not None:
+            close_point_in_time(es, pit_id)
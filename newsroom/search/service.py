@@ -5,6 +5,7 @@ from copy import deepcopy
 from flask import current_app as app, json, abort
 from flask_babel import gettext
 from eve.utils import ParsedRequest
+from eve_elastic.elastic import fix_query
 from werkzeug.exceptions import Forbidden
 
 from newsroom.types import Company, Section, SectionFilter, Topic, User
@@ -29,6 +30,7 @@ from newsroom.products.products import (
 )
 from newsroom.auth import get_company, get_user
 from newsroom.settings import get_setting
+from newsroom.topics.percolator import is_percolator_enabled, get_percolated_topic_ids
 from newsroom.template_filters import is_admin
 from newsroom.utils import get_local_date, get_end_date
 from bson.objectid import ObjectId
@@ -870,6 +872,53 @@ class BaseSearchService(Service):
             response.docs = embargoed_response.docs + response.docs
             response.hits["hits"]["total"] = response.count() + embargoed_response.count()
 
+    def get_matching_topics_query(self) -> BoolQuery:
+        """Returns the base query used to test an item against the topics"""
+
+        return {"bool": {"must_not": [], "must": [], "should": []}}
+
+    def get_matching_topics(self, item_id, topics, users, companies):
+        """Returns a list of topic ids matching to the given item_id
+
+        :param item_id: item id to be tested against all topics
+        :param topics: list of topics
+        :param users: user_id, user dictionary
+        :param companies: company_id, company dictionary
+        :return:
+        """
+
+        if is_percolator_enabled():
+            return self.get_percolated_topics_for_item(item_id, topics, users)
+
+        query = self.get_matching_topics_query()
+        query["bool"]["must"].append({"term": {"_id": item_id}})
+        return self.get_matching_topics_for_item(topics, users, companies, query)
+
+    def get_percolated_topics_for_item(self, item_id, topics, users):
+        """Returns a list of topic ids matching to the given item_id, using the topics percolator
+
+        The compiled topic queries already include the owner's products, company and section filters,
+        only the checks that depend on the current time or user state are done here.
+        """
+
+        percolated_topic_ids = get_percolated_topic_ids(self.section, item_id)
+        topic_matches = []
+
+        for topic in topics:
+            if str(topic["_id"]) not in percolated_topic_ids:
+                continue
+
+            user = users.get(str(topic.get("user")))
+            if not user or not user_has_section_allowed(user, self.section):
+                continue
+
+            if users_service.user_has_paused_notifications(user):
+                continue
+
+            topic_matches.append(topic["_id"])
+
+        return topic_matches
+
     def get_matching_topics_for_item(self, topics, users, companies, query):
         topic_matches = []
         topics_checked = set()
@@ -1013,6 +1062,54 @@ class BaseSearchService(Service):
         internal_req = self.get_internal_request(search)
         return self.internal_get(internal_req, search.lookup)
 
+    def get_items_by_queries(self, searches: List[SearchQuery], size=10, aggs=None) -> List[Optional[Any]]:
+        """Run the provided searches using a single ``_msearch`` request
+
+        :return: List of results in the same order as ``searches``, ``None`` for failed searches
+        """
+
+        for search in searches:
+            search.args["size"] = size
+            search.args["aggs"] = str(aggs or False)
+            self.gen_source_from_search(search)
+
+        return self.msearch([search.source for search in searches])
+
+    def msearch(self, sources: List[Dict[str, Any]]) -> List[Optional[Any]]:
+        """Run the provided search sources using a single ``_msearch`` request
+
+        Use it instead of running the searches one by one, when building
+        dashboards and other pages with multiple lists of items.
+
+        Unlike :meth:`internal_get` it doesn't go via the data layer, so the sources must
+        be complete, including filters and sort, as generated by :meth:`gen_source_from_search`.
+
+        :return: List of results in the same order as ``sources``, ``None`` for failed searches
+        """
+
+        if not sources:
+            return []
+
+        index = app.data.elastic._resource_index(self.datasource)
+        track_total_hits = app.config.get("ELASTICSEARCH_TRACK_TOTAL_HITS")
+        body: List[Dict[str, Any]] = []
+        for source in sources:
+            query = dict(fix_query(source))
+            if track_total_hits is not None:
+                query.setdefault("track_total_hits", track_total_hits)
+            body.extend([{"index": index}, query])
+
+        responses = app.data.elastic.elastic(self.datasource).msearch(body=body)["responses"]
+        results: List[Optional[Any]] = []
+        for response in responses:
+            if response.get("error"):
+                logger.error("Failed to run search", extra={"error": response["error"]})
+                results.append(None)
+            else:
+                results.append(app.data.elastic._parse_hits(response, self.datasource))
+
+        return results
+
     def query_string(self, query, default_operator="AND") -> QueryStringQuery:
         fields_config_key = "WIRE_SEARCH_FIELDS" if self.section == "wire" else "AGENDA_SEARCH_FIELDS"
         fields = app.config.get(fields_config_key, ["*"])
@@ -4,6 +4,8 @@ from superdesk.services import CacheableService
 
 from typing import Dict, List
 from newsroom.search.service import query_string
+from newsroom.topics import percolator
+from newsroom import directory
 
 
 class SectionFiltersResource(newsroom.Resource):
@@ -31,6 +33,26 @@ class SectionFiltersResource(newsroom.Resource):
 class SectionFiltersService(CacheableService):
     cache_lookup = {"is_enabled": True}
 
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed("section_filters", [doc["_id"] for doc in docs])
+        for doc in docs:
+            self.update_topics_percolator(doc)
+
+    def on_updated(self, updates, original):
+        super().on_updated(updates, original)
+        directory.mark_changed("section_filters", [original["_id"]])
+        self.update_topics_percolator(original)
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        directory.mark_changed("section_filters", [doc["_id"]])
+        self.update_topics_percolator(doc)
+
+    def update_topics_percolator(self, section_filter):
+        if percolator.is_percolator_enabled():
+            percolator.update_topics_percolator.delay({"topic_type": section_filter.get("filter_type") or "wire"})
+
     def get_section_filters(self, filter_type) -> List:
         """Get the list of section filter by filter type
 
@@ -41,6 +63,16 @@ class SectionFiltersService(CacheableService):
 
     def get_section_filters_dict(self) -> Dict[str, List]:
         """Get the list of all section filters"""
+        if directory.is_directory_enabled():
+            return {
+                filter_type: sorted(
+                    (f for f in section_filters if f.get("is_enabled")), key=lambda f: f.get("name") or ""
+                )
+                for filter_type, section_filters in directory.get_directory("section_filters")
+                .get_index("filter_type")
+                .items()
+            }
+
         if not getattr(flask.g, "section_filters", None):
             filters: Dict[str, List] = {}
             for f in self.get_cached():
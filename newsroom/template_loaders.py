@@ -1,9 +1,11 @@
+import os
 from contextlib import contextmanager
 
 import flask
+import flask.templating
 import jinja2
 
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from flask_babel import get_locale, get_timezone, _get_current_context, Locale, force_locale
 import pytz
 
@@ -18,10 +20,6 @@ def get_template_locale() -> Optional[str]:
     return getattr(flask.g, TEMPLATE_LOCALE, None)
 
 
-def noop():
-    return False
-
-
 @contextmanager
 def template_locale(locale: Optional[str] = None, timezone: Optional[str] = None):
     """Overriding babel locale and timezone using internals, but there is no public api for that."""
@@ -51,29 +49,61 @@ def template_locale(locale: Optional[str] = None, timezone: Optional[str] = None
         ctx.babel_tzinfo = old_tzinfo
 
 
-class LocaleTemplateLoader(jinja2.FileSystemLoader):
-    def get_source(self, environment: jinja2.Environment, template: str):
-        source = None
-        filename = None
-        file_uptodate = noop
-        template_locale = get_template_locale()
+class LocaleEnvironmentMixin:
+    """Loads templates for the current template locale.
+
+    Template ``name.ext`` is resolved to ``name.{locale}.ext`` if it exists before it is loaded,
+    so the compiled templates are cached per template and locale and switching the locale
+    doesn't recompile them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.locale_template_names: Dict[Tuple[str, str], str] = {}
+
+    def get_locale_template_name(self, name: str) -> str:
+        template_locale = get_template_locale() if flask.has_app_context() else None
+        if not template_locale or f".{template_locale}." in name or "." not in name:
+            return name
+
+        key = (name, template_locale)
+        if key in self.locale_template_names:
+            return self.locale_template_names[key]
+
+        template_name, extension = name.rsplit(".", maxsplit=1)
+        locale_name = f"{template_name}.{template_locale}.{extension}"
+        try:
+            self.loader.get_source(self, locale_name)
+        except jinja2.TemplateNotFound:
+            # no template for selected locale
+            locale_name = name
+
+        if not self.auto_reload:
+            # with auto reload check for new templates every time
+            self.locale_template_names[key] = locale_name
+        return locale_name
+
+    def get_template(self, name, parent=None, globals=None):
+        if isinstance(name, str):
+            name = self.get_locale_template_name(name)
+        return super().get_template(name, parent, globals)
+
+
+class LocaleEnvironment(LocaleEnvironmentMixin, jinja2.Environment):
+    pass
+
 
-        if template_locale and f".{template_locale}." not in template:
-            template_name, extension = template.rsplit(".", maxsplit=1)
+class FlaskLocaleEnvironment(LocaleEnvironmentMixin, flask.templating.Environment):
+    pass
 
-            try:
-                source, filename, file_uptodate = super().get_source(
-                    environment, f"{template_name}.{template_locale}.{extension}"
-                )
-            except jinja2.TemplateNotFound:
-                # no template for selected locale
-                pass
 
-        if not source:
-            source, filename, file_uptodate = super().get_source(environment, template)
+def get_bytecode_cache(app: flask.Flask) -> Optional[jinja2.BytecodeCache]:
+    """Returns filesystem bytecode cache for compiled templates, shared by all workers"""
 
-        def uptodate():
-            """Must return False when locale changes to reload template."""
-            return template_locale == get_template_locale() and file_uptodate()
+    if not app.config.get("TEMPLATES_BYTECODE_CACHE", True):
+        return None
 
-        return source, filename, uptodate
+    directory = app.config.get("TEMPLATES_BYTECODE_CACHE_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(directory or None)
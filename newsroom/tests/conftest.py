@@ -5,6 +5,7 @@ from pathlib import Path
 from pytest import fixture
 
 from superdesk.cache import cache
+from newsroom import directory
 from newsroom.web.factory import get_app
 from newsroom.tests import markers
 
@@ -27,6 +28,9 @@ def update_config(conf):
     conf["AUTH_SERVER_SHARED_SECRET"] = "secret123"
     conf["SECRET_KEY"] = "foo"
     conf["CELERY_TASK_ALWAYS_EAGER"] = True
+    conf["NEWS_API_AUDIT_ASYNC"] = False
+    if os.environ.get("DIRECTORY_ENABLED"):
+        conf["DIRECTORY_ENABLED"] = os.environ["DIRECTORY_ENABLED"].lower() in ("1", "true")
     return conf
 
 
@@ -49,6 +53,22 @@ def reset_elastic(app):
         app.data.init_elastic(app)
 
 
+def reload_directories_on_write(app):
+    """Tests insert data via ``app.data`` bypassing the services, reload the directories on every write"""
+
+    def wrap(method):
+        def write(resource, *args, **kwargs):
+            try:
+                return method(resource, *args, **kwargs)
+            finally:
+                directory.mark_reload(resource)
+
+        return write
+
+    for name in ("insert", "update", "update_all", "replace", "remove"):
+        setattr(app.data, name, wrap(getattr(app.data, name)))
+
+
 def drop_mongo(config: Config):
     client = pymongo.MongoClient(config["CONTENTAPI_MONGO_URI"])
     client.drop_database(config["CONTENTAPI_MONGO_DBNAME"])
@@ -74,6 +94,8 @@ def app(request):
     with app.app_context():
         reset_elastic(app)
         cache.clean()
+        if directory.is_directory_enabled():
+            reload_directories_on_write(app)
         yield app
 
 
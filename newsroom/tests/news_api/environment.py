@@ -16,6 +16,7 @@ def before_all(context):
         "NEWS_API_TIME_LIMIT_DAYS": 100,
         "SITE_NAME": "Newsroom",
         "CACHE_TYPE": "null",
+        "NEWS_API_AUDIT_ASYNC": False,
     }
     setup_before_all(context, config, app_factory=get_app)
 
@@ -31,6 +32,7 @@ def before_scenario(context, scenario):
         "NEWS_API_TIME_LIMIT_DAYS": 100,
         "SITE_NAME": "Newsroom",
         "CACHE_TYPE": "null",
+        "NEWS_API_AUDIT_ASYNC": False,
     }
 
     if "rate_limit" in scenario.tags:
@@ -0,0 +1,251 @@
+"""Topic percolator
+==================
+
+Stores the compiled query of every subscribed topic as a percolator document,
+so a single ``percolate`` query per pushed item returns all of the matching topics,
+instead of running one search per subscribed user.
+
+The compiled query includes the topic owner's product, company and section filter
+restrictions, so it has to be refreshed whenever any of those change.
+Enable it using ``TOPICS_PERCOLATOR_ENABLED`` config.
+"""
+
+import logging
+from copy import deepcopy
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from elasticsearch import exceptions as es_exceptions, helpers as es_helpers
+from flask import current_app as app
+
+import superdesk
+from newsroom.celery_app import celery
+from newsroom.types import Company, Product, Topic, User
+
+logger = logging.getLogger(__name__)
+
+#: ES document fields used by the percolator index, prefixed to avoid clashing with item fields
+QUERY_FIELD = "topic_query"
+TOPIC_ID_FIELD = "topic_id"
+TOPIC_USER_FIELD = "topic_user"
+
+SEARCH_SERVICES = {
+    "wire": "wire_search",
+    "agenda": "agenda",
+}
+
+#: User & Company fields used when compiling the topic queries
+USER_FIELDS = {"company", "products", "sections", "user_type", "is_enabled"}
+COMPANY_FIELDS = {"products", "sections", "company_type", "is_enabled"}
+
+#: The resource each topic type is percolated against, used to copy the mapping from
+ITEMS_RESOURCES = {
+    "wire": "items",
+    "agenda": "agenda",
+}
+
+
+def is_percolator_enabled() -> bool:
+    return bool(app.config.get("TOPICS_PERCOLATOR_ENABLED"))
+
+
+def get_percolator_index(topic_type: str) -> str:
+    return "{}_topics_{}".format(app.config["CONTENTAPI_ELASTICSEARCH_INDEX"], topic_type)
+
+
+def get_items_index(topic_type: str) -> str:
+    return app.data.elastic._resource_index(ITEMS_RESOURCES[topic_type])
+
+
+def get_es():
+    return app.data.elastic.es
+
+
+def init_percolator_index(topic_type: str, force: bool = False) -> None:
+    """Create the percolator index for the given topic type
+
+    The index mapping is copied from the items index, as the percolated documents
+    must be analysed the same way the items are.
+    """
+
+    es = get_es()
+    index = get_percolator_index(topic_type)
+
+    if es.indices.exists(index=index):
+        if not force:
+            return
+        es.indices.delete(index=index)
+
+    items_index = get_items_index(topic_type)
+    mapping = next(iter(es.indices.get_mapping(index=items_index).values()))["mappings"]
+    settings = next(iter(es.indices.get_settings(index=items_index).values()))["settings"]["index"]
+
+    properties = deepcopy(mapping.get("properties") or {})
+    properties.update(
+        {
+            QUERY_FIELD: {"type": "percolator"},
+            TOPIC_ID_FIELD: {"type": "keyword"},
+            TOPIC_USER_FIELD: {"type": "keyword"},
+        }
+    )
+
+    body: Dict[str, Any] = {"mappings": {"properties": properties}}
+    if settings.get("analysis"):
+        body["settings"] = {"analysis": settings["analysis"]}
+
+    es.indices.create(index=index, body=body)
+
+
+def get_topic_percolator_query(
+    topic: Topic, user: Optional[User], company: Optional[Company]
+) -> Optional[Dict[str, Any]]:
+    """Compile the query used to match items for the given topic
+
+    This is the same query ``BaseSearchService.get_matching_topics_for_item`` builds,
+    the user base query (products, section filters, company type) combined with the topic query,
+    without the item id restriction.
+    """
+
+    if not user:
+        return None
+
+    service = superdesk.get_resource_service(SEARCH_SERVICES[topic.get("topic_type") or "wire"])
+    base_search = service.get_topic_query(None, user, company, query=service.get_matching_topics_query())
+    if not base_search:
+        return None
+
+    topic_search = service.get_topic_query(topic, None, None)
+    if not topic_search:
+        return None
+
+    return {"bool": {"filter": [base_search.query, topic_search.query]}}
+
+
+def _get_topic_users_and_companies(topics: List[Topic]):
+    user_ids = list({topic["user"] for topic in topics if topic.get("user")})
+    users = {
+        user["_id"]: user for user in superdesk.get_resource_service("users").find(where={"_id": {"$in": user_ids}})
+    }
+    company_ids = list({user["company"] for user in users.values() if user.get("company")})
+    companies = {
+        company["_id"]: company
+        for company in superdesk.get_resource_service("companies").find(where={"_id": {"$in": company_ids}})
+    }
+    return users, companies
+
+
+def _get_index_actions(topics: List[Topic]) -> Iterable[Dict[str, Any]]:
+    users, companies = _get_topic_users_and_companies(topics)
+
+    for topic in topics:
+        topic_type = topic.get("topic_type") or "wire"
+        action = {"_index": get_percolator_index(topic_type), "_id": str(topic["_id"])}
+        user = users.get(topic.get("user"))
+        query = (
+            get_topic_percolator_query(topic, user, companies.get(user.get("company")) if user else None)
+            if topic.get("subscribers")
+            else None
+        )
+
+        if query is None:
+            # Topic can't match any items (no subscribers, or no access), so remove it from the index
+            action["_op_type"] = "delete"
+        else:
+            action["_source"] = {
+                QUERY_FIELD: query,
+                TOPIC_ID_FIELD: str(topic["_id"]),
+                TOPIC_USER_FIELD: str(topic["user"]),
+            }
+
+        yield action
+
+
+def index_topics(topics: List[Topic], refresh: bool = False) -> int:
+    """Compile and store the provided topics in the percolator index
+
+    :return: The number of failed index/delete actions
+    """
+
+    if not topics:
+        return 0
+
+    for topic_type in {topic.get("topic_type") or "wire" for topic in topics}:
+        init_percolator_index(topic_type)
+
+    success, errors = es_helpers.bulk(
+        get_es(),
+        _get_index_actions(topics),
+        raise_on_error=False,
+        refresh=refresh,
+    )
+
+    failed = [error for error in errors if error.get("delete", {}).get("status") != 404]
+    for error in failed:
+        logger.error("Failed to update topic percolator", extra={"error": error})
+
+    return len(failed)
+
+
+def delete_topics(topics: List[Topic]) -> None:
+    es = get_es()
+    for topic in topics:
+        try:
+            es.delete(index=get_percolator_index(topic.get("topic_type") or "wire"), id=str(topic["_id"]))
+        except es_exceptions.NotFoundError:
+            pass
+
+
+def reindex_topics(lookup: Dict[str, Any], refresh: bool = False) -> int:
+    topics = list(superdesk.get_resource_service("topics").find(where=lookup))
+    return index_topics(topics, refresh=refresh)
+
+
+def rebuild_percolator(refresh: bool = True) -> int:
+    """Re-create the percolator indexes and re-compile all topics"""
+
+    for topic_type in ITEMS_RESOURCES:
+        init_percolator_index(topic_type, force=True)
+
+    return reindex_topics({"subscribers": {"$exists": True, "$ne": []}}, refresh=refresh)
+
+
+def get_percolated_topic_ids(topic_type: str, item_id: str) -> Set[str]:
+    """Percolate the stored item against all topics of the given type, returning the ids of the matching topics"""
+
+    source = {
+        "query": {
+            "percolate": {
+                "field": QUERY_FIELD,
+                "index": get_items_index(topic_type),
+                "id": item_id,
+            },
+        },
+        "_source": [TOPIC_ID_FIELD],
+    }
+
+    try:
+        hits = es_helpers.scan(get_es(), index=get_percolator_index(topic_type), query=source, size=1000)
+        return {hit["_source"][TOPIC_ID_FIELD] for hit in hits}
+    except es_exceptions.NotFoundError:
+        logger.warning("Topic percolator index for %s not found, run rebuild_topics_percolator", topic_type)
+        return set()
+
+
+def get_product_topics_lookup(product: Product) -> Dict[str, Any]:
+    """Returns the lookup for topics affected by changes to the provided product"""
+
+    company_ids = [
+        company["_id"]
+        for company in superdesk.get_resource_service("companies").find(where={"products._id": product["_id"]})
+    ]
+    lookup: List[Dict[str, Any]] = [{"company": {"$in": company_ids}}]
+    if product.get("navigations"):
+        lookup.append({"navigation": {"$in": product["navigations"]}})
+
+    return {"$or": lookup}
+
+
+@celery.task
+def update_topics_percolator(lookup: Dict[str, Any]):
+    """Re-compile the percolator queries of the topics matching the provided lookup"""
+
+    reindex_topics(lookup)
@@ -11,6 +11,8 @@ from newsroom.user_roles import UserRole
 from newsroom.utils import set_original_creator, set_version_creator
 from newsroom.signals import user_deleted
 
+from . import percolator
+
 
 class TopicNotificationType(enum.Enum):
     # NONE = "none"
@@ -103,11 +105,24 @@ class TopicsService(newsroom.Service):
         if updates.get("folder"):
             updates["folder"] = ObjectId(updates["folder"])
 
+    def on_created(self, docs):
+        super().on_created(docs)
+        if percolator.is_percolator_enabled():
+            percolator.index_topics(docs)
+
     def on_updated(self, updates, original):
         current_user = get_user()
         if current_user:
             auto_enable_user_emails(updates, original, current_user)
 
+        if percolator.is_percolator_enabled():
+            percolator.reindex_topics({"_id": original["_id"]})
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        if percolator.is_percolator_enabled():
+            percolator.delete_topics([doc])
+
     def get_items(self, item_ids):
         return self.get(req=None, lookup={"_id": {"$in": item_ids}})
 
@@ -126,6 +141,7 @@ class TopicsService(newsroom.Service):
         self.delete_action({"is_global": False, "user": user["_id"]})
 
         # remove user topic subscriptions from existing topics
+        updated_topic_ids = []
         topics = self.get(req=None, lookup={"subscribers.user_id": user["_id"]})
         for topic in topics:
             updates = dict(
@@ -136,11 +152,17 @@ class TopicsService(newsroom.Service):
                 topic["user"] = None
 
             self.system_update(topic["_id"], updates, topic)
+            updated_topic_ids.append(topic["_id"])
 
         # remove user as a topic creator for the rest
         user_topics = self.get(req=None, lookup={"user": user["_id"]})
         for topic in user_topics:
             self.system_update(topic["_id"], {"user": None}, topic)
+            updated_topic_ids.append(topic["_id"])
+
+        if updated_topic_ids and percolator.is_percolator_enabled():
+            # ``system_update`` doesn't trigger ``on_updated``, so update the topics percolator here
+            percolator.reindex_topics({"_id": {"$in": updated_topic_ids}})
 
 
 def get_user_topics(user_id):
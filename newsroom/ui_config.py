@@ -1,5 +1,6 @@
 import superdesk
 import newsroom
+from newsroom import directory
 
 
 class UIConfigResource(newsroom.Resource):
@@ -40,9 +41,25 @@ class UIConfigResource(newsroom.Resource):
 
 
 class UIConfigService(newsroom.Service):
+    def on_created(self, docs):
+        super().on_created(docs)
+        directory.mark_changed("ui_config", [doc["_id"] for doc in docs])
+
+    def on_updated(self, updates, original):
+        super().on_updated(updates, original)
+        directory.mark_changed("ui_config", [original["_id"]])
+
+    def on_deleted(self, doc):
+        super().on_deleted(doc)
+        directory.mark_changed("ui_config", [doc["_id"]])
+
     def get_section_config(self, section_name):
         """Get the section config"""
-        config = self.find_one(req=None, _id=section_name)
+        if directory.is_directory_enabled():
+            config = directory.get_directory("ui_config").get_docs().get(section_name)
+            config = dict(config) if config else None
+        else:
+            config = self.find_one(req=None, _id=section_name)
         if not config:
             return {}
         return config
@@ -1,21 +1,35 @@
 import os
+import logging
 import flask
 import bson.errors
 
+from datetime import timedelta
+
 from werkzeug.wsgi import wrap_file
 from werkzeug.utils import secure_filename
 from flask import request, url_for, current_app as newsroom_app
 from superdesk.upload import upload_url as _upload_url
 from superdesk.media.media_operations import guess_media_extension
+from superdesk.utc import utcnow
 
 import newsroom
+from newsroom.celery_app import celery
 from newsroom.decorator import is_valid_session, clear_session_and_redirect_to_login
 
+logger = logging.getLogger(__name__)
+
 
 cache_for = 3600 * 24 * 7  # 7 days cache
 ASSETS_RESOURCE = "upload"
 blueprint = flask.Blueprint(ASSETS_RESOURCE, __name__)
 
+#: Media storage folders which are never served via ``/assets``,
+#: mapped to the setting with number of hours the files are kept
+PRIVATE_FOLDERS = {
+    "email_attachments": "EMAIL_ATTACHMENTS_EXPIRY_HOURS",
+    "report_exports": "REPORTS_EXPORT_EXPIRY_HOURS",
+}
+
 
 def get_file(key):
     file = request.files.get(key)
@@ -35,7 +49,7 @@ def get_upload(media_id, filename=None):
         media_file = flask.current_app.media.get(media_id, ASSETS_RESOURCE)
     except bson.errors.InvalidId:
         media_file = None
-    if not media_file:
+    if not media_file or is_private_media(media_file):
         flask.abort(404)
 
     data = wrap_file(flask.request.environ, media_file, buffer_size=1024 * 256)
@@ -66,6 +80,29 @@ def get_upload(media_id, filename=None):
     return response
 
 
+def is_private_media(media_file) -> bool:
+    filename = getattr(media_file, "filename", None) or ""
+    return any(filename.startswith(folder + "/") for folder in PRIVATE_FOLDERS)
+
+
+def remove_expired_media(folder: str) -> int:
+    """Remove files stored in private ``folder`` before its expiry"""
+
+    expiry = utcnow() - timedelta(hours=newsroom_app.config.get(PRIVATE_FOLDERS[folder], 24))
+    files = newsroom_app.media.find(folder=folder, upload_date={"$lt": expiry}, resource=ASSETS_RESOURCE)
+    for media_file in files:
+        newsroom_app.media.delete(media_file["_id"], resource=ASSETS_RESOURCE)
+    if files:
+        logger.info("Removed %d expired files from %s", len(files), folder)
+    return len(files)
+
+
+@celery.task(soft_time_limit=600)
+def async_remove_expired_media():
+    for folder in PRIVATE_FOLDERS:
+        remove_expired_media(folder)
+
+
 def upload_url(media_id):
     return _upload_url(media_id, view="assets.get_media_streamed")
 
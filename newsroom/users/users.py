@@ -12,7 +12,7 @@ from werkzeug.exceptions import BadRequest
 from newsroom.products.types import PRODUCT_TYPES
 
 from newsroom.types import Company, ProductRef, User
-from newsroom.auth import get_user_id, get_user, get_company_from_user, SessionAuth
+from newsroom.auth import get_user_id, get_user, get_company_from_user, invalidate_identity, SessionAuth
 from newsroom.auth.utils import get_company, get_company_auth_provider, add_token_data, send_token
 from newsroom.settings import get_setting
 from newsroom.utils import set_original_creator, set_version_creator
@@ -21,6 +21,8 @@ from newsroom.auth.utils import is_current_user_admin, is_current_user_account_m
 from newsroom.user_roles import UserRole
 from newsroom.signals import user_created, user_updated, user_deleted
 from newsroom.companies.utils import get_company_section_names, get_company_product_ids
+from newsroom.topics import percolator
+from newsroom import directory
 
 
 class UserAuthentication(SessionAuth):
@@ -278,9 +280,22 @@ class UsersService(newsroom.Service):
 
     def on_created(self, docs):
         super().on_created(docs)
+        directory.mark_changed("users", [doc["_id"] for doc in docs])
         for doc in docs:
             user_created.send(self, user=doc)
 
+    def update(self, id, updates, original):
+        res = super().update(id, updates, original)
+        directory.mark_changed("users", [id])
+        invalidate_identity("users", [id])
+        return res
+
+    def system_update(self, id, updates, original, **kwargs):
+        res = super().system_update(id, updates, original, **kwargs)
+        directory.mark_changed("users", [id])
+        invalidate_identity("users", [id])
+        return res
+
     def on_update(self, updates, original):
         self.check_permissions(original, updates)
         set_version_creator(updates)
@@ -306,6 +321,9 @@ class UsersService(newsroom.Service):
         updated.update(updates)
         user_updated.send(self, user=updated, updates=updates)
 
+        if percolator.is_percolator_enabled() and percolator.USER_FIELDS.intersection(updates.keys()):
+            percolator.update_topics_percolator.delay({"user": original["_id"]})
+
     def update_notification_schedule_run_time(self, user: User, run_time: datetime):
         notification_schedule = deepcopy(user["notification_schedule"])
         notification_schedule["last_run_time"] = run_time
@@ -328,6 +346,8 @@ class UsersService(newsroom.Service):
 
     def on_deleted(self, doc):
         app.cache.delete(str(doc.get("_id")))
+        directory.mark_changed("users", [doc["_id"]])
+        invalidate_identity("users", [doc["_id"]])
         user_deleted.send(self, user=doc)
 
     def on_delete(self, doc):
@@ -21,6 +21,7 @@ from flask import current_app as app, json, abort, request, g, flash, session, u
 from flask_babel import gettext, format_date as _format_date
 
 from newsroom.types import PublicUserData, User, Company, Group, Permissions
+from newsroom.directory import get_directory, is_directory_enabled
 from newsroom.template_filters import (
     time_short,
     parse_date as parse_short_date,
@@ -317,10 +318,19 @@ def is_account_enabled(user):
 
 
 def get_user_dict(use_globals: bool = True) -> Dict[str, User]:
-    """Get all active users indexed by _id."""
+    """Get all active users indexed by _id.
+
+    With ``use_globals`` users are read from the process wide :mod:`newsroom.directory`,
+    otherwise these are loaded from the database. Directory users are returned as shallow copies,
+    nested values are shared with the directory and must not be modified.
+    """
 
     def _get_users() -> Dict[str, User]:
-        all_users = superdesk.get_resource_service("users").find(where={"is_enabled": True})
+        all_users = (
+            [dict(user) for user in get_directory("users").get_docs().values()]
+            if use_globals and is_directory_enabled()
+            else superdesk.get_resource_service("users").find(where={"is_enabled": True})
+        )
 
         companies = get_company_dict(use_globals)
 
@@ -349,10 +359,15 @@ def get_company_dict(use_globals: bool = True) -> Dict[str, Company]:
     """Get all active companies indexed by _id.
 
     Must reload when testing because there it's using single context.
+    Directory companies are returned as shallow copies, like in :func:`get_user_dict`.
     """
 
     def _get_companies() -> Dict[str, Company]:
-        all_companies = superdesk.get_resource_service("companies").find(where={"is_enabled": True})
+        all_companies = (
+            [dict(company) for company in get_directory("companies").get_docs().values()]
+            if use_globals and is_directory_enabled()
+            else superdesk.get_resource_service("companies").find(where={"is_enabled": True})
+        )
 
         return {
             str(company["_id"]): company
@@ -75,6 +75,18 @@ CONTENTAPI_ELASTICSEARCH_SETTINGS["settings"]["analysis"]["analyzer"]["html_fiel
     "asciifolding",
 ]
 
+#: Number of processes used to index documents from mongo to elastic
+#:
+#: .. versionadded: 2.8
+#:
+REINDEX_WORKERS = int(env("REINDEX_WORKERS", 4))
+
+#: Size in bytes of documents sent in a single bulk request when indexing from mongo
+#:
+#: .. versionadded: 2.8
+#:
+REINDEX_BULK_BYTES = 10 * 1024 * 1024
+
 XML = False
 IF_MATCH = True
 JSON_SORT_KEYS = False
@@ -210,6 +222,43 @@ VALIDATE_ACCOUNT_TOKEN_TIME_TO_LIVE = 7
 MAXIMUM_FAILED_LOGIN_ATTEMPTS = 5
 #: default sender for superdesk emails
 MAIL_DEFAULT_SENDER = _MAIL_FROM or "newsroom@localhost"
+
+#: Number of emails sent in a single task when sending many emails, e.g. topic or monitoring notifications
+#:
+#: .. versionadded: 2.8
+#:
+MAIL_BATCH_SIZE = int(env("MAIL_BATCH_SIZE", 100))
+
+#: Number of emails sent using a single SMTP connection before reconnecting
+#:
+#: .. versionadded: 2.8
+#:
+MAIL_CONNECTION_MAX_EMAILS = int(env("MAIL_CONNECTION_MAX_EMAILS", 100))
+
+#: Time in seconds after which an idle SMTP connection is not reused
+#:
+#: .. versionadded: 2.8
+#:
+MAIL_CONNECTION_IDLE_TIMEOUT = int(env("MAIL_CONNECTION_IDLE_TIMEOUT", 30))
+
+#: Maximum number of emails sent per second by a worker, ``0`` means no limit
+#:
+#: .. versionadded: 2.8
+#:
+MAIL_RATE_LIMIT = float(env("MAIL_RATE_LIMIT", 0))
+
+#: Number of retries when sending an email in a batch fails
+#:
+#: .. versionadded: 2.8
+#:
+MAIL_SEND_RETRIES = int(env("MAIL_SEND_RETRIES", 3))
+
+#: Number of hours email attachments are kept in media storage
+#:
+#: .. versionadded: 2.8
+#:
+EMAIL_ATTACHMENTS_EXPIRY_HOURS = int(env("EMAIL_ATTACHMENTS_EXPIRY_HOURS", 24))
+
 # Recipients for the sign up form filled by new users (single or comma separated)
 SIGNUP_EMAIL_RECIPIENTS = os.environ.get("SIGNUP_EMAIL_RECIPIENTS")
 
@@ -334,6 +383,12 @@ DEFAULT_SCHEDULED_NOTIFICATION_TIMES = [
     "19:00",
 ]
 
+#: Number of users processed by a single scheduled notifications task
+#:
+#: .. versionadded: 2.8
+#:
+SCHEDULED_NOTIFICATIONS_CHUNK_SIZE = int(env("SCHEDULED_NOTIFICATIONS_CHUNK_SIZE", 50))
+
 # Client configuration
 CLIENT_CONFIG = {
     "debug": DEBUG,
@@ -414,6 +469,17 @@ CELERY_WORKER_TASK_TIME_LIMIT = 600
 
 WEBSOCKET_EXCHANGE = celery_queue("newsroom_notification")
 
+#: Send celery tasks using the typed message format, with datetimes and ObjectIds tagged
+#: so these are decoded without guessing. Messages in both formats can be read since 2.8,
+#: enable it only once all workers are upgraded, before that they can't read the new format.
+#:
+#: Strings are not casted to ObjectIds or datetimes when reading the typed format,
+#: so tasks have to be called with ``ObjectId``/``datetime`` values if they need those.
+#:
+#: .. versionadded: 2.8
+#:
+TYPED_CELERY_MESSAGES = strtobool(env("TYPED_CELERY_MESSAGES", "false"))
+
 CELERY_TASK_DEFAULT_QUEUE = celery_queue("newsroom")
 CELERY_TASK_QUEUES = (
     Queue(
@@ -469,6 +535,15 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": crontab(minute="*/5"),
         "options": {"expires": 5 * 60 - 1},
     },
+    "newsroom:flush_news_api_rate_limits": {
+        "task": "newsroom.news_api.api_tokens.rate_limit.flush_rate_limit_counters",
+        "schedule": timedelta(seconds=60),
+        "options": {"expires": 59},
+    },
+    "newsroom:remove_expired_media": {
+        "task": "newsroom.upload.async_remove_expired_media",
+        "schedule": crontab(minute=30),  # Runs every hour
+    },
 }
 
 MAX_EXPIRY_QUERY_LIMIT = os.environ.get("MAX_EXPIRY_QUERY_LIMIT", 100)
@@ -561,6 +636,18 @@ ALLOW_EXPIRED_COMPANY_LOGINS = False
 #:
 DASHBOARD_CACHE_TIMEOUT = 300
 
+#: Time in seconds the outdated dashboard caches are kept, and served while one worker rebuilds them
+#:
+#: .. versionadded: 2.8
+#:
+DASHBOARD_CACHE_STALE_TIMEOUT = 600
+
+#: Time in seconds between storing the dashboard cache hit/miss stats to Redis and logging them
+#:
+#: .. versionadded: 2.8
+#:
+DASHBOARD_CACHE_STATS_INTERVAL = 60
+
 #: If True, deletes all Dashboard item caches when new items are pushed
 #:
 #: .. versionadded:: 2.1.0
@@ -850,3 +937,34 @@ AGENDA_TIME_FILTERS = [
         "query": "now/M",
     },
 ]
+
+#: Use an Elasticsearch percolator index to match new items against subscribed topics
+#: Run ``python manage.py rebuild_topics_percolator`` after enabling it
+#:
+#: .. versionadded: 2.8
+#:
+TOPICS_PERCOLATOR_ENABLED = strtobool(env("TOPICS_PERCOLATOR_ENABLED", "false"))
+
+#: Compress report CSV exports using gzip, when supported by the client
+#:
+#: .. versionadded: 2.8
+#:
+REPORTS_EXPORT_GZIP = strtobool(env("REPORTS_EXPORT_GZIP", "false"))
+
+#: Number of hours async report exports are kept in media storage
+#:
+#: .. versionadded: 2.8
+#:
+REPORTS_EXPORT_EXPIRY_HOURS = int(env("REPORTS_EXPORT_EXPIRY_HOURS", 24))
+
+#: Store compiled templates on disk, so new workers don't have to compile them again
+#:
+#: .. versionadded: 2.8
+#:
+TEMPLATES_BYTECODE_CACHE = strtobool(env("TEMPLATES_BYTECODE_CACHE", "true"))
+
+#: Directory for compiled templates, defaults to a directory in system temp
+#:
+#: .. versionadded: 2.8
+#:
+TEMPLATES_BYTECODE_CACHE_DIR = env("TEMPLATES_BYTECODE_CACHE_DIR")
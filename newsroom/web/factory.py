@@ -1,5 +1,6 @@
 import os
 import flask
+import jinja2
 
 from newsroom.auth import get_user
 from newsroom.factory import BaseNewsroomApp
@@ -36,7 +37,7 @@ from newsroom.template_filters import (
     get_item_category_names,
     format_event_datetime,
 )
-from newsroom.template_loaders import LocaleTemplateLoader
+from newsroom.template_loaders import FlaskLocaleEnvironment, get_bytecode_cache
 from newsroom.notifications.notifications import get_initial_notifications
 from newsroom.limiter import limiter
 from newsroom.celery_app import init_celery
@@ -58,6 +59,11 @@ class NewsroomWebApp(BaseNewsroomApp):
 
     INSTANCE_CONFIG = "settings.py"
 
+    jinja_environment = FlaskLocaleEnvironment
+
+    # templates are cached per locale
+    jinja_options = dict(flask.Flask.jinja_options, cache_size=1000)
+
     def __init__(self, import_name=__package__, config=None, **kwargs):
         self.download_formatters = {}
         self.sections = []
@@ -151,7 +157,8 @@ class NewsroomWebApp(BaseNewsroomApp):
 
         self.context_processor(lambda: {"auth_user": get_user()})
 
-        self.jinja_loader = LocaleTemplateLoader(self._theme_folders)
+        self.jinja_loader = jinja2.FileSystemLoader(self._theme_folders)
+        self.jinja_env.bytecode_cache = get_bytecode_cache(self)
 
     def _setup_limiter(self):
         limiter.init_app(self)
@@ -93,16 +93,21 @@ def get_items_for_dashboard(
                 item.pop(field, None)
         return item
 
+    product_cards = [card for card in cards if card["config"].get("product")]
+    products_items = superdesk.get_resource_service("wire_search").get_products_items(
+        [
+            (ObjectId(card["config"].get("product")), card["config"].get("size") or get_card_size(card["type"]))
+            for card in product_cards
+        ],
+        exclude_embargoed=exclude_embargoed,
+    )
+
+    products_items_iter = iter(products_items)
     items_by_card = {}
     for card in cards:
         if card["config"].get("product"):
             items_by_card[card["label"]] = [
-                filter_fields(item) if filter_public_fields else item
-                for item in superdesk.get_resource_service("wire_search").get_product_items(
-                    ObjectId(card["config"].get("product")),
-                    card["config"].get("size") or get_card_size(card["type"]),
-                    exclude_embargoed=exclude_embargoed,
-                )
+                filter_fields(item) if filter_public_fields else item for item in next(products_items_iter)
             ]
         elif card["type"] == "4-photo-gallery":
             # Omit external media, let the client manually request these
@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime, timedelta
 
+from bson import ObjectId
 from eve.utils import ParsedRequest
 from flask import current_app as app, json
 from newsroom.types import Section
@@ -13,7 +14,7 @@ from newsroom.settings import get_setting
 from newsroom.user_roles import UserRole
 from newsroom.utils import get_local_date, get_end_date
 from newsroom.search.service import BaseSearchService, SearchQuery
-from typing import TypedDict, List, Optional
+from typing import Any, Dict, TypedDict, List, Optional, Tuple
 import pytz
 
 logger = logging.getLogger(__name__)
@@ -128,7 +129,11 @@ class WireSearchService(BaseSearchService):
         except Forbidden:
             return 0
 
-    def get_items(self, item_ids, size=None, aggregations=None, apply_permissions=False):
+    def get_items(self, item_ids, size=None, aggregations=None, apply_permissions=False, fields=None):
+        """Get the items by ids
+
+        :param fields: Only return these fields of the items
+        """
         search = SearchQuery()
 
         try:
@@ -155,6 +160,9 @@ class WireSearchService(BaseSearchService):
             if aggregations is not None:
                 search.source["aggs"] = aggregations
 
+            if fields is not None:
+                search.source["_source"] = fields
+
             req = ParsedRequest()
             req.args = {"source": json.dumps(search.source)}
 
@@ -168,6 +176,29 @@ class WireSearchService(BaseSearchService):
             )
 
     def get_product_items(self, product_id: str, size: int, exclude_embargoed: bool = False):
+        search = self.get_product_items_search(product_id, size, exclude_embargoed)
+        if search is None:
+            return []
+
+        internal_req = self.get_internal_request(search)
+        return list(self.internal_get(internal_req, None))
+
+    def get_products_items(
+        self, products: List[Tuple[ObjectId, int]], exclude_embargoed: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """Get the latest items of multiple products using a single ``_msearch`` request
+
+        :param products: List of product id and number of items
+        :return: List of items for every product, in the same order as ``products``
+        """
+
+        searches = [self.get_product_items_search(product_id, size, exclude_embargoed) for product_id, size in products]
+        results = iter(self.msearch([search.source for search in searches if search is not None]))
+        return [list(next(results) or []) if search is not None else [] for search in searches]
+
+    def get_product_items_search(
+        self, product_id: str, size: int, exclude_embargoed: bool = False
+    ) -> Optional[SearchQuery]:
         search = SearchQuery()
         self.prefill_search_args(search)
         self.prefill_search_items(search)
@@ -179,7 +210,7 @@ class WireSearchService(BaseSearchService):
         product = get_resource_service("products").find_one(req=None, _id=product_id)
 
         if not product:
-            return []
+            return None
 
         if not app.config["DASHBOARD_EMBARGOED"] or exclude_embargoed:
             embargo_query_rounding = app.config.get("EMBARGO_QUERY_ROUNDING")
@@ -209,9 +240,7 @@ class WireSearchService(BaseSearchService):
         self.gen_source_from_search(search)
         search.source["post_filter"] = {"bool": {"filter": []}}
         search.source.pop("aggs", None)
-        internal_req = self.get_internal_request(search)
-
-        return list(self.internal_get(internal_req, None))
+        return search
 
     def get_navigation_story_count(self, navigations, section, company, user):
         """Get story count by navigation"""
@@ -259,31 +288,17 @@ class WireSearchService(BaseSearchService):
                 exc_info=True,
             )
 
-    def get_matching_topics(self, item_id, topics, users, companies):
-        """Returns a list of topic ids matching to the given item_id
-
-        :param item_id: item id to be tested against all topics
-        :param topics: list of topics
-        :param users: user_id, user dictionary
-        :param companies: company_id, company dictionary
-        :return:
-        """
-
-        return self.get_matching_topics_for_item(
-            topics,
-            users,
-            companies,
-            {
-                "bool": {
-                    "must_not": [
-                        {"term": {"type": "composite"}},
-                        {"constant_score": {"filter": {"exists": {"field": "nextversion"}}}},
-                    ],
-                    "must": [{"term": {"_id": item_id}}],
-                    "should": [],
-                },
+    def get_matching_topics_query(self):
+        return {
+            "bool": {
+                "must_not": [
+                    {"term": {"type": "composite"}},
+                    {"constant_score": {"filter": {"exists": {"field": "nextversion"}}}},
+                ],
+                "must": [],
+                "should": [],
             },
-        )
+        }
 
     def has_permissions(self, item, ignore_latest=False):
         """Test if current user has permissions to view given item."""
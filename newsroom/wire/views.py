@@ -1,9 +1,8 @@
 import io
 import flask
-import zipfile
 import superdesk
 
-from typing import Dict
+from typing import Dict, Optional
 from operator import itemgetter
 from flask import current_app as app, request, jsonify
 from eve.render import send_response
@@ -16,7 +15,7 @@ from superdesk import get_resource_service
 from superdesk.default_settings import strtobool
 from newsroom.auth.utils import check_user_has_products, is_valid_session
 
-from newsroom.cards import get_card_size, get_card_type
+from newsroom.cards import get_card_size, get_card_type, get_dashboard_cards
 from newsroom.navigations.navigations import get_navigations
 from newsroom.products.products import get_products_by_company
 from newsroom.wire import blueprint
@@ -31,7 +30,6 @@ from newsroom.utils import (
     parse_dates,
     get_type,
     is_json_request,
-    query_resource,
     get_agenda_dates,
     get_location_string,
     get_public_contacts,
@@ -46,16 +44,13 @@ from newsroom.notifications import (
 )
 from newsroom.template_filters import is_admin_or_internal
 from newsroom.gettext import get_session_locale
-from newsroom.public.views import (
-    render_public_dashboard,
-    PUBLIC_DASHBOARD_CONFIG_CACHE_KEY,
-    PUBLIC_DASHBOARD_CARDS_CACHE_KEY,
-    PUBLIC_DASHBOARD_ITEMS_CACHE_KEY,
-)
+from newsroom.public.views import render_public_dashboard
+from newsroom.dashboard_cache import get_cached, invalidate_dashboard_caches
 
 from .search import get_bookmarks_count
 from .items import get_items_for_dashboard
 from ..upload import ASSETS_RESOURCE, get_upload
+from ..download import read_chunks, stream_response, stream_zip
 
 HOME_ITEMS_CACHE_KEY = "home_items"
 HOME_EXTERNAL_ITEMS_CACHE_KEY = "home_external_items"
@@ -122,45 +117,47 @@ def get_view_data() -> Dict:
 
 
 def get_items_by_card(cards, company_id):
-    cache_key = "{}{}".format(HOME_ITEMS_CACHE_KEY, company_id or "")
-    if app.cache.get(cache_key):
-        return app.cache.get(cache_key)
-
-    items_by_card = get_items_for_dashboard(cards)
-    app.cache.set(cache_key, items_by_card, timeout=app.config.get("DASHBOARD_CACHE_TIMEOUT", 300))
-    return items_by_card
+    return get_cached(
+        "{}{}".format(HOME_ITEMS_CACHE_KEY, company_id or ""),
+        lambda: get_items_for_dashboard(cards),
+        app.config.get("DASHBOARD_CACHE_TIMEOUT", 300),
+    )
 
 
 def delete_dashboard_caches():
-    app.cache.delete(HOME_ITEMS_CACHE_KEY)
-    app.cache.delete(PUBLIC_DASHBOARD_CONFIG_CACHE_KEY)
-    app.cache.delete(PUBLIC_DASHBOARD_CARDS_CACHE_KEY)
-    app.cache.delete(PUBLIC_DASHBOARD_ITEMS_CACHE_KEY)
-    for company in query_resource("companies"):
-        app.cache.delete(f"{HOME_ITEMS_CACHE_KEY}{company['_id']}")
+    """Invalidate home and public dashboard caches, these are tagged so there is no need to delete each key"""
+    invalidate_dashboard_caches()
 
 
 def get_personal_dashboards_data(user, company, topics):
     card_type = get_card_type(app.config.get("PERSONAL_DASHBOARD_CARD_TYPE") or "4-picture-text")
 
-    def get_topic_items(topic):
-        query = superdesk.get_resource_service("wire_search").get_topic_query(topic, user, company)
-        if not query:
-            return list()
-        return list(
-            superdesk.get_resource_service("wire_search").get_items_by_query(query, size=get_card_size(card_type))
+    wire_search = superdesk.get_resource_service("wire_search")
+    topics_by_id = {topic["_id"]: topic for topic in topics}
+    dashboards = user.get("dashboards") or []
+
+    # get the items of all the dashboard topics using a single request
+    topic_searches = {}
+    for dashboard in dashboards:
+        for topic_id in dashboard.get("topic_ids") or []:
+            if topic_id in topics_by_id and topic_id not in topic_searches:
+                topic_searches[topic_id] = wire_search.get_topic_query(topics_by_id[topic_id], user, company)
+    topic_searches = {topic_id: search for topic_id, search in topic_searches.items() if search}
+    topic_items = {
+        topic_id: list(result or [])
+        for topic_id, result in zip(
+            topic_searches.keys(),
+            wire_search.get_items_by_queries(list(topic_searches.values()), size=get_card_size(card_type)),
         )
+    }
 
     def _get_topic_data(topic_id):
-        for topic in topics:
-            if topic["_id"] == topic_id:
-                items = get_topic_items(topic)
-                if items:
-                    return {
-                        "_id": topic["_id"],
-                        "items": items,
-                    }
-                break
+        items = topic_items.get(topic_id)
+        if items:
+            return {
+                "_id": topic_id,
+                "items": items,
+            }
         return None
 
     def _get_dashboard_data(dashboard, index):
@@ -173,14 +170,13 @@ def get_personal_dashboards_data(user, company, topics):
             ),
         }
 
-    dashboards = user.get("dashboards") or []
     return [_get_dashboard_data(dashboard, i) for i, dashboard in enumerate(dashboards)]
 
 
 def get_home_data():
     user = get_user()
     company = get_company(user)
-    cards = list(query_resource("cards", lookup={"dashboard": "newsroom"}))
+    cards = get_dashboard_cards("newsroom")
     company_id = str(user["company"]) if user and user.get("company") else None
     topics = get_user_topics(user["_id"]) if user else []
 
@@ -245,7 +241,7 @@ def get_media_card_external(card_id):
 @login_required
 def get_card_items():
     user = get_user()
-    cards = list(query_resource("cards", lookup={"dashboard": "newsroom"}))
+    cards = get_dashboard_cards("newsroom")
     company_id = str(user["company"]) if user and user.get("company") else None
     items_by_card = get_items_by_card(cards, company_id)
     return flask.jsonify({"_items": items_by_card})
@@ -291,6 +287,7 @@ def download():
     _file = io.BytesIO()
     formatter = app.download_formatters[_format]["formatter"]
     mimetype = None
+    response: Optional[flask.Response] = None
     attachment_filename = "%s-newsroom.zip" % utcnow().strftime("%Y%m%d%H%M")
     if formatter.get_mediatype() == "picture":
         if len(items) == 1:
@@ -300,15 +297,19 @@ def download():
             except ValueError:
                 return flask.abort(404)
         else:
-            with zipfile.ZipFile(_file, mode="w") as zf:
+
+            def get_picture_entries():
                 for item in items:
                     try:
                         picture = formatter.format_item(item, item_type=item_type)
-                        file = flask.current_app.media.get(picture["media"], ASSETS_RESOURCE)
-                        zf.writestr("baseimage%s" % picture["file_extension"], file.read())
                     except ValueError:
-                        pass
-            _file.seek(0)
+                        continue
+                    file = flask.current_app.media.get(picture["media"], ASSETS_RESOURCE)
+                    if not file:
+                        continue
+                    yield "baseimage%s" % picture["file_extension"], read_chunks(file)
+
+            response = stream_response(stream_zip(get_picture_entries()), "application/zip", attachment_filename)
     elif len(items) == 1 or _format == "monitoring":
         item = items[0]
         args_item = item if _format != "monitoring" else items
@@ -319,21 +320,28 @@ def download():
         attachment_filename = secure_filename(formatter.format_filename(item))
     elif formatter.MULTI and len(items) != 1:
         # if we have multiple items, so in this case we stored their data in one csv file.
-        csv_data, attachment_filename = formatter.format_events(items, item_type=item_type)
-        _file.write(csv_data)
-        _file.seek(0)
+        if hasattr(formatter, "format_events_stream"):
+            csv_data, attachment_filename = formatter.format_events_stream(items, item_type=item_type)
+            response = stream_response(csv_data, formatter.get_mimetype(None), attachment_filename)
+        else:
+            csv_data, attachment_filename = formatter.format_events(items, item_type=item_type)
+            _file.write(csv_data)
+            _file.seek(0)
     else:
-        with zipfile.ZipFile(_file, mode="w") as zf:
+
+        def get_item_entries():
             for item in items:
                 parse_dates(item)  # fix for old items
-                zf.writestr(
-                    secure_filename(formatter.format_filename(item)),
-                    formatter.format_item(item, item_type=item_type),
-                )
-        _file.seek(0)
+                yield secure_filename(formatter.format_filename(item)), [
+                    formatter.format_item(item, item_type=item_type)
+                ]
+
+        response = stream_response(stream_zip(get_item_entries()), "application/zip", attachment_filename)
 
     update_action_list(data["items"], "downloads", force_insert=True)
     get_resource_service("history").create_history_record(items, "download", user, request.args.get("type", "wire"))
+    if response is not None:
+        return response
     return flask.send_file(
         _file,
         mimetype=mimetype,
@@ -0,0 +1,69 @@
+"""Compare the old and typed ``newsroom/json`` celery message formats.
+
+Usage: python scripts/benchmark-celery-serializer.py [iterations]
+"""
+
+import sys
+import base64
+import timeit
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from flask import Flask
+from eve.io.mongo import MongoJSONEncoder
+
+import newsroom
+from newsroom.celery_app import dumps, loads
+
+newsroom.flask_app = Flask(__name__)
+
+# payload similar to ``_send_email`` task with a rendered email and an attachment
+payload = [
+    [],
+    {
+        "to": ["foo{}@example.com".format(i) for i in range(50)],
+        "subject": "New story for followed topic",
+        "text_body": "Lorem ipsum dolor sit amet\n" * 500,
+        "html_body": "<p>Lorem <b>ipsum</b> dolor sit amet</p>\n" * 500,
+        "attachments_info": [
+            {
+                "file": base64.b64encode(b"x" * 200000).decode(),
+                "file_name": "story.txt",
+                "content_type": "text/plain",
+                "file_desc": "Story",
+            }
+        ],
+        "items": [
+            {
+                "_id": ObjectId(),
+                "guid": "urn:newsml:localhost:2023-05-01:{}".format(i),
+                "headline": "Headline {}".format(i),
+                "versioncreated": datetime.now(timezone.utc),
+                "firstcreated": datetime.now(timezone.utc),
+            }
+            for i in range(20)
+        ],
+    },
+    {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    newsroom.flask_app.config["TYPED_CELERY_MESSAGES"] = True
+
+    with newsroom.flask_app.app_context():
+        old_message = MongoJSONEncoder().encode(payload)
+    typed_message = dumps(payload)
+
+    print("message size: old {} bytes, typed {} bytes".format(len(old_message), len(typed_message)))
+    for label, message in (("old", old_message), ("typed", typed_message)):
+        loads_time = timeit.timeit(lambda: loads(message), number=iterations) / iterations
+        print("{} format loads: {:.3f} ms".format(label, loads_time * 1000))
+
+    dumps_time = timeit.timeit(lambda: dumps(payload), number=iterations) / iterations
+    print("typed format dumps: {:.3f} ms".format(dumps_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
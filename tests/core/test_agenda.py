@@ -26,6 +26,7 @@ from .utils import add_company_products
 
 from copy import deepcopy
 from bson import ObjectId
+from superdesk import get_resource_service
 
 date_time_format = "%Y-%m-%dT%H:%M:%S"
 
@@ -744,3 +745,46 @@ def test_filter_events_only(client):
     assert "urn:conference" == data["_items"][0]["_id"]
     assert "planning_items" not in data["_items"][0]
     assert "coverages" not in data["_items"][0]
+
+
+def test_search_marks_matched_event_using_single_request(client, app):
+    es = app.data.elastic.es
+    with mock.patch.object(es, "search", wraps=es.search) as es_search:
+        data = get_json(client, "/agenda/search?q=Conference")
+        assert 1 == es_search.call_count
+
+    items = {item["_id"]: item for item in data["_items"]}
+    assert items["urn:conference"]["_hits"]["matched_event"] is True
+
+
+def test_enhance_items_fetches_coverage_wire_items_at_once(app):
+    app.data.insert(
+        "items",
+        [
+            {"_id": "wire1", "type": "text", "firstpublished": datetime(2018, 5, 28, 10, 0, tzinfo=pytz.UTC)},
+            {"_id": "wire2", "type": "text", "publish_schedule": datetime(2018, 5, 29, 10, 0, tzinfo=pytz.UTC)},
+        ],
+    )
+
+    def get_coverage(coverage_id, delivery_id):
+        return {
+            "coverage_id": coverage_id,
+            "coverage_type": "text",
+            "workflow_status": "completed",
+            "delivery_id": delivery_id,
+            "deliveries": [{"delivery_id": delivery_id}],
+        }
+
+    docs = [
+        {"_id": "agenda1", "coverages": [get_coverage("cov1", "wire1")]},
+        {"_id": "agenda2", "coverages": [get_coverage("cov2", "wire2"), get_coverage("cov3", "wire1")]},
+    ]
+
+    wire_search = get_resource_service("wire_search")
+    with mock.patch.object(wire_search, "get_items", wraps=wire_search.get_items) as get_items:
+        get_resource_service("agenda").enhance_items(docs)
+        assert 1 == get_items.call_count
+
+    assert docs[0]["coverages"][0]["publish_time"]
+    assert docs[1]["coverages"][0]["publish_time"]
+    assert docs[1]["coverages"][1]["publish_time"]
@@ -584,3 +584,32 @@ def test_change_password(client, admin):
 
     assert 200 == resp.status_code
     assert "Your password has been changed" in resp.get_data(as_text=True)
+
+
+def test_identity_is_loaded_once_per_request(app):
+    from flask import g, session
+    from newsroom.auth import get_user, get_company
+    from newsroom.auth.utils import get_user_sections
+    from tests.fixtures import PUBLIC_USER_ID, COMPANY_1_ID
+
+    with app.test_request_context():
+        session["user"] = str(PUBLIC_USER_ID)
+        for _ in range(5):
+            user = get_user()
+            assert get_company()["_id"] == COMPANY_1_ID
+            get_user_sections(user)
+
+        assert {"users": 1, "companies": 1} == g.identity_context.reads
+
+        get_resource_service("users").patch(PUBLIC_USER_ID, {"first_name": "Updated"})
+        assert "Updated" == get_user()["first_name"]
+        assert 2 == g.identity_context.reads["users"]
+
+        get_resource_service("companies").patch(COMPANY_1_ID, {"name": "Updated"})
+        assert "Updated" == get_company()["name"]
+        assert 2 == g.identity_context.reads["companies"]
+
+    with app.test_request_context():
+        session["user"] = str(PUBLIC_USER_ID)
+        get_user()
+        assert {"users": 1, "companies": 0} == g.identity_context.reads
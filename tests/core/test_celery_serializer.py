@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from eve.io.mongo import MongoJSONEncoder
+
+from newsroom.celery_app import dumps, loads, TYPED_FORMAT_KEY
+
+
+def test_typed_format_roundtrip(app):
+    app.config["TYPED_CELERY_MESSAGES"] = True
+    _id = ObjectId()
+    now = datetime(2023, 5, 1, 10, 30, 15, 123000, tzinfo=timezone.utc)
+    payload = [
+        [str(_id), "2023-05-01T10:30:15+0000"],
+        {
+            "_id": _id,
+            "created": now,
+            "naive": now.replace(tzinfo=None),
+            "count": 0,
+            "enabled": False,
+            "html": "<p>foo</p>",
+        },
+        {"callbacks": None},
+    ]
+
+    data = dumps(payload)
+    assert TYPED_FORMAT_KEY in data
+
+    args, kwargs, embed = loads(data)
+    assert args == [str(_id), "2023-05-01T10:30:15+0000"]  # strings are no longer casted
+    assert kwargs["_id"] == _id
+    assert kwargs["created"] == now
+    assert kwargs["naive"] == now
+    assert kwargs["count"] == 0
+    assert kwargs["enabled"] is False
+    assert kwargs["html"] == "<p>foo</p>"
+    assert embed == {"callbacks": None}
+
+
+def test_reads_old_format(app):
+    _id = ObjectId()
+    data = MongoJSONEncoder().encode([[], {"_id": _id, "created": datetime(2023, 5, 1, tzinfo=timezone.utc)}, {}])
+
+    args, kwargs, embed = loads(data)
+    assert kwargs["_id"] == _id
+    assert kwargs["created"] == datetime(2023, 5, 1, tzinfo=timezone.utc)
+
+
+def test_writes_old_format_by_default(app):
+    _id = ObjectId()
+    data = dumps([[], {"_id": _id}, {}])
+    assert TYPED_FORMAT_KEY not in data
+
+    args, kwargs, embed = loads(data)
+    assert kwargs["_id"] == _id
@@ -14,6 +14,8 @@ from newsroom.wire.search import (
 )
 from newsroom.search.config import init_nested_aggregation
 from newsroom.commands import fix_topic_nested_filters
+from newsroom import reindex
+from newsroom.reindex import get_checkpoint_id, reindex_from_mongo
 
 from newsroom.tests.conftest import reset_elastic
 from ..fixtures import items, init_items, init_auth, init_company  # noqa
@@ -115,6 +117,46 @@ def test_index_from_mongo_from_timestamp(app, client):
     assert 6 == app.data.elastic.find("items", ParsedRequest(), {})[1]
 
 
+def test_reindex_from_mongo_resume(app):
+    app.data.remove("items")
+    app.data.insert("items", [{"_id": "a"}, {"_id": "b"}, {"_id": "c"}])
+    remove_elastic_index(app)
+    app.data.init_elastic(app)
+    sleep(1)
+
+    checkpoints = app.data.mongo.pymongo().db["newsroom"]
+    checkpoints.insert_one(
+        {
+            "_id": get_checkpoint_id("items"),
+            "index": app.data.elastic._resource_index("items"),
+            "lookup": "{}",
+            "parts": [{"lower": None, "upper": None, "last_id": "b", "indexed": 2, "done": False}],
+        }
+    )
+
+    assert 1 == reindex_from_mongo("items", resume=True)
+    assert 1 == app.data.elastic.find("items", ParsedRequest(), {})[1]
+    assert checkpoints.find_one({"_id": get_checkpoint_id("items")}) is None
+
+    assert 3 == reindex_from_mongo("items", resume=True)
+    assert 3 == app.data.elastic.find("items", ParsedRequest(), {})[1]
+
+
+def test_reindex_from_mongo_in_parallel(app, mocker):
+    app.data.remove("items")
+    app.data.insert("items", [{"_id": "item-{:02d}".format(i)} for i in range(30)])
+    remove_elastic_index(app)
+    app.data.init_elastic(app)
+    sleep(1)
+
+    mocker.patch.object(reindex, "MIN_PART_SIZE", 1)
+    get_parts = mocker.spy(reindex, "get_parts")
+    assert 30 == reindex_from_mongo("items", workers=3)
+    assert len(get_parts.spy_return) > 1
+    assert 30 == app.data.elastic.find("items", ParsedRequest(), {})[1]
+    assert app.data.mongo.pymongo().db["newsroom"].find_one({"_id": get_checkpoint_id("items")}) is None
+
+
 def test_fix_topic_nested_filters(app, client):
     app.config["WIRE_GROUPS"].extend(
         [
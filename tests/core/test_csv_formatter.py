@@ -169,3 +169,20 @@ def test_csv_formatter_item(client, app):
     ]
 
     assert data_fields2 == expected_data_values2
+
+
+def test_csv_formatter_events_stream(client, app):
+    client.post("/push", data=json.dumps(event), content_type="application/json")
+    parsed = get_entity_or_404(event["guid"], "agenda")
+
+    rows, filename = formatter.format_events_stream(iter([copy.deepcopy(parsed), copy.deepcopy(parsed)]))
+    assert filename.endswith("-multi.csv")
+
+    chunks = list(rows)
+    assert len(chunks) == 2  # header & first row, second row
+
+    csv_lines = list(csv.reader(b"".join(chunks).decode("utf-8").splitlines()))
+    assert len(csv_lines) == 3
+    assert csv_lines[0][0] == "Event name"
+    assert csv_lines[1] == csv_lines[2]
+    assert b"".join(chunks) == formatter.format_events([copy.deepcopy(parsed), copy.deepcopy(parsed)])[0]
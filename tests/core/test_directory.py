@@ -0,0 +1,139 @@
+from unittest import mock
+from bson import ObjectId
+from superdesk import get_resource_service
+
+from newsroom.directory import get_directory
+from ..fixtures import PUBLIC_USER_ID, COMPANY_1_ID
+
+
+def test_users_directory_refresh(app):
+    users = get_directory("users")
+    docs = users.get_docs()
+    assert str(PUBLIC_USER_ID) in docs
+    version = users.version
+
+    get_resource_service("users").patch(PUBLIC_USER_ID, {"first_name": "Updated"})
+    docs = users.get_docs()
+    assert users.version > version
+    assert docs[str(PUBLIC_USER_ID)]["first_name"] == "Updated"
+
+    get_resource_service("users").patch(PUBLIC_USER_ID, {"is_enabled": False})
+    assert str(PUBLIC_USER_ID) not in users.get_docs()
+
+    new_user_id = ObjectId()
+    get_resource_service("users").post(
+        [
+            {
+                "_id": new_user_id,
+                "email": "directory@example.com",
+                "first_name": "Directory",
+                "last_name": "User",
+                "user_type": "public",
+                "is_enabled": True,
+                "company": COMPANY_1_ID,
+            }
+        ]
+    )
+    assert str(new_user_id) in users.get_docs()
+
+
+def test_companies_directory_refresh(app):
+    companies = get_directory("companies")
+    assert str(COMPANY_1_ID) in companies.get_docs()
+
+    get_resource_service("companies").patch(COMPANY_1_ID, {"name": "Updated"})
+    assert companies.get_docs()[str(COMPANY_1_ID)]["name"] == "Updated"
+
+    company = get_resource_service("companies").find_one(req=None, _id=COMPANY_1_ID)
+    get_resource_service("companies").delete_action({"_id": company["_id"]})
+    assert str(COMPANY_1_ID) not in companies.get_docs()
+
+
+def test_config_directories(app):
+    from newsroom.directory import mark_reload
+    from newsroom.navigations.navigations import get_navigations_by_ids
+    from newsroom.products.products import (
+        get_product_by_id,
+        get_products_by_company,
+        get_products_by_navigation,
+        products_service,
+    )
+
+    app.config["DIRECTORY_ENABLED"] = True
+    navigation_id = ObjectId()
+    product_id = ObjectId()
+    get_resource_service("navigations").post([{"_id": navigation_id, "name": "Sport", "is_enabled": True}])
+    get_resource_service("products").post(
+        [{"_id": product_id, "name": "Sport", "navigations": [navigation_id], "is_enabled": True}]
+    )
+    company = {"products": [{"_id": product_id, "section": "wire"}]}
+
+    with mock.patch.object(products_service, "get_from_mongo") as get_from_mongo, mock.patch.object(
+        get_resource_service("navigations"), "get"
+    ) as get_navigations:
+        assert [product_id] == [p["_id"] for p in get_products_by_navigation([navigation_id])]
+        assert [product_id] == [p["_id"] for p in get_products_by_company(company, [navigation_id])]
+        assert [navigation_id] == [n["_id"] for n in get_navigations_by_ids([navigation_id])]
+        get_from_mongo.assert_not_called()
+        get_navigations.assert_not_called()
+
+    get_resource_service("products").patch(product_id, {"is_enabled": False})
+    assert get_product_by_id(product_id) is None
+    assert [] == get_products_by_navigation([navigation_id])
+
+    get_resource_service("navigations").patch(navigation_id, {"is_enabled": False})
+    assert [] == get_navigations_by_ids([navigation_id])
+
+    ui_config = get_resource_service("ui_config")
+    assert {} == ui_config.get_section_config("wire")
+    app.data.insert("ui_config", [{"_id": "wire", "preview": {}}])
+    mark_reload("ui_config")
+    assert "wire" == ui_config.get_section_config("wire")["_id"]
+
+
+def test_user_and_company_dict_are_copies(app):
+    from newsroom.utils import get_company_dict, get_user_dict
+
+    app.config["DIRECTORY_ENABLED"] = True
+    user = get_user_dict()[str(PUBLIC_USER_ID)]
+    user.setdefault("notification_schedule", {"timezone": "Europe/Prague"})
+    user["first_name"] = "Changed"
+    get_company_dict()[str(COMPANY_1_ID)]["name"] = "Changed"
+
+    user = get_directory("users").get_docs()[str(PUBLIC_USER_ID)]
+    assert "Changed" != user["first_name"]
+    assert "notification_schedule" not in user
+    assert "Changed" != get_directory("companies").get_docs()[str(COMPANY_1_ID)]["name"]
+
+
+def test_config_directories_return_copies(app):
+    from newsroom.cards import get_dashboard_cards
+    from newsroom.navigations.navigations import get_navigations_by_ids
+    from newsroom.products.products import get_product_by_id, get_products, get_products_by_navigation
+
+    app.config["DIRECTORY_ENABLED"] = True
+    navigation_id = ObjectId()
+    product_id = ObjectId()
+    get_resource_service("navigations").post([{"_id": navigation_id, "name": "Sport", "is_enabled": True}])
+    get_resource_service("products").post(
+        [{"_id": product_id, "name": "Sport", "navigations": [navigation_id], "is_enabled": True}]
+    )
+    get_resource_service("cards").post(
+        [{"label": "Sport", "type": "4-picture-text", "dashboard": "newsroom", "config": {"product": product_id}}]
+    )
+    get_resource_service("ui_config").post([{"_id": "wire", "preview": {}}])
+
+    get_navigations_by_ids([navigation_id])[0]["story_count"] = 10
+    get_products_by_navigation([navigation_id])[0]["name"] = "Changed"
+    get_product_by_id(product_id)["query"] = "changed"
+    get_products([product_id], None)[0]["description"] = "changed"
+    get_dashboard_cards("newsroom")[0]["label"] = "Changed"
+    get_resource_service("ui_config").get_section_config("wire")["preview"] = None
+
+    assert "story_count" not in get_navigations_by_ids([navigation_id])[0]
+    product = get_product_by_id(product_id)
+    assert "Sport" == product["name"]
+    assert "query" not in product
+    assert "description" not in product
+    assert "Sport" == get_dashboard_cards("newsroom")[0]["label"]
+    assert {} == get_resource_service("ui_config").get_section_config("wire")["preview"]
@@ -173,6 +173,18 @@ def test_wire_download(client, app):
     assert history[0].get("section") == "wire"
 
 
+def test_wire_download_text_format(client, app):
+    from newsroom.wire.formatters.ninjs import NINJSFormatter
+
+    # formatter returning ``str`` instead of ``bytes``
+    app.download_formatter("ninjs", NINJSFormatter(), "NINJS", ["wire"])
+    _file = download_zip_file(client, "ninjs", "wire")
+    with zipfile.ZipFile(_file) as zf:
+        assert len(items_ids) == len(zf.namelist())
+        data = json.loads(zf.open(zf.namelist()[0]).read().decode("utf-8"))
+        assert data["guid"] in items_ids
+
+
 def test_agenda_download(client, app):
     setup_image(client, app)
     for _format in agenda_formats:
@@ -1,4 +1,5 @@
 import pytest
+from unittest import mock
 from werkzeug.exceptions import BadRequest, NotFound
 
 from superdesk import get_resource_service
@@ -158,3 +159,37 @@ def test_get_from_mongo_returns_working_cursor(app):
     items = service.get_from_mongo(None, {})
     assert 1 == items.count()
     assert 1 == len(list(items))
+
+
+def test_subject_template_compiled_once(app):
+    app.data.insert(
+        RESOURCE,
+        [
+            {
+                "_id": "validate_account_email",
+                "subject": {
+                    "default": "{{ app_name }} account created",
+                    "translations": {"fi": "{{ app_name }} Finnish account created"},
+                },
+            }
+        ],
+    )
+    service = get_resource_service(RESOURCE)
+
+    with mock.patch.object(app.jinja_env, "from_string", wraps=app.jinja_env.from_string) as from_string:
+        for i in range(5):
+            assert "Newshub account created" == service.get_translated_subject(
+                "validate_account_email", app_name="Newshub"
+            )
+            assert "Newshub Finnish account created" == service.get_translated_subject(
+                "validate_account_email", "fi", app_name="Newshub"
+            )
+        assert 2 == from_string.call_count
+
+        service.patch(
+            "validate_account_email",
+            {"subject": {"default": "{{ app_name }} account ready", "translations": {"fi": "{{ app_name }} valmis"}}},
+        )
+        assert "Newshub account ready" == service.get_translated_subject("validate_account_email", app_name="Newshub")
+        assert "Newshub valmis" == service.get_translated_subject("validate_account_email", "fi", app_name="Newshub")
+        assert 4 == from_string.call_count
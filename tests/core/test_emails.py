@@ -1,4 +1,6 @@
 import pathlib
+import threading
+import socketserver
 
 from flask import render_template_string, json, url_for
 from jinja2 import TemplateNotFound
@@ -10,9 +12,16 @@ from newsroom.email import (
     EmailGroup,
     send_email,
     handle_long_lines_html,
+    email_batch,
+    get_mail_connection,
+    get_email_message,
+    _send_email_batch,
 )
+from newsroom.email_attachments import store_email_attachment, remove_expired_email_attachments
 from unittest import mock
 from datetime import datetime
+from pytest import approx, raises
+from celery.exceptions import SoftTimeLimitExceeded
 
 from newsroom.types import User
 from newsroom.email import send_user_email
@@ -297,3 +306,121 @@ def test_send_user_email_on_locale_changed():
         send_user_email(user, "test_template", template_kwargs=template_kwargs)
         assert "Event status : Planned" in send_email_mock.call_args[1]["text_body"]
         assert "Coverage status: Planned" in send_email_mock.call_args[1]["text_body"]
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """Minimal SMTP server accepting all messages"""
+
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 localhost\r\n")
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self.server.handshakes += 1
+                self.wfile.write(b"250 OK\r\n")
+            elif command == b"DATA":
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                self.server.messages += 1
+                self.wfile.write(b"250 OK\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                break
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class FakeClock:
+    """Replaces ``time`` module in :mod:`newsroom.email`, sleeping only advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def send_batch(app, count):
+    with email_batch():
+        for i in range(count):
+            send_email(to=["user{}@example.com".format(i)], subject="Test", text_body="Test")
+
+
+def test_send_email_batch_using_pooled_connection(app):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStandIn)
+    server.daemon_threads = True
+    server.connections = 0
+    server.handshakes = 0
+    server.messages = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    app.config.update(MAIL_BATCH_SIZE=20, MAIL_CONNECTION_MAX_EMAILS=25)
+    mail = app.extensions["mail"]
+    try:
+        with mock.patch.multiple(
+            mail, server="127.0.0.1", port=server.server_address[1], suppress=False, use_tls=False, use_ssl=False
+        ), mock.patch("newsroom.email._send_email.apply_async") as send_single:
+            send_batch(app, 50)
+            assert 50 == server.messages
+            assert 2 == server.connections
+            assert 2 == server.handshakes
+            send_single.assert_not_called()
+
+            get_mail_connection().close()
+            app.extensions.pop("newsroom_mail_connection")
+            app.config["MAIL_RATE_LIMIT"] = 50
+            clock = FakeClock()
+            with mock.patch("newsroom.email.time", clock):
+                send_batch(app, 11)
+            assert 61 == server.messages
+            assert 3 == server.handshakes
+            assert 10 == len(clock.sleeps)
+            assert clock.now == approx(10 / 50)
+            get_mail_connection().close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_send_email_batch_stops_on_soft_time_limit(app):
+    connection = mock.Mock()
+    connection.send.side_effect = SoftTimeLimitExceeded()
+    messages = [{"to": ["user{}@example.com".format(i)], "subject": "Test", "text_body": "Test"} for i in range(3)]
+    with mock.patch("newsroom.email.get_mail_connection", return_value=connection):
+        with raises(SoftTimeLimitExceeded):
+            _send_email_batch.run(messages)
+    assert 1 == connection.send.call_count
+
+
+def test_email_attachment_from_media_storage(app, client):
+    media_id = store_email_attachment(b"report content", "report.pdf", "application/pdf")
+    assert 404 == client.get("/assets/{}".format(media_id)).status_code
+    attachments_info = [
+        {"media_id": media_id, "file_name": "report.pdf", "content_type": "application/pdf", "file_desc": "Report"}
+    ]
+
+    attachments = {}
+    with mock.patch.object(app.media, "get", wraps=app.media.get) as media_get:
+        for i in range(3):
+            msg = get_email_message(
+                ["foo@example.com"],
+                "Report",
+                "Report",
+                attachments_info=attachments_info,
+                attachments_cache=attachments,
+            )
+            assert b"report content" == msg.attachments[0].data
+            assert "report.pdf" == msg.attachments[0].filename
+        assert 1 == media_get.call_count
+
+    app.config["EMAIL_ATTACHMENTS_EXPIRY_HOURS"] = 0
+    assert 1 == remove_expired_email_attachments()
+    assert not app.media.get(media_id, "upload")
@@ -40,3 +40,55 @@ def test_personal_dashboard_data(client, app, company_products):
     assert topic_items[0]["_id"] == topics[0]["_id"]
     assert 1 == len(topic_items[0]["items"])
     assert "Weather" == topic_items[0]["items"][0]["headline"]
+
+
+def test_dashboard_cache_serves_stale_value_while_rebuilding(app):
+    from newsroom.dashboard_cache import (
+        STATS_KEY,
+        get_cached,
+        get_dashboard_cache,
+        get_lock_key,
+        invalidate_dashboard_caches,
+    )
+
+    key = "home_items_test"
+    app.redis.delete(STATS_KEY)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return len(builds)
+
+    assert 1 == get_cached(key, build, 60)
+    assert 1 == get_cached(key, build, 60)
+    assert 1 == len(builds)
+
+    invalidate_dashboard_caches()
+    app.redis.set(get_lock_key(key), "other worker")
+    assert 1 == get_cached(key, build, 60)
+    assert 1 == len(builds)
+
+    app.redis.delete(get_lock_key(key))
+    assert 2 == get_cached(key, build, 60)
+    assert 2 == get_cached(key, build, 60)
+    assert app.redis.get(get_lock_key(key)) is None
+
+    stats = get_dashboard_cache().get_stats()
+    assert 2 == stats["hit"]
+    assert 2 == stats["stale"]
+    assert 1 == stats["miss"]
+    assert 2 == stats["rebuild"]
+
+
+def test_dashboard_cache_stats_shared_by_workers(app):
+    from newsroom.dashboard_cache import STATS_KEY, DashboardCache
+
+    app.redis.delete(STATS_KEY)
+    app.config["DASHBOARD_CACHE_STATS_INTERVAL"] = 0
+    first, second = DashboardCache(), DashboardCache()
+    first.count("hit")
+    second.count("hit")
+    second.count("miss")
+
+    assert {"hit": 2, "stale": 0, "miss": 1, "rebuild": 0} == first.get_stats()
+    assert first.get_stats() == second.get_stats()
@@ -281,6 +281,28 @@ def test_get_products_by_navigation_caching(app):
         assert 0 == len(get_products_by_navigation([nav_id], "wire"))
 
 
+def test_get_products_by_navigation_with_directory(app):
+    from newsroom.directory import mark_reload
+
+    app.config["DIRECTORY_ENABLED"] = True
+    nav_id = ObjectId()
+    product_id = ObjectId()
+    app.data.insert("navigations", [{"_id": nav_id, "name": "Uber", "is_enabled": True, "product_type": "wire"}])
+    app.data.insert(
+        "products",
+        [{"_id": product_id, "name": "A News", "is_enabled": True, "product_type": "wire", "query": "latest"}],
+    )
+    # inserted bypassing the service
+    mark_reload("products")
+    assert 0 == len(get_products_by_navigation([nav_id], "wire"))
+
+    add_remove_products_for_navigation(nav_id, [str(product_id)])
+    assert [product_id] == [p["_id"] for p in get_products_by_navigation([nav_id], "wire")]
+
+    add_remove_products_for_navigation(nav_id, [])
+    assert 0 == len(get_products_by_navigation([nav_id], "wire"))
+
+
 def test_get_navigations_for_admin(admin):
     navigations = get_navigations(admin, None, "wire")
     assert 1 == len(navigations)
@@ -3,7 +3,7 @@ from bson import ObjectId
 import datetime
 from superdesk.utc import utcnow
 from superdesk import get_resource_service
-from newsroom.notifications import get_user_notifications
+from newsroom.notifications import get_user_notifications, save_user_notifications
 from ..fixtures import init_company, PUBLIC_USER_ID, TEST_USER_ID  # noqa
 
 user = str(PUBLIC_USER_ID)
@@ -42,6 +42,37 @@ def test_notification_updates_with_unique_id(client, app):
     assert old_created != new_created
 
 
+def test_save_user_notifications_in_bulk(client, app):
+    app.config["NOTIFICATIONS_TTL"] = 1
+    users = {
+        user: {"_id": ObjectId(user), "receive_app_notifications": True},
+        str(TEST_USER_ID): {"_id": TEST_USER_ID, "receive_app_notifications": False},
+    }
+
+    save_user_notifications(
+        [
+            {"user": ObjectId(user), "item": "Foo", "resource": "wire", "action": "topic_matches", "data": None},
+            {"user": TEST_USER_ID, "item": "Foo", "resource": "wire", "action": "topic_matches", "data": None},
+        ],
+        users=users,
+    )
+
+    assert len(get_user_notifications(TEST_USER_ID)) == 0
+    notifications = get_user_notifications(ObjectId(user))
+    assert len(notifications) == 1
+    assert notifications[0]["action"] == "topic_matches"
+
+    save_user_notifications(
+        [{"user": ObjectId(user), "item": "Foo", "resource": "wire", "action": None, "data": {"foo": "bar"}}],
+        users=users,
+    )
+
+    notifications = get_user_notifications(ObjectId(user))
+    assert len(notifications) == 1
+    assert notifications[0]["action"] == "topic_matches"
+    assert notifications[0]["data"] == {"foo": "bar"}
+
+
 def test_delete_notification_fails_for_different_user(client):
     with client.session_transaction() as session:
         session["user"] = user
@@ -262,6 +262,46 @@ def test_push_featuremedia_has_renditions_for_existing_media(client):
         assert 200 == resp.status_code
 
 
+def test_generate_picture_renditions_decodes_source_once(client, app):
+    from newsroom import media_utils
+
+    media_id = str(bson.ObjectId())
+    upload_binary("picture.jpg", client, media_id=media_id)
+    picture = {
+        "type": "picture",
+        "renditions": {
+            "4-3": {"media": media_id, "width": 800, "height": 533},
+            "baseImage": {"media": media_id, "width": 800, "height": 533},
+            "viewImage": {"media": media_id},
+        },
+    }
+
+    with app.test_request_context(), mock.patch.object(
+        media_utils.Image, "open", wraps=media_utils.Image.open
+    ) as image_open:
+        media_utils.generate_renditions(picture)
+        assert 1 == image_open.call_count
+
+        # existing renditions are not generated again
+        media_utils.generate_renditions(picture)
+        assert 1 == image_open.call_count
+
+    for name in ["thumbnail", "thumbnail_large", "view", "base"]:
+        rendition = picture["renditions"]["_newsroom_%s" % name]
+        assert "%s_newsroom_%s" % (media_id, name) == rendition["media"]
+        resp = client.get(rendition["href"])
+        assert 200 == resp.status_code
+        if name != "view":
+            image = media_utils.Image.open(io.BytesIO(resp.get_data()))
+            assert (rendition["width"], rendition["height"]) == image.size
+
+    assert (640, 426) == (
+        picture["renditions"]["_newsroom_thumbnail"]["width"],
+        picture["renditions"]["_newsroom_thumbnail"]["height"],
+    )
+    assert "width" not in picture["renditions"]["_newsroom_view"]
+
+
 def test_push_binary_invalid_signature(client, app):
     app.config["PUSH_KEY"] = b"foo"
     resp = client.post(
@@ -746,6 +786,70 @@ def test_send_notification_emails(client, app):
     assert "http://localhost:5050/wire?item=foo" in outbox[0].body
 
 
+@mock.patch("newsroom.email.send_email", mock_send_email)
+def test_send_notification_emails_shares_highlight_search(client, app, mocker):
+    user_ids = app.data.insert(
+        "users",
+        [
+            {
+                "email": "foo{}@bar.com".format(i),
+                "first_name": "Foo",
+                "is_enabled": True,
+                "receive_email": True,
+                "user_type": "administrator",
+            }
+            for i in range(3)
+        ],
+    )
+
+    app.data.insert(
+        "topics",
+        [
+            {
+                "label": "topic-1",
+                "query": "test",
+                "user": user_ids[0],
+                "subscribers": [{"user_id": user_id, "notification_type": "real-time"} for user_id in user_ids],
+                "is_global": True,
+                "topic_type": "wire",
+            },
+        ],
+    )
+
+    msearch = mocker.spy(app.data.elastic.elastic("wire_search"), "msearch")
+    with app.mail.record_messages() as outbox:
+        key = b"something random"
+        app.config["PUSH_KEY"] = key
+        data = json.dumps(
+            {
+                "guid": "foo",
+                "type": "text",
+                "headline": "this is a test headline",
+                "body_html": "<p>test body</p>",
+            }
+        )
+        headers = get_signature_headers(data, key)
+        resp = client.post("/push", data=data, content_type="application/json", headers=headers)
+        assert 200 == resp.status_code
+
+    assert len(outbox) == 3
+    assert msearch.call_count == 1
+    assert len(msearch.call_args[1]["body"]) == 2  # single header & search body
+
+
+def test_search_query_key_includes_highlight_args(app):
+    from newsroom.push import get_search_query_key
+    from newsroom.search.service import SearchQuery
+
+    first, second = SearchQuery(), SearchQuery()
+    first.args = {"q": "foo", "es_highlight": 1}
+    second.args = {"q": "bar", "es_highlight": 1}
+    assert get_search_query_key(first) != get_search_query_key(second)
+
+    second.args["q"] = "foo"
+    assert get_search_query_key(first) == get_search_query_key(second)
+
+
 def test_matching_topics(client, app):
     app.config["WIRE_AGGS"]["genre"] = {"terms": {"field": "genre.name", "size": 50}}
     client.post("/push", data=json.dumps(item), content_type="application/json")
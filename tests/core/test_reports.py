@@ -1,8 +1,17 @@
+import io
+import csv
+import gzip
+from unittest import mock
+from urllib.parse import urlparse
+
 from flask import json
 from pytest import fixture
 from bson import ObjectId
 from datetime import datetime, timedelta
-from newsroom.tests.fixtures import COMPANY_1_ID
+from newsroom.tests.fixtures import COMPANY_1_ID, PUBLIC_USER_ID
+from newsroom.search.scroll import scroll_search
+from newsroom.reports.export import EXPORTS_FOLDER
+from newsroom.upload import remove_expired_media
 
 
 @fixture(autouse=True)
@@ -190,3 +199,70 @@ def test_content_activity_csv(client):
     values = lines[1].split(",")
     assert "Amazon Is Opening More Bookstores" == values[1]
     assert "0" == values[-1]
+
+
+def test_subscriber_activity_csv_exports_all_records(client, app):
+    now = datetime.utcnow()
+    app.data.insert(
+        "history",
+        [
+            {
+                "_id": "history-{}".format(i),
+                "action": "open",
+                "versioncreated": now - timedelta(minutes=i),
+                "user": PUBLIC_USER_ID,
+                "company": COMPANY_1_ID,
+                "item": "item-{}".format(i),
+                "section": "wire",
+            }
+            for i in range(30)
+        ],
+    )
+
+    with app.app_context():
+        pages = list(scroll_search("history", {"sort": [{"versioncreated": "desc"}]}, page_size=7))
+    assert [7, 7, 7, 7, 2] == [len(page.docs) for page in pages]
+    assert "history-0" == pages[0].docs[0]["_id"]
+    assert "history-29" == pages[-1].docs[-1]["_id"]
+
+    resp = client.get("reports/export/subscriber-activity?export=true")
+    assert 200 == resp.status_code
+    lines = resp.get_data(as_text=True).splitlines()
+    assert 31 == len(lines)
+    assert "Company,Section,Item,Action,User,Created" == lines[0]
+
+
+def test_content_activity_csv_gzip(client, app):
+    app.config["REPORTS_EXPORT_GZIP"] = True
+    today = datetime.now().date().isoformat()
+    resp = client.get(
+        "reports/export/content-activity?export=true&date_from={}&date_to={}".format(today, today),
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert 200 == resp.status_code
+    assert "gzip" == resp.headers["Content-Encoding"]
+
+    lines = gzip.decompress(resp.get_data()).decode("utf-8").splitlines()
+    assert "Headline" == lines[0].split(",")[1]
+
+
+def test_company_report_async_export(client, app):
+    with mock.patch("newsroom.reports.export.send_user_email") as send_user_email:
+        resp = client.get("reports/export/company?export=true&async=true")
+        assert 202 == resp.status_code
+
+    send_user_email.assert_called_once()
+    url = send_user_email.call_args[1]["template_kwargs"]["url"]
+    resp = client.get(urlparse(url).path)
+    assert 200 == resp.status_code
+    rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+    assert ["Company", "Enabled", "Products", "Users"] == rows[0]
+    assert "Example 2 Company" == rows[1][0]
+    assert resp.headers["Content-Disposition"].startswith("attachment; filename=company-")
+
+    media_id = urlparse(url).path.split("/")[-1]
+    assert 404 == client.get("/assets/{}".format(media_id)).status_code
+
+    app.config["REPORTS_EXPORT_EXPIRY_HOURS"] = 0
+    assert 1 == remove_expired_media(EXPORTS_FOLDER)
+    assert 404 == client.get(urlparse(url).path).status_code
@@ -1,12 +1,15 @@
 from typing import Dict, List
+from unittest import mock
 import flask
 
 from datetime import datetime, timedelta
 from bson import ObjectId
 
+from superdesk import get_resource_service
+from superdesk.lock import lock, unlock
 from superdesk.utc import utcnow, utc_to_local
 from newsroom.types import Topic, NotificationQueueTopic, NotificationSchedule, NotificationQueue
-from newsroom.notifications.send_scheduled_notifications import SendScheduledNotificationEmails
+from newsroom.notifications.send_scheduled_notifications import SendScheduledNotificationEmails, get_user_lock_id
 
 from newsroom.tests.users import ADMIN_USER_ID
 
@@ -269,3 +272,108 @@ def test_scheduled_notification_topic_matches_template():
     assert "Test Event" in output
     assert "Test Article" in output
     assert "Category: Sports" in output
+
+
+def test_send_scheduled_notifications_in_chunks(app):
+    user = app.data.find_one("users", req=None, _id=ADMIN_USER_ID)
+    topic_ids: List[ObjectId] = app.data.insert(
+        "topics",
+        [
+            {
+                "label": "Cheesy Stuff",
+                "query": "cheese",
+                "topic_type": "wire",
+                "subscribers": [{"user_id": user["_id"], "notification_type": "scheduled"}],
+            },
+            {
+                "label": "Onions",
+                "query": "onions",
+                "topic_type": "wire",
+                "subscribers": [{"user_id": user["_id"], "notification_type": "scheduled"}],
+            },
+        ],
+    )
+    app.data.insert(
+        "items",
+        [
+            {
+                "_id": "topic1_item1",
+                "body_html": "Story that involves cheese and onions",
+                "slugline": "That's the test slugline cheese",
+                "headline": "Demo Article",
+                "versioncreated": datetime.utcnow(),
+            },
+            {
+                "_id": "topic2_item1",
+                "body_html": "Story that involves onions",
+                "headline": "Onions Article",
+                "versioncreated": datetime.utcnow(),
+            },
+        ],
+    )
+    app.data.insert(
+        "notification_queue",
+        [
+            {
+                "user": user["_id"],
+                "topics": [
+                    {
+                        "items": ["topic1_item1"],
+                        "topic_id": topic_ids[0],
+                        "last_item_arrived": utcnow(),
+                        "section": "wire",
+                    },
+                    {
+                        "items": ["topic1_item1", "topic2_item1"],
+                        "topic_id": topic_ids[1],
+                        "last_item_arrived": utcnow() - timedelta(minutes=5),
+                        "section": "wire",
+                    },
+                ],
+            },
+            {"user": ObjectId(), "topics": []},
+        ],
+    )
+
+    app.config["SCHEDULED_NOTIFICATIONS_CHUNK_SIZE"] = 1
+    search_service = get_resource_service("wire_search")
+    with app.mail.record_messages() as outbox, mock.patch.object(
+        search_service, "get_items_by_queries", wraps=search_service.get_items_by_queries
+    ) as get_items_by_queries:
+        SendScheduledNotificationEmails().run(force=True)
+
+    assert 1 == get_items_by_queries.call_count
+    assert 1 == len(outbox)
+    assert "Demo Article" in outbox[0].body
+    assert "Onions Article" in outbox[0].body
+    assert 0 == app.data.get_mongo_collection("notification_queue").count_documents({})
+
+    user = app.data.find_one("users", req=None, _id=ADMIN_USER_ID)
+    assert user["notification_schedule"]["last_run_time"]
+
+
+def test_send_scheduled_notifications_overlapping_chunks(app):
+    other_user_id = ObjectId()
+    app.data.insert("notification_queue", [{"user": ADMIN_USER_ID, "topics": []}])
+    now = utcnow().replace(second=0, microsecond=0)
+    command = SendScheduledNotificationEmails()
+
+    # user is being processed by a chunk from the previous run
+    assert lock(get_user_lock_id(ADMIN_USER_ID), expire=60)
+    try:
+        with app.mail.record_messages() as outbox:
+            command.run_chunk([ADMIN_USER_ID, other_user_id], now, True)
+        assert 0 == len(outbox)
+        assert 1 == app.data.get_mongo_collection("notification_queue").count_documents({})
+    finally:
+        unlock(get_user_lock_id(ADMIN_USER_ID))
+
+    with app.mail.record_messages() as outbox:
+        command.run_chunk([ADMIN_USER_ID], now, True)
+    assert 1 == len(outbox)
+
+    # chunk dispatched with other users before the schedule run finished
+    app.data.insert("notification_queue", [{"user": ADMIN_USER_ID, "topics": []}])
+    with app.mail.record_messages() as outbox:
+        command.run_chunk([other_user_id, ADMIN_USER_ID], now, True)
+    assert 0 == len(outbox)
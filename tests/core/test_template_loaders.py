@@ -1,9 +1,12 @@
+import os
 import pytest
 import jinja2
 import pathlib
 import tempfile
 
-from newsroom.template_loaders import LocaleTemplateLoader, set_template_locale
+from unittest import mock
+
+from newsroom.template_loaders import LocaleEnvironment, get_bytecode_cache, set_template_locale
 
 
 def test_load_template_with_locale():
@@ -19,8 +22,7 @@ def test_load_template_with_locale():
             with open(pathlib.Path(tmpdir).joinpath(filename), "wt") as template:
                 template.write(data)
 
-        loader = LocaleTemplateLoader(tmpdir)
-        env = jinja2.Environment(loader=loader)
+        env = LocaleEnvironment(loader=jinja2.FileSystemLoader(tmpdir))
 
         assert "default template" == env.get_template("test.html").render()
 
@@ -56,3 +58,44 @@ def test_load_template_with_locale():
 
         with pytest.raises(jinja2.TemplateNotFound):
             env.get_template("missing.html").render()
+
+
+def test_compile_template_once_per_locale():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for filename, data in {"test.html": "default template", "test.fr.html": "fr template"}.items():
+            with open(pathlib.Path(tmpdir).joinpath(filename), "wt") as template:
+                template.write(data)
+
+        env = LocaleEnvironment(loader=jinja2.FileSystemLoader(tmpdir))
+
+        with mock.patch.object(env, "compile", wraps=env.compile) as compile:
+            for locale in ["fr", "en", "fr", None, "en", "fr"]:
+                set_template_locale(locale)
+                expected = "fr template" if locale == "fr" else "default template"
+                assert expected == env.get_template("test.html").render()
+
+        set_template_locale()
+        assert 2 == compile.call_count
+
+
+def test_templates_bytecode_cache(app):
+    with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as cachedir:
+        with open(pathlib.Path(tmpdir).joinpath("test.html"), "wt") as template:
+            template.write("default template")
+
+        app.config["TEMPLATES_BYTECODE_CACHE_DIR"] = cachedir
+        bytecode_cache = get_bytecode_cache(app)
+        assert isinstance(bytecode_cache, jinja2.FileSystemBytecodeCache)
+
+        env = LocaleEnvironment(loader=jinja2.FileSystemLoader(tmpdir), bytecode_cache=bytecode_cache)
+        assert "default template" == env.get_template("test.html").render()
+        assert os.listdir(cachedir)
+
+        # new worker loads compiled template from the cache
+        env = LocaleEnvironment(loader=jinja2.FileSystemLoader(tmpdir), bytecode_cache=bytecode_cache)
+        with mock.patch.object(env, "compile", wraps=env.compile) as compile:
+            assert "default template" == env.get_template("test.html").render()
+        compile.assert_not_called()
+
+        app.config["TEMPLATES_BYTECODE_CACHE"] = False
+        assert get_bytecode_cache(app) is None
@@ -0,0 +1,78 @@
+from superdesk import get_resource_service
+
+from newsroom.topics.percolator import rebuild_percolator, get_percolated_topic_ids
+from newsroom.utils import get_company_dict, get_user_dict
+from tests.core.utils import add_company_products
+from ..fixtures import COMPANY_1_ID, PUBLIC_USER_ID
+
+
+item = {
+    "guid": "foo",
+    "type": "text",
+    "headline": "Foo",
+    "firstcreated": "2017-11-27T08:00:57+0000",
+    "body_html": "<p>foo bar</p>",
+    "products": [{"code": "p-1"}],
+}
+
+
+def get_topic(label, query):
+    return {
+        "label": label,
+        "query": query,
+        "topic_type": "wire",
+        "user": PUBLIC_USER_ID,
+        "company": COMPANY_1_ID,
+        "subscribers": [{"user_id": PUBLIC_USER_ID, "notification_type": "real-time"}],
+    }
+
+
+def test_percolator_matching_topics(client, app):
+    app.config["TOPICS_PERCOLATOR_ENABLED"] = True
+    add_company_products(
+        app,
+        COMPANY_1_ID,
+        [
+            {
+                "name": "Sport",
+                "sd_product_id": "p-1",
+                "is_enabled": True,
+                "product_type": "wire",
+            }
+        ],
+    )
+
+    topics = [get_topic("Foo", "Foo"), get_topic("Bar", "baz")]
+    app.data.insert("topics", topics)
+    assert 0 == rebuild_percolator()
+
+    client.post("/push", json=item)
+    assert {str(topics[0]["_id"])} == get_percolated_topic_ids("wire", item["guid"])
+
+    search = get_resource_service("wire_search")
+    users = get_user_dict(use_globals=False)
+    companies = get_company_dict(use_globals=False)
+    assert [topics[0]["_id"]] == search.get_matching_topics(item["guid"], topics, users, companies)
+
+
+def test_percolator_ignores_topics_without_product_access(client, app):
+    app.config["TOPICS_PERCOLATOR_ENABLED"] = True
+    add_company_products(
+        app,
+        COMPANY_1_ID,
+        [
+            {
+                "name": "Other",
+                "sd_product_id": "p-2",
+                "is_enabled": True,
+                "product_type": "wire",
+            }
+        ],
+    )
+
+    topics = [get_topic("Foo", "Foo")]
+    app.data.insert("topics", topics)
+    rebuild_percolator()
+
+    client.post("/push", json=item)
+    assert set() == get_percolated_topic_ids("wire", item["guid"])
@@ -776,6 +776,34 @@ def test_search_by_products_and_filtered_by_embargoe(client, app):
         assert items[0]["headline"] == "china story"
 
 
+def test_get_products_items_uses_single_request(client, app):
+    with app.test_request_context():
+        server_session["user"] = str(PUBLIC_USER_ID)
+        server_session["user_type"] = "public"
+        china_id = ObjectId()
+        weather_id = ObjectId()
+        add_company_products(
+            app,
+            COMPANY_1_ID,
+            [
+                {"_id": china_id, "name": "china", "query": "headline:china", "is_enabled": True},
+                {"_id": weather_id, "name": "weather", "query": "slugline:weather", "is_enabled": True},
+            ],
+        )
+        app.data.insert("items", [{"_id": "china", "headline": "china"}])
+
+        es = app.data.elastic.elastic("wire_search")
+        with mock.patch.object(es, "msearch", wraps=es.msearch) as msearch:
+            china_items, missing_items, weather_items = get_resource_service("wire_search").get_products_items(
+                [(china_id, 20), (ObjectId(), 20), (weather_id, 20)]
+            )
+            assert 1 == msearch.call_count
+
+        assert ["china"] == [item["_id"] for item in china_items]
+        assert [] == missing_items
+        assert "china" not in [item["_id"] for item in weather_items]
+
+
 def test_wire_delete(client, app):
     docs = [
         items[1],
@@ -1,6 +1,9 @@
 import os
 from superdesk.storage.desk_media_storage import SuperdeskGridFSMediaStorage
 from tests.news_api.test_api_audit import audit_check
+from newsroom.email_attachments import store_email_attachment
+from newsroom.reports.export import EXPORTS_FOLDER
+from newsroom.upload import ASSETS_RESOURCE
 
 
 def get_fixture_path(fixture):
@@ -13,14 +16,17 @@ def setup_image(app):
     return res
 
 
-def test_get_asset(client, app):
+def get_token(app):
     app.data.insert(
         "companies",
         [{"_id": "company_123", "name": "Test Company", "is_enabled": True}],
     )
     app.data.insert("news_api_tokens", [{"company": "company_123", "enabled": True}])
-    token = app.data.find_one("news_api_tokens", req=None, company="company_123")
+    return app.data.find_one("news_api_tokens", req=None, company="company_123")
+
 
+def test_get_asset(client, app):
+    token = get_token(app)
     id = setup_image(app)
     response = client.get("api/v1/assets/{}".format(id), headers={"Authorization": token.get("token")})
     assert response.status_code == 200
@@ -30,3 +36,23 @@ def test_get_asset(client, app):
 def test_authorization_get_asset(client, app):
     response = client.get("api/v1/assets/{}".format(id), headers={"Authorization": "xxxxxxxx"})
     assert response.status_code == 401
+
+
+def test_email_attachment_not_available(client, app):
+    token = get_token(app)
+    media_id = store_email_attachment(b"report content", "report.pdf", "application/pdf")
+    response = client.get("api/v1/assets/{}".format(media_id), headers={"Authorization": token.get("token")})
+    assert response.status_code == 404
+
+
+def test_report_export_not_available(client, app):
+    token = get_token(app)
+    media_id = app.media.put(
+        b"Company,Enabled",
+        filename="company.csv",
+        content_type="text/csv",
+        resource=ASSETS_RESOURCE,
+        folder=EXPORTS_FOLDER,
+    )
+    response = client.get("api/v1/assets/{}".format(media_id), headers={"Authorization": token.get("token")})
+    assert response.status_code == 404
@@ -3,7 +3,9 @@ from eve.methods.get import get_internal, getitem_internal
 from superdesk import get_resource_service
 from flask import g
 from bson import ObjectId
+from superdesk.utc import utcnow
 from newsroom.tests.fixtures import COMPANY_1_ID, COMPANY_2_ID
+from newsroom.news_api.api_audit.writer import AuditWriter
 
 company_id = "5c3eb6975f627db90c84093c"
 
@@ -88,3 +90,49 @@ def test_search_audit_creation(client, app):
         response = get_internal("news/search")
         assert len(response[0]["_items"]) == 1
         audit_check("5ab03a87bdd78169bb6d0785")
+
+
+def test_audit_writer_batches_records(client, app):
+    writer = AuditWriter(app)
+    for i in range(3):
+        assert writer.add("api_audit", {"created": utcnow(), "items_id": [str(i)], "endpoint": "news/item"})
+
+    assert writer.flush() == 3
+    writer.stop()
+
+    audits = list(get_resource_service("api_audit").find(where={}))
+    assert len(audits) == 3
+    assert all(audit.get("_created") and audit.get("_updated") and audit.get("_etag") for audit in audits)
+    assert writer.get_stats() == {"queued": 0, "written": 3, "dropped": 0}
+
+
+def test_audit_writer_indexes_only_stored_records(client, app):
+    _id = ObjectId()
+    get_resource_service("api_audit").post([{"_id": _id, "items_id": ["original"], "endpoint": "news/item"}])
+
+    writer = AuditWriter(app)
+    assert writer.add("api_audit", {"_id": _id, "items_id": ["duplicate"], "endpoint": "news/item"})
+    assert writer.add("api_audit", {"items_id": ["new"], "endpoint": "news/item"})
+    assert writer.flush() == 1
+    writer.stop()
+
+    audit = app.data.elastic.find_one("api_audit", req=None, _id=str(_id))
+    assert ["original"] == audit["items_id"]
+    assert writer.get_stats()["written"] == 1
+
+
+def test_audit_writer_drops_records_when_full(client, app):
+    app.config["NEWS_API_AUDIT_QUEUE_SIZE"] = 1
+    app.config["NEWS_API_AUDIT_FLUSH_INTERVAL"] = 60
+    writer = AuditWriter(app)
+    writer.start()
+    writer.flush_lock.acquire()  # block the writer
+    try:
+        assert writer.add("api_audit", {"items_id": ["1"]})
+        assert not writer.add("api_audit", {"items_id": ["2"]})
+    finally:
+        writer.flush_lock.release()
+    writer.stop()
+
+    assert writer.get_stats()["dropped"] == 1
+    assert len(list(get_resource_service("api_audit").find(where={}))) == 1
@@ -0,0 +1,33 @@
+from bson import ObjectId
+
+from newsroom.news_api.api_tokens.rate_limit import flush_rate_limits
+
+company_id = ObjectId()
+
+
+def test_rate_limit(client, app):
+    app.config["RATE_LIMIT_REQUESTS"] = 2
+    app.config["RATE_LIMIT_PERIOD"] = 300
+    app.data.insert("companies", [{"_id": company_id, "name": "Test Company", "is_enabled": True}])
+    app.data.insert("news_api_tokens", [{"company": company_id, "enabled": True}])
+    token = app.data.find_one("news_api_tokens", req=None, company=company_id)
+
+    response = client.get("api/v1/news/search", headers={"Authorization": token["_id"]})
+    assert response.status_code != 429
+    assert response.headers["X-RateLimit-Remaining"] == "1"
+    assert response.headers["X-RateLimit-Limit"] == "2"
+    assert "X-RateLimit-Reset" in response.headers
+
+    response = client.get("api/v1/news/search", headers={"Authorization": token["_id"]})
+    assert response.status_code != 429
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    response = client.get("api/v1/news/search", headers={"Authorization": token["_id"]})
+    assert response.status_code == 429
+
+    # counters are stored only when flushed
+    assert app.data.find_one("news_api_tokens", req=None, _id=token["_id"]).get("rate_limit_requests") is None
+    assert flush_rate_limits() == 1
+    token = app.data.find_one("news_api_tokens", req=None, _id=token["_id"])
+    assert token["rate_limit_requests"] == 2
+    assert token["rate_limit_expiry"]